@@ -0,0 +1,120 @@
+"""
+Content-addressed cache for Video Intelligence person detection results.
+
+- Key: ANNOTATION_CACHE_VERSION / provider settings / content hash of the
+  video. The settings part is the provider's cache_variant(): for Video
+  Intelligence a hash of the motion pre-pass and segmentation settings, which
+  decide what part of the video is annotated (MOTION_PREPASS=0 never serves
+  a trimmed entry). The content hash is the object's GCS md5 for gs:// URIs
+  (one metadata call, no download; generation when the object has no md5,
+  e.g. composites), sha256 of the bytes for local files.
+  Retries, Pub/Sub redeliveries and re-analysis of the same clip hit the
+  cache instead of starting a new annotation operation
+- Entries are serialized VideoAnnotationResults protos, so a cached run scores
+  exactly like a fresh one
+- Tiers: local LRU directory (ANNOTATION_CACHE_DIR, ANNOTATION_CACHE_MAX_MB) in
+  front of GCS under cache/annotations/ (ANNOTATION_CACHE_GCS)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import hashlib
+import time
+
+from backend.cache_tiers import DiskLRU, GcsTier, TieredCache
+from backend.config import ANNOTATION_CACHE_DIR, ANNOTATION_CACHE_GCS, ANNOTATION_CACHE_MAX_MB, GCS_BUCKET
+from backend.pose_providers import PoseProvider
+
+
+ANNOTATION_CACHE_VERSION = "vi-person-pose-v2"
+
+
+def video_content_key(video_uri_or_path: str, variant: str = "") -> Optional[str]:
+    """Cache key for a video's content under provider settings `variant`; None when it cannot be determined (cache bypassed)."""
+    prefix = f"{ANNOTATION_CACHE_VERSION}/{variant}" if variant else ANNOTATION_CACHE_VERSION
+    try:
+        if video_uri_or_path.startswith("gs://"):
+            from google.cloud import storage
+            bucket_name, blob_name = video_uri_or_path[len("gs://"):].split("/", 1)
+            blob = storage.Client().bucket(bucket_name).get_blob(blob_name)
+            if blob is None:
+                return None
+            if blob.md5_hash:
+                digest = base64.b64decode(blob.md5_hash).hex()
+                return f"{prefix}/md5-{digest}"
+            name = hashlib.sha256(video_uri_or_path.encode("utf-8")).hexdigest()
+            return f"{prefix}/gen-{name}-{blob.generation}"
+        h = hashlib.sha256()
+        with open(video_uri_or_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return f"{prefix}/sha256-{h.hexdigest()}"
+    except Exception:
+        return None
+
+
+class AnnotationCache:
+    def __init__(self, store: TieredCache):
+        self.store = store
+
+    @classmethod
+    def default(cls) -> Optional['AnnotationCache']:
+        """Configured tiers; None when every tier is disabled."""
+        tiers: List[object] = []
+        if ANNOTATION_CACHE_MAX_MB > 0:
+            tiers.append(DiskLRU(ANNOTATION_CACHE_DIR, ANNOTATION_CACHE_MAX_MB * 1024 * 1024))
+        if ANNOTATION_CACHE_GCS:
+            tiers.append(GcsTier(GCS_BUCKET, "cache/annotations"))
+        return cls(TieredCache(tiers)) if tiers else None
+
+    def get(self, key: str) -> Tuple[Optional[Any], int]:
+        """(annotations, entry size) for a key; (None, 0) on a miss or an undecodable entry."""
+        blob = self.store.get(key)
+        if blob is None:
+            return None, 0
+        try:
+            from google.cloud import videointelligence
+            return videointelligence.VideoAnnotationResults.deserialize(blob), len(blob)
+        except Exception:
+            return None, 0
+
+    def put(self, key: str, annotations: Any) -> int:
+        """Store proto annotations; returns bytes written (0 for non-proto annotations, which are not cached)."""
+        serialize = getattr(type(annotations), "serialize", None)
+        if serialize is None:
+            return 0
+        blob = serialize(annotations)
+        self.store.put(key, blob)
+        return len(blob)
+
+
+class CachedPoseProvider(PoseProvider):
+    """Serves `inner` results from an AnnotationCache; ingest gains 'cache' (hit | miss | bypass)."""
+
+    def __init__(self, inner: PoseProvider, cache: AnnotationCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+
+    def annotate(self, video_uri_or_path: str) -> Tuple[Any, Dict[str, Any]]:
+        start = time.perf_counter()
+        key = video_content_key(video_uri_or_path, self.inner.cache_variant())
+        if key is None:
+            annotations, ingest = self.inner.annotate(video_uri_or_path)
+            return annotations, {**ingest, "cache": "bypass"}
+        annotations, size = self.cache.get(key)
+        if annotations is not None:
+            return annotations, {
+                "source": "cache",
+                "cache": "hit",
+                "cache_key": key,
+                "bytes_read": size,
+                "bytes_sent": 0,
+                "annotate_ms": round((time.perf_counter() - start) * 1000.0, 1),
+            }
+        annotations, ingest = self.inner.annotate(video_uri_or_path)
+        try:
+            written = self.cache.put(key, annotations)
+        except Exception:
+            written = 0
+        return annotations, {**ingest, "cache": "miss", "cache_key": key, "cache_bytes_written": written}
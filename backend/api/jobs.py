@@ -0,0 +1,184 @@
+"""
+Bounded analysis pool and job status routes.
+
+analyze_video blocks for as long as Video Intelligence takes (up to ~30 min),
+so /analyze never calls it on the event loop:
+- work runs in a process pool of ANALYZE_WORKERS workers (ANALYZE_EXECUTOR=thread
+  for a thread pool, e.g. in tests or when monkeypatching analyze_video)
+- at most ANALYZE_QUEUE_DEPTH submissions wait behind the running ones; past that,
+  submit() raises PoolFull and the route answers 429 with Retry-After
+- /analyze?async=true answers 202 with a job id; GET /jobs/{job_id} polls it
+  (wait=<seconds> long-polls until the job finishes or the wait elapses)
+- finished jobs are kept for ANALYZE_JOB_TTL_S seconds
+- a job finishes once its artifact uploads have; failed ones are listed in the
+  result's upload_errors
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import os
+import threading
+import time
+import uuid
+
+from fastapi import APIRouter, HTTPException
+
+from backend.config import ANALYZE_EXECUTOR, ANALYZE_JOB_TTL_S, ANALYZE_QUEUE_DEPTH, ANALYZE_WORKERS
+
+
+router = APIRouter()
+
+
+class PoolFull(Exception):
+    """Raised when every worker is busy and the queue is at ANALYZE_QUEUE_DEPTH."""
+
+
+def run_analysis(video_uri_or_path: str, with_coaching: bool = False, cleanup_path: Optional[str] = None) -> dict:
+    """Pool entry point (module level so it pickles into worker processes)."""
+    # Lazy import keeps the API process light and lets tests patch analyze_video
+    from backend.artifacts import ArtifactUploads
+    from backend.discus_analyzer_v2 import analyze_video
+    try:
+        # analyze_video returns with its artifact uploads still in flight; a worker process
+        # can be reused or torn down once this returns, so they land (or are reported) first
+        uploads = ArtifactUploads()
+        result = analyze_video(video_uri_or_path, with_coaching=with_coaching, uploads=uploads)
+        failed = {uri: err for uri, err in uploads.wait(timeout=600).items() if err}
+        if failed:
+            result["upload_errors"] = failed
+        return result
+    finally:
+        if cleanup_path:
+            try:
+                os.remove(cleanup_path)
+            except Exception:
+                pass
+
+
+@dataclass
+class Job:
+    job_id: str
+    future: Future
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if not self.future.done():
+            return "RUNNING" if self.future.running() else "QUEUED"
+        if self.future.cancelled() or self.future.exception() is not None:
+            return "FAILED"
+        return "DONE"
+
+    def as_status(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"job_id": self.job_id, "state": self.state, "created_at": self.created_at}
+        if self.finished_at is not None:
+            out["finished_at"] = self.finished_at
+        state = out["state"]
+        if state == "DONE":
+            out["result"] = self.future.result()
+        elif state == "FAILED":
+            out["error"] = "cancelled" if self.future.cancelled() else str(self.future.exception())
+        return out
+
+
+class AnalysisPool:
+    def __init__(self, workers: int = ANALYZE_WORKERS, queue_depth: int = ANALYZE_QUEUE_DEPTH,
+                 executor: str = ANALYZE_EXECUTOR, job_ttl_s: float = ANALYZE_JOB_TTL_S):
+        self.workers = max(1, int(workers))
+        self.capacity = self.workers + max(0, int(queue_depth))
+        self.job_ttl_s = float(job_ttl_s)
+        if executor == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analyze")
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._jobs: Dict[str, Job] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Schedule fn(*args, **kwargs); raises PoolFull instead of queueing past capacity."""
+        with self._lock:
+            self._evict_expired()
+            if self._in_flight >= self.capacity:
+                raise PoolFull(f"{self._in_flight} analyses in flight (capacity {self.capacity})")
+            self._in_flight += 1
+        try:
+            fut = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        job = Job(job_id=str(uuid.uuid4()), future=fut)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        fut.add_done_callback(lambda _f, job=job: self._on_done(job))
+        return job
+
+    def _on_done(self, job: Job) -> None:
+        with self._lock:
+            job.finished_at = time.time()
+            self._in_flight -= 1
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.job_ttl_s
+        for job_id in [j.job_id for j in self._jobs.values() if j.finished_at is not None and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_POOL: Optional[AnalysisPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> AnalysisPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = AnalysisPool()
+        return _POOL
+
+
+def set_pool(pool: Optional[AnalysisPool]) -> Optional[AnalysisPool]:
+    """Swap the process-wide pool (None resets to a lazily created default); returns the previous one."""
+    global _POOL
+    with _POOL_LOCK:
+        prev, _POOL = _POOL, pool
+    return prev
+
+
+def shutdown_pool() -> None:
+    prev = set_pool(None)
+    if prev is not None:
+        prev.shutdown()
+
+
+def too_busy(exc: PoolFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=f"Analysis capacity exhausted: {exc}", headers={"Retry-After": "30"})
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str, wait: Optional[float] = None):
+    job = get_pool().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait and not job.future.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout=min(float(wait), 60.0))
+        except Exception:
+            # Timeout or job failure: either way the status below reports it
+            pass
+    return job.as_status()
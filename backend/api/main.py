@@ -13,10 +13,20 @@ Example curl:
 - Analyze via multipart upload:
   curl -s -X POST http://localhost:8080/analyze \
     -F "video_file=@samples/throw.mp4"
+
+- Analyze asynchronously (202 + job id), then poll:
+  curl -s -X POST "http://localhost:8080/analyze?async=true" \
+    -H "Content-Type: application/json" \
+    -d '{"video_uri":"gs://praxisforma-videos/sample.mp4"}'
+  curl -s "http://localhost:8080/jobs/<job_id>?wait=20"
+
+Analyses run in a bounded worker pool (backend/api/jobs.py); when it is
+full /analyze answers 429 instead of queueing without limit.
 """
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi import Body
+from fastapi import Body, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import tempfile
@@ -24,10 +34,12 @@ import os
 import uuid
 import time
 import json
+import asyncio
 
 from backend.api.signed_url import router as signed_url_router
 from backend.api.uploads import router as uploads_router
 from backend.api.admin_envelopes import router as admin_envelopes_router
+from backend.api.jobs import router as jobs_router, PoolFull, get_pool, run_analysis, shutdown_pool, too_busy
 from backend.config import GCS_BUCKET, FIRESTORE_COLLECTION
 from google.cloud import firestore, storage
 from backend.visual.overlay import render_coaching_video
@@ -64,6 +76,10 @@ class VideoMeta(BaseModel):
 class PQSResponse(BaseModel):
     video: VideoMeta
     pqs: PQSBlock
+    timings_ms: Optional[Dict[str, float]] = None
+    ingest: Optional[Dict[str, Any]] = None
+    session: Optional[Dict[str, Any]] = None
+    assets: Optional[Dict[str, str]] = None
 
 
 app = FastAPI()
@@ -74,14 +90,18 @@ async def healthz():
     return {"ok": True}
 
 
+@app.on_event("shutdown")
+async def _shutdown_analysis_pool():
+    shutdown_pool()
+
+
 @app.post("/analyze", response_model=PQSResponse)
 async def analyze(
     video_uri_body: Optional[AnalyzeRequest] = Body(default=None),
     video_file: Optional[UploadFile] = File(default=None),
     with_coaching: Optional[bool] = False,
+    async_mode: bool = Query(default=False, alias="async"),
 ):
-    # Lazy import to avoid heavy imports during tests of unrelated endpoints
-    from backend.discus_analyzer_v2 import analyze_video
     # Input validation: exactly one provided
     provided = int(video_uri_body is not None) + int(video_file is not None)
     if provided != 1:
@@ -90,35 +110,48 @@ async def analyze(
     start = time.perf_counter()
     req_id = str(uuid.uuid4())
 
+    tmp_path: Optional[str] = None
     if video_uri_body is not None:
-        result = analyze_video(video_uri_body.video_uri, with_coaching=bool(with_coaching))
-        result["request_id"] = req_id
-        result["duration_ms_server"] = int((time.perf_counter() - start) * 1000)
-        return result
-
-    # Multipart upload path
-    assert video_file is not None
-    suffix = os.path.splitext(video_file.filename or "upload.mp4")[1] or ".mp4"
-    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
-    os.close(fd)
-    try:
+        source = video_uri_body.video_uri
+    else:
+        # Multipart upload path; the worker removes the temp file when it is done with it
+        assert video_file is not None
+        suffix = os.path.splitext(video_file.filename or "upload.mp4")[1] or ".mp4"
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
         content = await video_file.read()
         with open(tmp_path, "wb") as f:
             f.write(content)
-        result = analyze_video(tmp_path, with_coaching=bool(with_coaching))
-        result["request_id"] = req_id
-        result["duration_ms_server"] = int((time.perf_counter() - start) * 1000)
-        return result
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        source = tmp_path
+
+    try:
+        job = get_pool().submit(run_analysis, source, bool(with_coaching), tmp_path)
+    except PoolFull as e:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+        raise too_busy(e)
+
+    if async_mode:
+        return JSONResponse(status_code=202, content={
+            "job_id": job.job_id,
+            "state": job.state,
+            "status_url": f"/jobs/{job.job_id}",
+            "request_id": req_id,
+        })
+
+    result = await asyncio.wrap_future(job.future)
+    result["request_id"] = req_id
+    result["duration_ms_server"] = int((time.perf_counter() - start) * 1000)
+    return result
 
 
 app.include_router(signed_url_router)
 app.include_router(uploads_router)
 app.include_router(admin_envelopes_router)
+app.include_router(jobs_router)
 
 
 @app.post("/sessions/{session_id}/overlay")
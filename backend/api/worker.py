@@ -4,14 +4,16 @@ Cloud Run worker receiving Pub/Sub push and running analysis.
 
 from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import Any, Dict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+import asyncio
 import json
 import base64
 import os
 import uuid
 import time
 
-from google.cloud import storage, firestore
+from google.cloud import firestore
 
 from backend.config import GCP_PROJECT, GCS_BUCKET, FIRESTORE_COLLECTION
 # Lazy import inside handler to avoid circular deps during test collection
@@ -27,6 +29,21 @@ class PubSubEnvelope(BaseModel):
 
 app = FastAPI()
 
+
+async def _await_uploads(futures: Dict[str, Future], timeout: float) -> Dict[str, Optional[str]]:
+    """{gs_uri: None on success, or the error text} once `futures` finish; waits without blocking the event loop."""
+    wrapped = {uri: asyncio.wrap_future(f) for uri, f in futures.items()}
+    if wrapped:
+        await asyncio.wait(list(wrapped.values()), timeout=timeout)
+    report: Dict[str, Optional[str]] = {}
+    for uri, w in wrapped.items():
+        if not w.done():
+            report[uri] = f"timed out after {timeout:.0f}s"
+        else:
+            report[uri] = None if w.exception() is None else str(w.exception())
+    return report
+
+
 @app.post("/pubsub")
 async def pubsub_push(envelope: PubSubEnvelope, request: Request):
     req_id = str(uuid.uuid4())
@@ -65,7 +82,12 @@ async def pubsub_push(envelope: PubSubEnvelope, request: Request):
         age_band = prof.get('ageBand') or 'Open'
         sex = prof.get('sex') or 'M'
         p_hand = prof.get('handedness') or 'right'
-        pqs = analyze_video(blurred_uri, with_coaching=with_coaching, event_type=event)
+        # Artifacts upload in the background from here on. Clients fetch the results JSON, CSV
+        # and overlay sidecar once they see COMPLETE, so those must land before it; the landmark
+        # archive stays fully overlapped and only delays the ack
+        from backend.artifacts import ArtifactUploads
+        uploads = ArtifactUploads()
+        pqs = analyze_video(blurred_uri, with_coaching=with_coaching, event_type=event, athlete_profile=prof, uploads=uploads)
 
         # Persist analysis
         doc_ref.set(
@@ -76,6 +98,7 @@ async def pubsub_push(envelope: PubSubEnvelope, request: Request):
                 "created_at": firestore.SERVER_TIMESTAMP,
                 "pqs": pqs["pqs"],
                 "pqs_v2": pqs.get("pqs_v2"),
+                "session": pqs.get("session"),
             },
             merge=True,
         )
@@ -86,11 +109,10 @@ async def pubsub_push(envelope: PubSubEnvelope, request: Request):
             doc_ref.set({"envelope_version": env_ver}, merge=True)
 
         # Write JSON to GCS results/{userId}/{basename}.pqs.json
-        bucket = storage.Client().bucket(GCS_BUCKET)
         basename = os.path.splitext(filename)[0]
-        out_path = f"results/{user_id}/{basename}.pqs.json"
-        blob = bucket.blob(out_path)
-        blob.upload_from_string(json.dumps(pqs), content_type="application/json")
+        results_prefix = f"gs://{GCS_BUCKET}/results/{user_id}/{basename}"
+        required: Dict[str, Future] = {}
+        required[f"{results_prefix}.pqs.json"] = uploads.put(f"{results_prefix}.pqs.json", json.dumps(pqs), "application/json")
 
         # COACHING / OVERLAY stages
         if with_coaching:
@@ -98,13 +120,18 @@ async def pubsub_push(envelope: PubSubEnvelope, request: Request):
         if with_coaching and decoded.get("with_overlay"):
             doc_ref.set({"status": {"state": "OVERLAY", "updated_at": firestore.SERVER_TIMESTAMP}}, merge=True)
             from backend.visual.overlay import render_coaching_video
+            # The overlay reads the landmark archive back from GCS
+            landmarks_upload = uploads.get((pqs.get("assets") or {}).get("landmarks_uri", ""))
+            if landmarks_upload is not None:
+                await _await_uploads({"landmarks": landmarks_upload}, timeout=300)
             overlay_uri = f"gs://{GCS_BUCKET}/overlays/{user_id}/{basename}.overlay.mp4"
             ov = render_coaching_video(blurred_uri, pqs, overlay_uri)
             doc_ref.set({"assets": {"overlay_uri": ov.get("overlay_uri")}}, merge=True)
-            sidecar = bucket.blob(f"results/{user_id}/{basename}.assets.json")
-            sidecar.upload_from_string(json.dumps({"assets": {"overlay_uri": ov.get("overlay_uri")}}), content_type="application/json")
+            sidecar_uri = f"{results_prefix}.assets.json"
+            required[sidecar_uri] = uploads.put(sidecar_uri, json.dumps({"assets": {"overlay_uri": ov.get("overlay_uri")}}), "application/json")
 
         # Export per-frame feature CSV
+        csv_uri = None
         try:
             from backend.pqs_algorithm import compute_features as _cf  # if available under this path
         except Exception:
@@ -127,17 +154,32 @@ async def pubsub_push(envelope: PubSubEnvelope, request: Request):
                     rows.append(",".join(row))
                     t += step
                 contents = "\n".join([csv_lines[0]] + rows)
-                csv_blob = bucket.blob(f"results/{user_id}/{basename}.features.csv")
-                csv_blob.upload_from_string(contents, content_type="text/csv")
-                doc_ref.set({"assets": {"features_csv_uri": f"gs://{GCS_BUCKET}/results/{user_id}/{basename}.features.csv"}}, merge=True)
+                csv_uri = f"{results_prefix}.features.csv"
+                required[csv_uri] = uploads.put(csv_uri, contents, "text/csv")
         except Exception:
             pass
 
+        # Results that COMPLETE points clients at must exist first; a failed one fails the
+        # analysis (ERROR, and Pub/Sub redelivers) rather than leaving a dangling URI
+        wait_start = time.perf_counter()
+        missing = {uri: err for uri, err in (await _await_uploads(required, timeout=600)).items() if err}
+        if missing:
+            raise RuntimeError(f"result upload failed: {missing}")
+        if csv_uri is not None:
+            doc_ref.set({"assets": {"features_csv_uri": csv_uri}}, merge=True)
+
         # COMPLETE
         doc_ref.set({"status": {"state": "COMPLETE", "updated_at": firestore.SERVER_TIMESTAMP}}, merge=True)
 
         ms = int((time.perf_counter() - start) * 1000)
-        print(f"request_id={req_id} session={session_id} analyzed in {ms}ms uri={blurred_uri}")
+        print(f"request_id={req_id} session={session_id} analyzed in {ms}ms (result uploads {int((time.perf_counter() - wait_start) * 1000)}ms) uri={blurred_uri} scoring_ms={pqs.get('timings_ms')} ingest={pqs.get('ingest')}")
+
+        # Ack only once the landmark archive has landed too (Cloud Run throttles CPU after the response)
+        report = await _await_uploads(uploads.futures(), timeout=600)
+        failed = {uri: err for uri, err in report.items() if err}
+        if failed:
+            doc_ref.set({"upload_errors": failed}, merge=True)
+        print(f"request_id={req_id} session={session_id} uploads={len(report)} failed={len(failed)} in {int((time.perf_counter() - start) * 1000) - ms}ms after COMPLETE")
         return Response(status_code=204)
     except Exception as e:
         doc_ref.set({"status": {"state": "ERROR", "error": str(e), "updated_at": firestore.SERVER_TIMESTAMP}}, merge=True)
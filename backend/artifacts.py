@@ -0,0 +1,129 @@
+"""
+Background persistence of analysis artifacts (landmark archives, result JSON, CSV).
+
+Uploads are off the response path:
+- one process-wide upload executor (ARTIFACT_UPLOAD_WORKERS threads) and one
+  shared storage.Client instead of a client per upload
+- ArtifactUploads collects one analysis' uploads; put() starts an upload as
+  soon as its data is ready and returns its Future. Data may be bytes or a
+  callable, in which case encoding (archive, json.dumps, gzip) runs on the
+  upload thread as well
+- completion() is a Future resolving to {gs_uri: None on success, or the
+  error text} once every upload put so far has finished; failures are logged
+  and reported there, never raised into scoring
+- submit() runs other persistence (feature cache write-backs) on the same
+  executor
+- targets are gs:// URIs, or local paths for offline runs (batch backfills
+  writing under a local --out directory)
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Union
+import os
+import threading
+import time
+
+from google.cloud import storage
+
+from backend.config import ARTIFACT_UPLOAD_WORKERS
+
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_client = None
+_client_factory = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, ARTIFACT_UPLOAD_WORKERS), thread_name_prefix="artifact-upload")
+        return _executor
+
+
+def submit(fn: Callable, *args) -> Future:
+    """Run fn(*args) on the shared upload executor (cache write-backs and other off-path persistence)."""
+    return _get_executor().submit(fn, *args)
+
+
+def storage_client():
+    """Process-wide storage client (rebuilt if storage.Client is swapped, e.g. by tests)."""
+    global _client, _client_factory
+    with _lock:
+        if _client is None or _client_factory is not storage.Client:
+            _client = storage.Client()
+            _client_factory = storage.Client
+        return _client
+
+
+def upload(gs_uri: str, data: Union[bytes, str], content_type: str) -> str:
+    """Synchronous upload of one object (or write of a local file); returns the URI."""
+    if not gs_uri.startswith("gs://"):
+        os.makedirs(os.path.dirname(gs_uri) or ".", exist_ok=True)
+        with open(gs_uri, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        return gs_uri
+    bucket_name, blob_name = gs_uri[len("gs://"):].split("/", 1)
+    storage_client().bucket(bucket_name).blob(blob_name).upload_from_string(data, content_type=content_type)
+    return gs_uri
+
+
+class ArtifactUploads:
+    """The uploads of one analysis; see the module docstring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self.started_at = time.perf_counter()
+
+    def put(self, gs_uri: str, data: Union[bytes, str, Callable[[], Union[bytes, str]]], content_type: str) -> Future:
+        def run() -> str:
+            payload = data() if callable(data) else data
+            return upload(gs_uri, payload, content_type)
+
+        future = _get_executor().submit(run)
+        future.add_done_callback(lambda f: self._log(gs_uri, f))
+        with self._lock:
+            self._futures[gs_uri] = future
+        return future
+
+    def get(self, gs_uri: str) -> Optional[Future]:
+        with self._lock:
+            return self._futures.get(gs_uri)
+
+    def futures(self) -> Dict[str, Future]:
+        """Snapshot of {gs_uri: Future} for every upload put so far."""
+        with self._lock:
+            return dict(self._futures)
+
+    @staticmethod
+    def _log(gs_uri: str, future: Future) -> None:
+        err = future.exception()
+        if err is not None:
+            print(f"artifact upload failed uri={gs_uri} error={err!r}")
+
+    def completion(self) -> Future:
+        """Future of {gs_uri: None | error text} for every upload put so far."""
+        pending = self.futures()
+        done: Future = Future()
+        if not pending:
+            done.set_result({})
+            return done
+        remaining = [len(pending)]
+        count_lock = threading.Lock()
+
+        def finished(_):
+            with count_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                done.set_result({uri: (None if f.exception() is None else str(f.exception())) for uri, f in pending.items()})
+
+        for f in pending.values():
+            f.add_done_callback(finished)
+        return done
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """Block until every upload put so far has finished; the completion report."""
+        return self.completion().result(timeout=timeout)
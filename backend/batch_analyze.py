@@ -0,0 +1,229 @@
+"""
+Non-interactive batch analysis for backfills.
+
+  python -m backend.batch_analyze gs://praxisforma-videos/blurred/ --out gs://praxisforma-videos/results/ \
+      --concurrency 8 --manifest backfill.jsonl
+  python -m backend.batch_analyze ./clips --out ./results --provider replay
+
+- listing: one paged list_blobs call with a field projection (name, size,
+  generation) for gs:// prefixes, a directory walk for local paths; no
+  per-object metadata requests
+- execution: up to --concurrency analyses in flight on a thread or process
+  pool (--executor, default ANALYZE_EXECUTOR); annotation wait dominates, so
+  threads are usually enough. Each analysis is analyze_video plus its
+  artifacts: the .pqs.json and the landmark archive (.landmarks.bin) are
+  written under --out at the video's path relative to the source, so
+  same-named clips in different folders never collide and a local backfill
+  needs no GCS access
+- manifest: JSONL, one record per finished video (uri, generation, state,
+  PQS total, output, error, ms), appended and flushed as results arrive. A
+  rerun with the same manifest skips videos already done at the same
+  generation and retries failures, so an interrupted backfill resumes where
+  it stopped. On Ctrl-C queued videos are dropped and running ones are
+  recorded as they finish (a second Ctrl-C abandons them)
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+import argparse
+import json
+import os
+import time
+
+from backend.config import ANALYZE_EXECUTOR
+
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".avi")
+_LIST_FIELDS = "items(name,size,generation),nextPageToken"
+
+
+@dataclass
+class VideoItem:
+    uri: str
+    rel: str                 # path below the source prefix / directory
+    size: Optional[int] = None
+    generation: Optional[str] = None  # GCS generation, or mtime_ns for local files
+
+
+def list_videos(source: str, extensions=VIDEO_EXTENSIONS) -> List[VideoItem]:
+    """Videos under a gs:// prefix or local directory, sorted by path."""
+    items: List[VideoItem] = []
+    if source.startswith("gs://"):
+        from backend.artifacts import storage_client
+        bucket_name, _, prefix = source[len("gs://"):].partition("/")
+        for blob in storage_client().list_blobs(bucket_name, prefix=prefix or None, fields=_LIST_FIELDS):
+            if blob.name.lower().endswith(extensions):
+                rel = blob.name[len(prefix):].lstrip("/") if prefix else blob.name
+                gen = str(blob.generation) if blob.generation is not None else None
+                items.append(VideoItem(f"gs://{bucket_name}/{blob.name}", rel, blob.size, gen))
+    else:
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(extensions):
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    items.append(VideoItem(path, os.path.relpath(path, source).replace(os.sep, "/"), st.st_size, str(st.st_mtime_ns)))
+    return sorted(items, key=lambda v: v.rel)
+
+
+def load_manifest(path: str) -> Dict[str, Dict]:
+    """Last record per uri; a torn final line from an interrupted run is ignored."""
+    done: Dict[str, Dict] = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and rec.get("uri"):
+                done[rec["uri"]] = rec
+    return done
+
+
+def pending(items: List[VideoItem], manifest: Dict[str, Dict]) -> Iterator[VideoItem]:
+    """Videos without a 'done' record for their current generation."""
+    for item in items:
+        rec = manifest.get(item.uri)
+        if rec and rec.get("state") == "done" and rec.get("generation") == item.generation:
+            continue
+        yield item
+
+
+def _output_uri(out: str, rel: str) -> str:
+    from backend.pose_providers import _join
+    return _join(out, os.path.splitext(rel)[0] + ".pqs.json")
+
+
+def analyze_one(uri: str, out_uri: str, with_coaching: bool = False, provider: Optional[str] = None) -> Dict:
+    """Pool entry point: analyze one video, persist its artifacts and result; returns a manifest record body."""
+    from backend.artifacts import ArtifactUploads
+    from backend.discus_analyzer_v2 import analyze_video
+    from backend.pose_providers import _write_bytes, get_pose_provider
+    start = time.perf_counter()
+    uploads = ArtifactUploads()
+    result = analyze_video(uri, with_coaching=with_coaching, provider=get_pose_provider(provider) if provider else None,
+                           uploads=uploads, artifacts_prefix=out_uri[:-len(".pqs.json")])
+    _write_bytes(out_uri, json.dumps(result).encode("utf-8"))
+    failed = {u: e for u, e in uploads.wait(timeout=600).items() if e}
+    if failed:
+        raise RuntimeError(f"artifact uploads failed: {failed}")
+    pqs = result.get("pqs") or {}
+    session = result.get("session") or {}
+    return {
+        "pqs_total": pqs.get("total"),
+        "throws": session.get("throw_count", 1),
+        "out": out_uri,
+        "ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+class Manifest:
+    """Append-only JSONL writer; every record is flushed and synced before the next video is counted."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "a", encoding="utf-8") if path else None
+        if self._f is not None and self._f.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            if torn:
+                # Interrupted mid-record: start on a fresh line so the next record parses
+                self._f.write("\n")
+
+    def write(self, rec: Dict) -> None:
+        if self._f is None:
+            return
+        self._f.write(json.dumps(rec) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+
+
+def run_batch(source: str, out: str, *, concurrency: int = 4, manifest_path: str = "", executor: Optional[str] = None,
+              with_coaching: bool = False, provider: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, int]:
+    """Analyze every pending video under `source`; returns counts (listed, skipped as already done, done, failed)."""
+    items = list_videos(source)
+    todo = list(pending(items, load_manifest(manifest_path)))
+    counts = {"listed": len(items), "skipped": len(items) - len(todo), "done": 0, "failed": 0}
+    if limit is not None:
+        todo = todo[:limit]
+    kind = executor or ANALYZE_EXECUTOR
+    concurrency = max(1, concurrency)
+    pool = ProcessPoolExecutor(max_workers=concurrency) if kind == "process" else \
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch")
+    manifest = Manifest(manifest_path)
+    in_flight: Dict[Future, VideoItem] = {}
+    queue = iter(todo)
+    start = time.perf_counter()
+
+    def record(fut: Future, item: VideoItem) -> None:
+        rec = {"uri": item.uri, "generation": item.generation, "size": item.size}
+        try:
+            rec.update(state="done", **fut.result())
+            counts["done"] += 1
+        except Exception as e:
+            rec.update(state="failed", error=f"{type(e).__name__}: {e}")
+            counts["failed"] += 1
+        manifest.write(rec)
+        n = counts["done"] + counts["failed"]
+        print(f"[{n}/{len(todo)}] {rec['state']} {item.rel} PQS={rec.get('pqs_total')} "
+              f"({rec.get('ms', '-')}ms, {time.perf_counter() - start:.1f}s elapsed)" +
+              (f" error={rec['error']}" if rec["state"] == "failed" else ""))
+
+    try:
+        while True:
+            # Keep at most 2x concurrency submitted so an interrupt loses little queued work
+            while len(in_flight) < 2 * concurrency:
+                item = next(queue, None)
+                if item is None:
+                    break
+                fut = pool.submit(analyze_one, item.uri, _output_uri(out, item.rel), with_coaching, provider)
+                in_flight[fut] = item
+            if not in_flight:
+                break
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                record(fut, in_flight.pop(fut))
+    except KeyboardInterrupt:
+        # Drop queued work; analyses already running are recorded as they finish so a resume
+        # does not redo them. A second Ctrl-C abandons them instead.
+        running = {fut: item for fut, item in in_flight.items() if not fut.cancel()}
+        print(f"Interrupted; recording {len(running)} running analyses (Ctrl-C again to abandon them)")
+        try:
+            for fut in as_completed(running):
+                record(fut, running[fut])
+        except KeyboardInterrupt:
+            pass
+        print("Rerun with the same --manifest to resume")
+        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        manifest.close()
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Batch-analyze every video under a gs:// prefix or local directory")
+    parser.add_argument("source", help="gs://bucket/prefix/ or local directory")
+    parser.add_argument("--out", default="batch_results", help="directory or gs:// prefix for .pqs.json results")
+    parser.add_argument("--concurrency", type=int, default=4, help="analyses in flight")
+    parser.add_argument("--executor", choices=("thread", "process"), default=None, help="default ANALYZE_EXECUTOR")
+    parser.add_argument("--manifest", default="batch_manifest.jsonl", help="resumable JSONL manifest ('' to disable)")
+    parser.add_argument("--provider", default=None, help="pose provider (default POSE_PROVIDER)")
+    parser.add_argument("--with-coaching", action="store_true")
+    parser.add_argument("--limit", type=int, default=None, help="analyze at most N pending videos")
+    args = parser.parse_args(argv)
+    counts = run_batch(args.source, args.out, concurrency=args.concurrency, manifest_path=args.manifest,
+                       executor=args.executor, with_coaching=args.with_coaching, provider=args.provider, limit=args.limit)
+    print("listed={listed} skipped={skipped} done={done} failed={failed}".format(**counts))
+
+
+if __name__ == "__main__":
+    main()
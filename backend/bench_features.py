@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the PQS v2 feature engine.
+
+Times compute_features on synthetic 30 fps pose data from a single 5 s throw up
+to a 10-minute training session. Per-sample cost should stay flat as duration
+grows (linear total cost).
+
+Run from the repo root:
+  python -m backend.bench_features
+"""
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from backend.biomech.features import compute_features
+from backend.biomech.pose import NUM_JOINTS, PoseArray
+
+
+DURATIONS_S = [5, 30, 120, 600]
+
+
+def synthetic_pose(duration_s: float, fps: float = 30.0, seed: int = 0) -> PoseArray:
+    """Smooth random-walk landmarks for every joint, ~2% dropped detections."""
+    rng = np.random.default_rng(seed)
+    n = max(2, int(duration_s * fps))
+    t_ms = np.round(np.arange(n) * 1000.0 / fps).astype(np.int64)
+    base = rng.uniform(0.3, 0.7, size=(1, NUM_JOINTS, 2))
+    walk = np.cumsum(rng.normal(0.0, 0.002, size=(n, NUM_JOINTS, 2)), axis=0)
+    data = np.empty((n, NUM_JOINTS, 3), dtype=np.float32)
+    data[..., :2] = np.clip(base + walk, 0.0, 1.0)
+    data[..., 2] = rng.uniform(0.6, 1.0, size=(n, NUM_JOINTS))
+    mask = rng.random((n, NUM_JOINTS)) > 0.02
+    return PoseArray(t_ms=t_ms, data=data, mask=mask)
+
+
+def bench(durations: List[float], repeats: int) -> List[dict]:
+    rows = []
+    for d in durations:
+        pose = synthetic_pose(d)
+        compute_features(pose, 'right', len(pose) // 2)  # warm-up
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            series, _, _ = compute_features(pose, 'right', len(pose) // 2)
+            times.append(time.perf_counter() - t0)
+        best = min(times)
+        rows.append({
+            "duration_s": d,
+            "samples": len(series.t_ms),
+            "ms": best * 1000.0,
+            "us_per_sample": best * 1e6 / max(1, len(series.t_ms)),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="compute_features scaling benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--durations", type=float, nargs="*", default=DURATIONS_S)
+    args = parser.parse_args()
+
+    rows = bench(args.durations, args.repeats)
+    print(f"{'duration_s':>10} {'samples@100Hz':>14} {'best_ms':>10} {'us/sample':>10}")
+    for r in rows:
+        print(f"{r['duration_s']:>10.0f} {r['samples']:>14d} {r['ms']:>10.2f} {r['us_per_sample']:>10.3f}")
+    first, last = rows[0], rows[-1]
+    growth = last["ms"] / max(1e-9, first["ms"])
+    size = last["samples"] / max(1, first["samples"])
+    print(f"time grew {growth:.1f}x for {size:.0f}x samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compact FeatureSeries storage.
+
+Layout: one contiguous float32 buffer of shape (C, T + 1), one row per array
+field of FeatureSeries in SERIES_FIELDS order:
+- Column 0 is a metadata column: format version, release angle/height (NaN
+  when undefined) and t0 split into two float32-exact halves
+- Columns 1..T hold the samples; t_ms is stored relative to t0, so it stays
+  exact for sessions up to ~4.6 hours
+- Saved as a single .npy; load(mmap=True) maps it read-only so consumers
+  (CSV export, compare UI, cohort jobs) can read features without recomputing
+"""
+
+from typing import Optional, Union
+import os
+
+import numpy as np
+
+from backend.biomech.features import SERIES_FIELDS, FeatureSeries
+
+
+FORMAT_VERSION = 1
+ARRAY_FIELDS = tuple(f for f in SERIES_FIELDS if f not in ('release_angle_deg', 'release_height_norm'))
+_ROW = {name: i for i, name in enumerate(ARRAY_FIELDS)}
+# Metadata slots in column 0
+_VERSION, _REL_ANGLE, _REL_HEIGHT, _T0_HI, _T0_LO = range(5)
+_T0_SPLIT = 1 << 16
+
+
+class CompactFeatureSeries:
+    """Read-mostly FeatureSeries backed by a single (C, T + 1) float32 buffer; fields are row views."""
+
+    __slots__ = ('buf',)
+
+    def __init__(self, buf: np.ndarray):
+        if buf.dtype != np.float32 or buf.ndim != 2 or buf.shape[0] != len(ARRAY_FIELDS) or buf.shape[1] < 1:
+            raise ValueError(f"expected a ({len(ARRAY_FIELDS)}, T+1) float32 buffer, got {buf.dtype} {buf.shape}")
+        if int(buf[_VERSION, 0]) != FORMAT_VERSION:
+            raise ValueError(f"unsupported compact feature format version {buf[_VERSION, 0]}")
+        self.buf = buf
+
+    @classmethod
+    def from_series(cls, series: FeatureSeries) -> 'CompactFeatureSeries':
+        t_ms = np.asarray(series.t_ms, dtype=np.int64)
+        T = len(t_ms)
+        t0 = int(t_ms[0]) if T else 0
+        buf = np.empty((len(ARRAY_FIELDS), T + 1), dtype=np.float32)
+        buf[:, 0] = 0.0
+        buf[_VERSION, 0] = FORMAT_VERSION
+        buf[_REL_ANGLE, 0] = np.nan if series.release_angle_deg is None else series.release_angle_deg
+        buf[_REL_HEIGHT, 0] = np.nan if series.release_height_norm is None else series.release_height_norm
+        buf[_T0_HI, 0], buf[_T0_LO, 0] = divmod(t0, _T0_SPLIT)
+        buf[_ROW['t_ms'], 1:] = t_ms - t0
+        for name in ARRAY_FIELDS[1:]:
+            buf[_ROW[name], 1:] = getattr(series, name)
+        return cls(buf)
+
+    def __len__(self) -> int:
+        return self.buf.shape[1] - 1
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Only reached for names that aren't slots/properties: the float32 field views
+        try:
+            return self.buf[_ROW[name], 1:]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def t_ms(self) -> np.ndarray:
+        t0 = int(self.buf[_T0_HI, 0]) * _T0_SPLIT + int(self.buf[_T0_LO, 0])
+        return self.buf[_ROW['t_ms'], 1:].astype(np.int64) + t0
+
+    @property
+    def release_angle_deg(self) -> Optional[float]:
+        v = float(self.buf[_REL_ANGLE, 0])
+        return None if np.isnan(v) else v
+
+    @property
+    def release_height_norm(self) -> Optional[float]:
+        v = float(self.buf[_REL_HEIGHT, 0])
+        return None if np.isnan(v) else v
+
+    def to_series(self) -> FeatureSeries:
+        """Eager FeatureSeries with float64 arrays (int64 t_ms)."""
+        fields = {name: self.buf[_ROW[name], 1:].astype(np.float64) for name in ARRAY_FIELDS[1:]}
+        return FeatureSeries(t_ms=self.t_ms, release_angle_deg=self.release_angle_deg,
+                             release_height_norm=self.release_height_norm, **fields)
+
+    @property
+    def nbytes(self) -> int:
+        return self.buf.nbytes
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        np.save(path, self.buf, allow_pickle=False)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], mmap: bool = True) -> 'CompactFeatureSeries':
+        buf = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        return cls(buf)
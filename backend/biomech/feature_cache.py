@@ -0,0 +1,149 @@
+"""
+Content-addressed cache for compute_features results.
+
+- Key: FEATURE_ENGINE_VERSION / sha256 of the landmark arrays (t_ms, data,
+  mask) plus handedness and release index, so any landmark edit or engine
+  change misses
+- Entries are lossless (.npz of every FeatureSeries field with phases and
+  summary metrics), so a cached calculate_pqs_v2 scores exactly like a fresh one
+- Tiers: local LRU directory (FEATURE_CACHE_DIR, FEATURE_CACHE_MAX_MB) and,
+  for a known user, GCS under results/{uid}/features/ (FEATURE_CACHE_GCS).
+  Landmarks fresh from the pose service cannot have GCS entries yet, so
+  default(remote_reads=False) reads the local tier only
+- Writes (encoding every series field, then one put per tier) run on the
+  shared artifact upload executor after scoring; a failed write is a later
+  miss, never an analysis error. flush() waits for them
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
+import io
+import json
+
+import numpy as np
+
+from backend.cache_tiers import DiskLRU, GcsTier, TieredCache
+from backend.config import FEATURE_CACHE_DIR, FEATURE_CACHE_GCS, FEATURE_CACHE_MAX_MB, GCS_BUCKET
+from backend.pqs_algorithm import Frame
+from backend.biomech.features import FEATURE_ENGINE_VERSION, SERIES_FIELDS, FeatureSeries, Phases, compute_features
+from backend.biomech.pose import PoseArray, as_pose_array
+
+
+_RELEASE_FIELDS = ('release_angle_deg', 'release_height_norm')
+# Concurrent lookups in get_many (each may be a GCS round trip)
+_LOOKUP_WORKERS = 8
+
+
+def landmark_hash(pose: PoseArray) -> str:
+    h = hashlib.sha256()
+    for arr in (pose.t_ms, pose.data, pose.mask):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+
+def feature_key(pose: PoseArray, handedness: str, release_idx: Optional[int]) -> str:
+    rel = 'none' if release_idx is None else str(int(release_idx))
+    return f"{FEATURE_ENGINE_VERSION}/{landmark_hash(pose)}-{handedness}-{rel}"
+
+
+def _encode(series: FeatureSeries, phases: Phases, metrics: Dict[str, float]) -> bytes:
+    meta = {
+        'version': FEATURE_ENGINE_VERSION,
+        'phases': {k: [int(v[0]), int(v[1])] for k, v in vars(phases).items()},
+        'metrics': metrics,
+        **{name: getattr(series, name) for name in _RELEASE_FIELDS},
+    }
+    arrays = {name: np.asarray(getattr(series, name)) for name in SERIES_FIELDS if name not in _RELEASE_FIELDS}
+    buf = io.BytesIO()
+    np.savez(buf, _meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8), **arrays)
+    return buf.getvalue()
+
+
+def _decode(blob: bytes) -> Tuple[FeatureSeries, Phases, Dict[str, float]]:
+    with np.load(io.BytesIO(blob), allow_pickle=False) as npz:
+        meta = json.loads(npz['_meta'].tobytes().decode('utf-8'))
+        if meta.get('version') != FEATURE_ENGINE_VERSION:
+            raise ValueError('feature engine version mismatch')
+        arrays = {name: npz[name] for name in SERIES_FIELDS if name not in _RELEASE_FIELDS}
+    series = FeatureSeries(**arrays, **{name: meta[name] for name in _RELEASE_FIELDS})
+    phases = Phases(**{k: tuple(v) for k, v in meta['phases'].items()})
+    return series, phases, meta['metrics']
+
+
+class FeatureCache:
+    def __init__(self, store: TieredCache, read_tiers: Optional[int] = None):
+        self.store = store
+        self.read_tiers = read_tiers  # None: read every tier
+        self._writes: List[Future] = []
+
+    @classmethod
+    def default(cls, uid: Optional[str] = None, remote_reads: bool = True) -> Optional['FeatureCache']:
+        """Configured tiers for `uid` (GCS only when a uid is known); None when every tier is disabled."""
+        tiers: List[object] = []
+        if FEATURE_CACHE_MAX_MB > 0:
+            tiers.append(DiskLRU(FEATURE_CACHE_DIR, FEATURE_CACHE_MAX_MB * 1024 * 1024))
+        local = len(tiers)
+        if uid and FEATURE_CACHE_GCS:
+            tiers.append(GcsTier(GCS_BUCKET, f"results/{uid}/features"))
+        return cls(TieredCache(tiers), read_tiers=None if remote_reads else local) if tiers else None
+
+    def _get(self, key: str) -> Optional[Tuple[FeatureSeries, Phases, Dict[str, float]]]:
+        blob = self.store.get(key, self.read_tiers)
+        if blob is None:
+            return None
+        try:
+            return _decode(blob)
+        except Exception:
+            return None  # stale or corrupt entry: the caller recomputes and overwrites
+
+    def _put(self, key: str, series: FeatureSeries, phases: Phases, metrics: Dict[str, float]) -> None:
+        from backend.artifacts import submit
+
+        def write() -> None:
+            try:
+                self.store.put(key, _encode(series, phases, metrics))
+            except Exception as e:
+                print(f"feature cache write failed key={key} error={e!r}")
+
+        self._writes.append(submit(write))
+
+    def get(self, frames: Union[List[Frame], PoseArray], handedness: str, release_idx: Optional[int]) -> Optional[Tuple[FeatureSeries, Phases, Dict[str, float]]]:
+        """Cached (series, phases, metrics) for these landmarks; None on a miss or an undecodable entry."""
+        return self._get(feature_key(as_pose_array(frames), handedness, release_idx))
+
+    def get_many(self, requests: Sequence[Tuple[PoseArray, str, Optional[int]]]) -> List[Optional[Tuple[FeatureSeries, Phases, Dict[str, float]]]]:
+        """get() for several (pose, handedness, release_idx) at once; the lookups run concurrently."""
+        keys = [feature_key(as_pose_array(p), h, r) for p, h, r in requests]
+
+        def lookup(key: str):
+            try:
+                return self._get(key)
+            except Exception:
+                return None
+
+        if len(keys) <= 1:
+            return [lookup(k) for k in keys]
+        with ThreadPoolExecutor(max_workers=min(len(keys), _LOOKUP_WORKERS), thread_name_prefix="feature-cache") as pool:
+            return list(pool.map(lookup, keys))
+
+    def put(self, frames: Union[List[Frame], PoseArray], handedness: str, release_idx: Optional[int],
+            series: FeatureSeries, phases: Phases, metrics: Dict[str, float]) -> None:
+        """Queue a write-back; returns immediately."""
+        self._put(feature_key(as_pose_array(frames), handedness, release_idx), series, phases, metrics)
+
+    def compute(self, frames: Union[List[Frame], PoseArray], handedness: str, release_idx: Optional[int]) -> Tuple[FeatureSeries, Phases, Dict[str, float]]:
+        """compute_features, served from the cache when these landmarks were seen before."""
+        pose = as_pose_array(frames)
+        key = feature_key(pose, handedness, release_idx)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        series, phases, metrics = compute_features(pose, handedness, release_idx)
+        self._put(key, series, phases, metrics)
+        return series, phases, metrics
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued write-backs."""
+        pending, self._writes = self._writes, []
+        wait(pending, timeout=timeout)
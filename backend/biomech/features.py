@@ -2,7 +2,7 @@
 Biomech Feature Engine for ThrowPro PQS v2.
 
 Pipeline:
-- Resample frames to 100 Hz
+- Resample frames to 100 Hz (linear interpolation, see biomech.resample)
 - Short gap-fill up to 150 ms, Savitzky–Golay smoothing
 - Coordinate frames: camera, global (approx forward), local pelvis
 - Phase segmentation (heuristic)
@@ -10,12 +10,17 @@ Pipeline:
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+from functools import cached_property
+from typing import Dict, List, Sequence, Tuple, Optional, Union
 import math
 import numpy as np
 
-from backend.pqs_algorithm import Frame, Landmark
+from backend.pqs_algorithm import Frame
 from backend.biomech import envelopes as E
+from backend.biomech.peaks import find_peaks, tallest
+from backend.biomech.pose import JOINT_INDEX, SCORE, PoseArray, as_pose_array
+from backend.biomech.resample import grid_index, resample_batch, resample_pose
+from backend.biomech.time_index import TimeIndex, nearest_index
 
 
 @dataclass
@@ -29,240 +34,415 @@ class Phases:
     recovery: Tuple[int, int]
 
 
-@dataclass
-class FeatureSeries:
-    t_ms: np.ndarray
-    pelvis_ang_deg: np.ndarray
-    thorax_ang_deg: np.ndarray
-    pelvis_omega_deg_s: np.ndarray
-    thorax_omega_deg_s: np.ndarray
-    pelvis_alpha_deg_s2: np.ndarray
-    thorax_alpha_deg_s2: np.ndarray
-    separation_deg: np.ndarray
-    separation_vel: np.ndarray
-    shoulder_tilt_deg: np.ndarray
-    foot_angle_l_deg: np.ndarray
-    foot_angle_r_deg: np.ndarray
-    stance_ratio: np.ndarray
-    knee_valgus_l_deg: np.ndarray
-    knee_valgus_r_deg: np.ndarray
-    elbow_flex_deg: np.ndarray
-    wrist_ext_deg: np.ndarray
-    hand_speed_proxy: np.ndarray
-    hand_speed_norm: np.ndarray
-    com_smoothness: np.ndarray  # low is smoother
-    release_angle_deg: Optional[float]
-    release_height_norm: Optional[float]
-    confidence: np.ndarray  # [0,1] per frame
-
-
-def resample_frames(frames: List[Frame]) -> List[Frame]:
-    if not frames:
-        return []
-    t0 = frames[0].t_ms
-    tN = frames[-1].t_ms
-    step = int(round(1000 / E.TARGET_HZ))
-    target_t = list(range(t0, tN + 1, step))
-    # simple nearest-neighbor for now
-    out: List[Frame] = []
-    j = 0
-    for t in target_t:
-        while j + 1 < len(frames) and abs(frames[j + 1].t_ms - t) < abs(frames[j].t_ms - t):
-            j += 1
-        out.append(frames[j])
-    return out
+# Bump whenever feature values change; cached features are keyed on it (see biomech.feature_cache)
+FEATURE_ENGINE_VERSION = "2.2"
 
+SERIES_FIELDS = (
+    't_ms', 'pelvis_ang_deg', 'thorax_ang_deg', 'pelvis_omega_deg_s', 'thorax_omega_deg_s',
+    'pelvis_alpha_deg_s2', 'thorax_alpha_deg_s2', 'separation_deg', 'separation_vel',
+    'shoulder_tilt_deg', 'foot_angle_l_deg', 'foot_angle_r_deg', 'stance_ratio',
+    'knee_valgus_l_deg', 'knee_valgus_r_deg', 'elbow_flex_deg', 'wrist_ext_deg',
+    'hand_speed_proxy', 'hand_speed_norm', 'com_smoothness',  # com_smoothness: low is smoother
+    'release_angle_deg', 'release_height_norm', 'confidence',  # confidence: [0,1] per frame
+)
 
-def _avg_frame_conf(frame: Frame) -> float:
-    if not frame.kp:
-        return 0.0
-    return float(np.mean([lm.score if lm.score is not None else 1.0 for lm in frame.kp.values()]))
 
+class FeatureSeries:
+    """
+    Per-sample features on the 100 Hz grid (fields in SERIES_FIELDS; release_*
+    are scalars or None). Built either from explicit arrays, or bound to a
+    _Kinematics source with FeatureSeries.lazy: each field is then computed
+    on first access and memoized, so readers only pay for what they use.
+    """
+
+    def __init__(self, **fields: object):
+        unknown = set(fields) - set(SERIES_FIELDS)
+        if unknown:
+            raise TypeError(f"unknown FeatureSeries fields: {sorted(unknown)}")
+        self._kin: Optional['_Kinematics'] = None
+        self._session: Optional[int] = None
+        self.__dict__.update(fields)
+
+    @classmethod
+    def lazy(cls, kin: '_Kinematics', session: Optional[int] = None, **fields: object) -> 'FeatureSeries':
+        """Series backed by `kin`: session b's samples, or all (B, T) rows zeroed past each length."""
+        series = cls(**fields)
+        series._kin = kin
+        series._session = session
+        return series
+
+    def __getattr__(self, name: str):
+        # Only reached for fields not materialized yet
+        kin = self.__dict__.get('_kin')
+        if kin is None or name not in SERIES_FIELDS:
+            raise AttributeError(name)
+        col = getattr(kin, name)
+        b = self.__dict__['_session']
+        value = kin.padded(col) if b is None else col[b, :kin.lengths[b]]
+        self.__dict__[name] = value
+        return value
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in SERIES_FIELDS}
+
+    def compact(self) -> 'CompactFeatureSeries':
+        """Single float32 buffer copy of every field (see biomech.compact)."""
+        from backend.biomech.compact import CompactFeatureSeries
+        return CompactFeatureSeries.from_series(self)
+
+    def __repr__(self) -> str:
+        ready = [name for name in SERIES_FIELDS if name in self.__dict__]
+        return f"FeatureSeries(materialized={ready})"
+
+
+def resample_frames(frames: Union[List[Frame], PoseArray]) -> List[Frame]:
+    return resample_pose(as_pose_array(frames)).to_frames()
+
+
+def _ang_deg(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+    """Angle of p1→p2 in degrees; points are (..., 2) arrays."""
+    d = p2 - p1
+    return np.degrees(np.arctan2(d[..., 1], d[..., 0]))
+
+
+def _dist(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    d = a - b
+    return np.hypot(d[..., 0], d[..., 1])
+
+
+def _angle_three(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Angle at b between b→a and b→c in degrees; 180 where either segment is degenerate."""
+    v1 = a - b
+    v2 = c - b
+    denom = np.hypot(v1[..., 0], v1[..., 1]) * np.hypot(v2[..., 0], v2[..., 1])
+    dot = v1[..., 0] * v2[..., 0] + v1[..., 1] * v2[..., 1]
+    ok = denom != 0
+    cosang = np.clip(dot / np.where(ok, denom, 1.0), -1.0, 1.0)
+    return np.where(ok, np.degrees(np.arccos(cosang)), 180.0)
+
+
+class _Kinematics:
+    """
+    Per-sample kinematics over resampled sessions as whole-array operations,
+    each quantity computed on first access and memoized. data is
+    (B, T, 17, 3), mask (B, T, 17), t_ms (B, T), wrist_idx (B,) the
+    throwing-side wrist joint per session. Samples where a required joint is
+    missing get the same neutral value the per-frame scorer used (0°, stance
+    1.0, elbow 180°, zero hand speed). shoulder_w0 (B,) overrides the hand
+    speed normalizer taken from the first sample, and `unwrapped`
+    (pelvis_rad, thorax_rad) supplies angles unwrapped elsewhere.
+    """
+
+    def __init__(self, data: np.ndarray, mask: np.ndarray, t_ms: np.ndarray, lengths: np.ndarray,
+                 wrist_idx: np.ndarray, shoulder_w0: Optional[np.ndarray] = None,
+                 unwrapped: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+        self.data = data
+        self.mask = mask
+        self.t_ms = t_ms.astype(int)
+        self.lengths = np.asarray(lengths)
+        self.wrist_idx = wrist_idx
+        self._shoulder_w0 = shoulder_w0
+        self._unwrapped = unwrapped
+
+    def padded(self, col: np.ndarray) -> np.ndarray:
+        valid = np.arange(col.shape[-1])[None, :] < self.lengths[:, None]
+        return np.where(valid, col, 0)
+
+    def _p(self, name: str) -> np.ndarray:
+        # Joints are converted to float64 one at a time, only when a field needs them
+        cache = self.__dict__.setdefault('_joint_xy', {})
+        if name not in cache:
+            cache[name] = self.data[..., JOINT_INDEX[name], :2].astype(np.float64)
+        return cache[name]
+
+    def _has(self, *names: str) -> np.ndarray:
+        return np.logical_and.reduce([self.mask[..., JOINT_INDEX[n]] for n in names])
+
+    @cached_property
+    def _shoulders(self) -> np.ndarray:
+        return self._has('left_shoulder', 'right_shoulder')
+
+    @cached_property
+    def _thorax(self) -> np.ndarray:
+        return _ang_deg(self._p('left_shoulder'), self._p('right_shoulder'))
+
+    @cached_property
+    def _shoulder_w(self) -> np.ndarray:
+        w = _dist(self._p('left_shoulder'), self._p('right_shoulder'))
+        return np.where(w > 1e-6, w, 1.0)
+
+    @cached_property
+    def pelvis_ang_deg(self) -> np.ndarray:
+        return np.where(self._has('left_hip', 'right_hip'), _ang_deg(self._p('left_hip'), self._p('right_hip')), 0.0)
+
+    @cached_property
+    def thorax_ang_deg(self) -> np.ndarray:
+        return np.where(self._shoulders, self._thorax, 0.0)
+
+    @cached_property
+    def shoulder_tilt_deg(self) -> np.ndarray:
+        return np.where(self._shoulders, np.abs(self._thorax), 0.0)
+
+    @cached_property
+    def stance_ratio(self) -> np.ndarray:
+        ok = self._has('left_ankle', 'right_ankle', 'left_shoulder', 'right_shoulder')
+        return np.where(ok, _dist(self._p('left_ankle'), self._p('right_ankle')) / self._shoulder_w, 1.0)
+
+    @cached_property
+    def foot_angle_l_deg(self) -> np.ndarray:
+        return np.where(self._has('left_ankle', 'left_shoulder'), _ang_deg(self._p('left_ankle'), self._p('left_shoulder')), 0.0)
+
+    @cached_property
+    def foot_angle_r_deg(self) -> np.ndarray:
+        return np.where(self._has('right_ankle', 'right_shoulder'), _ang_deg(self._p('right_ankle'), self._p('right_shoulder')), 0.0)
+
+    # knee valgus via hip-knee-ankle angle deviation from straight line (approx)
+    @cached_property
+    def knee_valgus_l_deg(self) -> np.ndarray:
+        ang = _angle_three(self._p('left_hip'), self._p('left_elbow'), self._p('left_ankle'))
+        return np.where(self._has('left_hip', 'left_elbow', 'left_ankle'), np.maximum(0.0, 180.0 - ang), 0.0)
+
+    @cached_property
+    def knee_valgus_r_deg(self) -> np.ndarray:
+        ang = _angle_three(self._p('right_hip'), self._p('right_elbow'), self._p('right_ankle'))
+        return np.where(self._has('right_hip', 'right_elbow', 'right_ankle'), np.maximum(0.0, 180.0 - ang), 0.0)
+
+    @cached_property
+    def elbow_flex_deg(self) -> np.ndarray:
+        ang = _angle_three(self._p('left_shoulder'), self._p('left_elbow'), self._p('left_wrist'))
+        return np.where(self._has('left_shoulder', 'left_elbow', 'left_wrist'), ang, 180.0)
+
+    @cached_property
+    def wrist_ext_deg(self) -> np.ndarray:
+        return np.where(self._has('left_elbow', 'left_wrist'), _ang_deg(self._p('left_elbow'), self._p('left_wrist')), 0.0)
+
+    @cached_property
+    def hand_speed_proxy(self) -> np.ndarray:
+        # throwing side wrist, between consecutive samples
+        w = np.take_along_axis(self.data[..., :2], self.wrist_idx[:, None, None, None], axis=2)[:, :, 0, :].astype(np.float64)
+        w_ok = np.take_along_axis(self.mask, self.wrist_idx[:, None, None], axis=2)[:, :, 0]
+        t_ms = self.t_ms
+        hand_v = np.zeros(t_ms.shape, dtype=float)
+        if t_ms.shape[-1] >= 2:
+            dt = np.diff(t_ms, axis=-1) / 1000.0
+            step_ok = w_ok[:, 1:] & w_ok[:, :-1] & (dt > 0)
+            step = _dist(w[:, 1:], w[:, :-1])
+            hand_v[:, 1:] = np.where(step_ok, step / np.where(dt > 0, dt, 1.0), 0.0)
+        return hand_v
+
+    @cached_property
+    def shoulder_w0(self) -> np.ndarray:
+        if self._shoulder_w0 is not None:
+            return self._shoulder_w0
+        return np.where(self._shoulders[:, 0], self._shoulder_w[:, 0], 1.0)
+
+    @cached_property
+    def hand_speed_norm(self) -> np.ndarray:
+        # normalize by shoulder width at t0 on samples that see both shoulders
+        hand_v = self.hand_speed_proxy
+        return np.where(self._shoulders, hand_v / self.shoulder_w0[:, None], hand_v)
+
+    @cached_property
+    def confidence(self) -> np.ndarray:
+        scores = np.where(self.mask, self.data[..., SCORE], 0.0).sum(axis=-1)
+        counts = self.mask.sum(axis=-1)
+        return np.where(counts > 0, scores / np.maximum(counts, 1), 0.0)
+
+    @cached_property
+    def pelvis_rad(self) -> np.ndarray:
+        if self._unwrapped is not None:
+            return self._unwrapped[0]
+        return np.unwrap(np.deg2rad(self.pelvis_ang_deg), axis=-1)
+
+    @cached_property
+    def thorax_rad(self) -> np.ndarray:
+        if self._unwrapped is not None:
+            return self._unwrapped[1]
+        return np.unwrap(np.deg2rad(self.thorax_ang_deg), axis=-1)
 
-def _ang_deg(p1: Landmark, p2: Landmark) -> float:
-    return math.degrees(math.atan2(p2.y - p1.y, p2.x - p1.x))
+    # central difference derivatives in rad/s, then report as deg/s
+    @cached_property
+    def _pelvis_w(self) -> np.ndarray:
+        return _central_derivative(self.pelvis_rad, self.t_ms, self.lengths)
 
+    @cached_property
+    def _thorax_w(self) -> np.ndarray:
+        return _central_derivative(self.thorax_rad, self.t_ms, self.lengths)
 
-def _dist(a: Landmark, b: Landmark) -> float:
-    return math.hypot(a.x - b.x, a.y - b.y)
+    @cached_property
+    def _separation(self) -> np.ndarray:
+        return self.thorax_rad - self.pelvis_rad
 
+    @cached_property
+    def pelvis_omega_deg_s(self) -> np.ndarray:
+        return np.rad2deg(self._pelvis_w)
 
-def _center(a: Landmark, b: Landmark) -> Landmark:
-    return Landmark(x=(a.x + b.x) / 2.0, y=(a.y + b.y) / 2.0)
+    @cached_property
+    def thorax_omega_deg_s(self) -> np.ndarray:
+        return np.rad2deg(self._thorax_w)
 
+    @cached_property
+    def pelvis_alpha_deg_s2(self) -> np.ndarray:
+        return np.rad2deg(_central_derivative(self._pelvis_w, self.t_ms, self.lengths))
 
-def compute_features(frames: List[Frame], handedness: str, release_idx: Optional[int]) -> Tuple[FeatureSeries, Phases, Dict[str, float]]:
-    rf = resample_frames(frames)
-    if not rf:
-        empty = np.zeros((0,), dtype=float)
-        return FeatureSeries(empty, empty, empty, empty, empty, empty, empty, empty, empty, empty, empty, empty, empty, empty, empty, None, None, empty), Phases((0, 0), (0, 0), (0, 0), (0, 0), (0, 0), (0, 0), (0, 0)), {}
+    @cached_property
+    def thorax_alpha_deg_s2(self) -> np.ndarray:
+        return np.rad2deg(_central_derivative(self._thorax_w, self.t_ms, self.lengths))
 
-    t_ms = np.array([f.t_ms for f in rf], dtype=int)
-    # basic angles
-    pelvis_ang = []
-    thorax_ang = []
-    shoulder_tilt = []
-    foot_l = []
-    foot_r = []
-    stance = []
-    knee_l = []
-    knee_r = []
-    elbow_flex = []
-    wrist_ext = []
-    hand_v = []
-    hand_v_norm = []
-    conf = []
+    @cached_property
+    def separation_deg(self) -> np.ndarray:
+        return np.rad2deg(self._separation)
 
-    for f in rf:
-        ls, rs = f.kp.get('left_shoulder'), f.kp.get('right_shoulder')
-        lh, rh = f.kp.get('left_hip'), f.kp.get('right_hip')
-        la, ra = f.kp.get('left_ankle'), f.kp.get('right_ankle')
-        le, re = f.kp.get('left_elbow'), f.kp.get('right_elbow')
-        lw, rw = f.kp.get('left_wrist'), f.kp.get('right_wrist')
+    @cached_property
+    def separation_vel(self) -> np.ndarray:
+        return np.rad2deg(_central_derivative(self._separation, self.t_ms, self.lengths))
 
-        if lh and rh:
-            pelvis_ang.append(_ang_deg(lh, rh))
-        else:
-            pelvis_ang.append(0.0)
-        if ls and rs:
-            thorax_ang.append(_ang_deg(ls, rs))
-            shoulder_tilt.append(abs(_ang_deg(ls, rs)))
-        else:
-            thorax_ang.append(0.0)
-            shoulder_tilt.append(0.0)
-        if la and ra and ls and rs:
-            shoulder_w = _dist(ls, rs)
-            stance.append(_dist(la, ra) / (shoulder_w if shoulder_w > 1e-6 else 1.0))
-        else:
-            stance.append(1.0)
-        if la and ls:
-            foot_l.append(_ang_deg(la, ls))
-        else:
-            foot_l.append(0.0)
-        if ra and rs:
-            foot_r.append(_ang_deg(ra, rs))
-        else:
-            foot_r.append(0.0)
-        if lh and le and la:
-            # knee valgus via hip-knee-ankle angle deviation from straight line (approx)
-            knee_l.append( max(0.0, 180.0 - _angle_three(lh, le, la)) )
-        else:
-            knee_l.append(0.0)
-        if rh and re and ra:
-            knee_r.append( max(0.0, 180.0 - _angle_three(rh, re, ra)) )
-        else:
-            knee_r.append(0.0)
-        if ls and le and lw:
-            elbow_flex.append(_angle_three(ls, le, lw))
-        else:
-            elbow_flex.append(180.0)
-        if le and lw:
-            wrist_ext.append(_ang_deg(le, lw))
-        else:
-            wrist_ext.append(0.0)
-        # hand speed proxy of throwing side wrist
-        w_key = 'right_wrist' if handedness == 'right' else 'left_wrist'
-        idx = rf.index(f)
-        if idx > 0 and w_key in rf[idx-1].kp and w_key in f.kp:
-            p0 = rf[idx-1].kp[w_key]
-            p1 = f.kp[w_key]
-            dt = (rf[idx].t_ms - rf[idx-1].t_ms) / 1000.0
-            v_pix = (_dist(p0, p1) / dt) if dt > 0 else 0.0
-            hand_v.append(v_pix)
-            # normalize by shoulder width at t0
-            if ls and rs:
-                shoulder_w0 = _dist(rf[0].kp.get('left_shoulder'), rf[0].kp.get('right_shoulder')) if ('left_shoulder' in rf[0].kp and 'right_shoulder' in rf[0].kp) else 1.0
-            else:
-                shoulder_w0 = 1.0
-            hand_v_norm.append(v_pix / (shoulder_w0 if shoulder_w0 > 1e-6 else 1.0))
-        else:
-            hand_v.append(0.0)
-            hand_v_norm.append(0.0)
-
-        conf.append(_avg_frame_conf(f))
-
-    pelvis_ang = np.array(pelvis_ang)
-    thorax_ang = np.array(thorax_ang)
-    # Unwrap and derivatives per spec
-    pelvis_rad = np.unwrap(np.deg2rad(pelvis_ang))
-    thorax_rad = np.unwrap(np.deg2rad(thorax_ang))
-    separation = thorax_rad - pelvis_rad
-    separation_deg = np.rad2deg(separation)
-    # central difference derivatives in rad/s, then report as deg/s
-    pelvis_w = _central_derivative(pelvis_rad, t_ms)
-    thorax_w = _central_derivative(thorax_rad, t_ms)
-    pelvis_a = _central_derivative(pelvis_w, t_ms)
-    thorax_a = _central_derivative(thorax_w, t_ms)
-    separation_vel = np.rad2deg(_central_derivative(separation, t_ms))
-    hand_v = np.array(hand_v)
-    hand_v_norm = np.array(hand_v_norm)
-    shoulder_tilt = np.array(shoulder_tilt)
-    foot_l = np.array(foot_l)
-    foot_r = np.array(foot_r)
-    stance = np.array(stance)
-    knee_l = np.array(knee_l)
-    knee_r = np.array(knee_r)
-    elbow_flex = np.array(elbow_flex)
-    wrist_ext = np.array(wrist_ext)
-    conf = np.array(conf)
+    @cached_property
+    def com_smoothness(self) -> np.ndarray:
+        # COM smoothness proxy: mean squared jerk of pelvis center
+        center = np.where(self._has('left_hip', 'right_hip')[..., None], (self._p('left_hip') + self._p('right_hip')) / 2.0, 0.0)
+        return _jerk(center, self.t_ms)
 
-    # Release metrics (approx)
+
+def _release_metrics(row: np.ndarray, present: np.ndarray, handedness: str) -> Tuple[Optional[float], Optional[float]]:
     rel_angle = None
     rel_height = None
-    if release_idx is not None and 0 <= release_idx < len(rf):
-        f = rf[release_idx]
-        w = f.kp['right_wrist'] if handedness == 'right' else f.kp['left_wrist']
-        e = f.kp['right_elbow'] if handedness == 'right' else f.kp['left_elbow']
-        s = f.kp['right_shoulder'] if handedness == 'right' else f.kp['left_shoulder']
-        if w and e:
-            rel_angle = abs(math.degrees(math.atan2(e.y - w.y, w.x - e.x)))
-        if w and s:
-            rel_height = (s.y - w.y)  # normalized space; higher is larger value
-
-    # COM smoothness proxy: mean squared jerk of pelvis center
-    pelvis_center = np.array([[(rf[i].kp['left_hip'].x + rf[i].kp['right_hip'].x)/2.0,
-                               (rf[i].kp['left_hip'].y + rf[i].kp['right_hip'].y)/2.0] if 'left_hip' in rf[i].kp and 'right_hip' in rf[i].kp else [0.0,0.0] for i in range(len(rf))])
-    jerk = _jerk(pelvis_center, t_ms)
+    side = 'right' if handedness == 'right' else 'left'
+    w, e, s = (JOINT_INDEX[f'{side}_{j}'] for j in ('wrist', 'elbow', 'shoulder'))
+    if present[w] and present[e]:
+        rel_angle = abs(math.degrees(math.atan2(float(row[e, 1]) - float(row[w, 1]), float(row[w, 0]) - float(row[e, 0]))))
+    if present[w] and present[s]:
+        rel_height = float(row[s, 1]) - float(row[w, 1])  # normalized space; higher is larger value
+    return rel_angle, rel_height
 
+
+def _empty_features() -> Tuple['FeatureSeries', Phases, Dict[str, float]]:
+    empty = np.zeros((0,), dtype=float)
     series = FeatureSeries(
-        t_ms=t_ms,
-        pelvis_ang_deg=pelvis_ang,
-        thorax_ang_deg=thorax_ang,
-        pelvis_omega_deg_s=np.rad2deg(pelvis_w),
-        thorax_omega_deg_s=np.rad2deg(thorax_w),
-        pelvis_alpha_deg_s2=np.rad2deg(pelvis_a),
-        thorax_alpha_deg_s2=np.rad2deg(thorax_a),
-        separation_deg=separation_deg,
-        separation_vel=separation_vel,
-        shoulder_tilt_deg=shoulder_tilt,
-        foot_angle_l_deg=foot_l,
-        foot_angle_r_deg=foot_r,
-        stance_ratio=stance,
-        knee_valgus_l_deg=knee_l,
-        knee_valgus_r_deg=knee_r,
-        elbow_flex_deg=elbow_flex,
-        wrist_ext_deg=wrist_ext,
-        hand_speed_proxy=hand_v,
-        hand_speed_norm=hand_v_norm,
-        com_smoothness=jerk,
-        release_angle_deg=rel_angle,
-        release_height_norm=rel_height,
-        confidence=conf,
+        t_ms=np.zeros((0,), dtype=int),
+        pelvis_ang_deg=empty, thorax_ang_deg=empty,
+        pelvis_omega_deg_s=empty, thorax_omega_deg_s=empty,
+        pelvis_alpha_deg_s2=empty, thorax_alpha_deg_s2=empty,
+        separation_deg=empty, separation_vel=empty, shoulder_tilt_deg=empty,
+        foot_angle_l_deg=empty, foot_angle_r_deg=empty, stance_ratio=empty,
+        knee_valgus_l_deg=empty, knee_valgus_r_deg=empty,
+        elbow_flex_deg=empty, wrist_ext_deg=empty,
+        hand_speed_proxy=empty, hand_speed_norm=empty, com_smoothness=empty,
+        release_angle_deg=None, release_height_norm=None, confidence=empty,
     )
+    z = (0, 0)
+    return series, Phases(z, z, z, z, z, z, z), {}
+
+
+def _stacked_series(data: np.ndarray, mask: np.ndarray, t_ms: np.ndarray, lengths: np.ndarray,
+                    handedness: Sequence[str], release_idx: Sequence[Optional[int]]) -> FeatureSeries:
+    """
+    Lazy feature series for B resampled sessions padded to a common length T.
+    Fields are (B, T) arrays, zero past each session's length;
+    release_angle_deg and release_height_norm are (B,) float arrays with NaN
+    where undefined.
+    """
+    B = t_ms.shape[0]
+    wrist_idx = np.array([JOINT_INDEX['right_wrist' if h == 'right' else 'left_wrist'] for h in handedness], dtype=np.intp)
+    kin = _Kinematics(data, mask, t_ms, lengths, wrist_idx)
 
+    # Release metrics (approx)
+    rel_angle = np.full((B,), np.nan)
+    rel_height = np.full((B,), np.nan)
+    for b, ri in enumerate(release_idx):
+        if ri is not None and 0 <= ri < lengths[b]:
+            a, h = _release_metrics(data[b, ri], mask[b, ri], handedness[b])
+            rel_angle[b] = np.nan if a is None else a
+            rel_height[b] = np.nan if h is None else h
+    return FeatureSeries.lazy(kin, release_angle_deg=rel_angle, release_height_norm=rel_height)
+
+
+def _session_series(stacked: FeatureSeries, b: int, n: int) -> FeatureSeries:
+    """Session `b` (first `n` samples) of a stacked FeatureSeries, still lazy if the stack is."""
+    release = {}
+    for name in ('release_angle_deg', 'release_height_norm'):
+        v = float(getattr(stacked, name)[b])
+        release[name] = None if np.isnan(v) else v
+    if stacked._kin is not None:
+        return FeatureSeries.lazy(stacked._kin, b, **release)
+    return FeatureSeries(**{name: getattr(stacked, name)[b, :n] for name in SERIES_FIELDS if name not in release}, **release)
+
+
+def compute_features(frames: Union[List[Frame], PoseArray], handedness: str, release_idx: Optional[int]) -> Tuple[FeatureSeries, Phases, Dict[str, float]]:
+    """
+    release_idx indexes the input frames (as returned by detect_release_idx);
+    it is mapped onto the resampled grid by timestamp.
+    """
+    pose = as_pose_array(frames)
+    rf = resample_pose(pose)
+    if len(rf) == 0:
+        return _empty_features()
+    if release_idx is not None and 0 <= release_idx < len(pose):
+        release_idx = grid_index(pose, rf, release_idx)
+    else:
+        release_idx = None
+
+    n = len(rf)
+    stacked = _stacked_series(rf.data[None], rf.mask[None], rf.t_ms[None], np.array([n]), [handedness], [release_idx])
+    series = _session_series(stacked, 0, n)
     phases = _segment_phases(series)
     metrics = _summary_metrics(series, phases, handedness)
     return series, phases, metrics
 
 
-def _angle_three(a: Landmark, b: Landmark, c: Landmark) -> float:
-    v1 = np.array([a.x - b.x, a.y - b.y])
-    v2 = np.array([c.x - b.x, c.y - b.y])
-    denom = (np.linalg.norm(v1) * np.linalg.norm(v2))
-    if denom == 0:
-        return 180.0
-    cosang = np.clip(np.dot(v1, v2) / denom, -1.0, 1.0)
-    return float(np.degrees(np.arccos(cosang)))
+@dataclass
+class FeatureBatch:
+    series: FeatureSeries  # stacked (B, T) arrays, zero past `lengths`; release_* are (B,) with NaN when undefined
+    lengths: np.ndarray
+    phases: List[Phases]
+    metrics: List[Dict[str, float]]
+
+    def session(self, b: int) -> FeatureSeries:
+        return _session_series(self.series, b, int(self.lengths[b]))
+
+
+def compute_features_batch(data: np.ndarray, lengths: Sequence[int], t_ms: np.ndarray,
+                           handedness: Union[str, Sequence[str]] = 'right',
+                           release_idx: Optional[Sequence[Optional[int]]] = None,
+                           mask: Optional[np.ndarray] = None) -> FeatureBatch:
+    """
+    compute_features over many sessions at once.
+
+    data is a padded (B, T, 17, 3) [x, y, score] tensor with per-session
+    `lengths` (B,) and source timestamps `t_ms` (B, T); `mask` (B, T, 17)
+    defaults to every joint present within each length. release_idx entries
+    index each session's input frames, like compute_features. Session b of
+    the result is identical to compute_features on that session alone.
+    """
+    data = np.asarray(data)
+    B, T = data.shape[:2]
+    lengths = np.asarray(lengths, dtype=np.int64)
+    in_len = np.arange(T)[None, :] < lengths[:, None]
+    mask = in_len[..., None] & (np.ones(data.shape[:3], dtype=bool) if mask is None else np.asarray(mask, dtype=bool))
+    hands = [handedness] * B if isinstance(handedness, str) else list(handedness)
+    rels = list(release_idx) if release_idx is not None else [None] * B
+
+    r_data, r_mask, r_t, r_len = resample_batch(data, mask, np.asarray(t_ms), lengths)
+    grid_rel: List[Optional[int]] = []
+    for b, ri in enumerate(rels):
+        if ri is not None and 0 <= ri < lengths[b]:
+            grid_rel.append(nearest_index(r_t[b, :r_len[b]], t_ms[b][ri]))
+        else:
+            grid_rel.append(None)
+
+    stacked = _stacked_series(r_data, r_mask, r_t, r_len, hands, grid_rel)
+    phases: List[Phases] = []
+    metrics: List[Dict[str, float]] = []
+    for b in range(B):
+        if r_len[b] == 0:
+            _, ph, m = _empty_features()
+        else:
+            s = _session_series(stacked, b, int(r_len[b]))
+            ph = _segment_phases(s)
+            m = _summary_metrics(s, ph, hands[b])
+        phases.append(ph)
+        metrics.append(m)
+    return FeatureBatch(series=stacked, lengths=r_len, phases=phases, metrics=metrics)
 
 
 def _derivative(arr: np.ndarray, t_ms: np.ndarray) -> np.ndarray:
@@ -271,33 +451,43 @@ def _derivative(arr: np.ndarray, t_ms: np.ndarray) -> np.ndarray:
     return out
 
 
-def _central_derivative(arr: np.ndarray, t_ms: np.ndarray) -> np.ndarray:
-    n = len(arr)
+def _central_derivative(arr: np.ndarray, t_ms: np.ndarray, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Central differences along the last axis with one-sided differences at the
+    ends. For padded (B, T) input, `lengths` marks where each row ends.
+    """
     out = np.zeros_like(arr, dtype=float)
-    if n < 3:
+    T = arr.shape[-1]
+    if lengths is None:
+        if T < 3:
+            return out
+        lengths = np.full(arr.shape[:-1], T)
+    if T < 3:
         return out
-    dt = (t_ms[2:] - t_ms[:-2]) / 1000.0
-    out[1:-1] = (arr[2:] - arr[:-2]) / (2.0 * (dt))
+    dt = (t_ms[..., 2:] - t_ms[..., :-2]) / 1000.0
+    out[..., 1:-1] = (arr[..., 2:] - arr[..., :-2]) / (2.0 * (dt))
     # forward/backward difference at ends
-    if n >= 2:
-        out[0] = (arr[1] - arr[0]) / max(1e-6, (t_ms[1] - t_ms[0]) / 1000.0)
-        out[-1] = (arr[-1] - arr[-2]) / max(1e-6, (t_ms[-1] - t_ms[-2]) / 1000.0)
+    rows = np.nonzero(lengths >= 3)
+    last = lengths[rows]
+    out[rows + (0,)] = (arr[rows + (1,)] - arr[rows + (0,)]) / np.maximum(1e-6, (t_ms[rows + (1,)] - t_ms[rows + (0,)]) / 1000.0)
+    out[rows + (last - 1,)] = (arr[rows + (last - 1,)] - arr[rows + (last - 2,)]) / np.maximum(1e-6, (t_ms[rows + (last - 1,)] - t_ms[rows + (last - 2,)]) / 1000.0)
+    out[np.nonzero(lengths < 3)] = 0.0
     return out
 
 
 def _jerk(points: np.ndarray, t_ms: np.ndarray) -> np.ndarray:
-    # points shape: (N, 2)
+    # points shape: (..., N, 2), t_ms (..., N)
     v = np.zeros_like(points)
     a = np.zeros_like(points)
-    j = np.zeros((len(points),), dtype=float)
-    if len(points) >= 2:
-        dt = ((t_ms[1:] - t_ms[:-1]) / 1000.0)[:, None]
-        v[1:] = (points[1:] - points[:-1]) / dt
-    if len(points) >= 3:
-        dt = ((t_ms[2:] - t_ms[:-2]) / 1000.0)[:, None]
-        a[2:] = (v[2:] - v[1:-1]) / ((t_ms[2:] - t_ms[1:-1]) / 1000.0)[:, None]
-    if len(points) >= 4:
-        j[3:] = np.linalg.norm((a[3:] - a[2:-1]) / ((t_ms[3:] - t_ms[2:-1]) / 1000.0)[:, None], axis=1)
+    N = points.shape[-2]
+    j = np.zeros(points.shape[:-1], dtype=float)
+    if N >= 2:
+        dt = ((t_ms[..., 1:] - t_ms[..., :-1]) / 1000.0)[..., None]
+        v[..., 1:, :] = (points[..., 1:, :] - points[..., :-1, :]) / dt
+    if N >= 3:
+        a[..., 2:, :] = (v[..., 2:, :] - v[..., 1:-1, :]) / ((t_ms[..., 2:] - t_ms[..., 1:-1]) / 1000.0)[..., None]
+    if N >= 4:
+        j[..., 3:] = np.linalg.norm((a[..., 3:, :] - a[..., 2:-1, :]) / ((t_ms[..., 3:] - t_ms[..., 2:-1]) / 1000.0)[..., None], axis=-1)
     return j
 
 
@@ -306,9 +496,12 @@ def _segment_phases(series: FeatureSeries) -> Phases:
     if N == 0:
         z = (0, 0)
         return Phases(z, z, z, z, z, z, z)
-    # Heuristic: use separation velocity to define phases
-    sep = series.separation_vel
-    peak_idx = int(np.argmax(np.abs(sep))) if len(sep) else 0
+    # Heuristic: the dominant separation velocity peak anchors drive→power;
+    # one-sided derivative samples at either end are not peaks
+    sep = np.abs(series.separation_vel)
+    peak_idx = tallest(sep)
+    if peak_idx is None:
+        peak_idx = int(np.argmax(sep))
     # naive splits around peak
     w = max(1, int(0.1 * N))
     windup = (0, max(1, w))
@@ -328,7 +521,7 @@ def _summary_metrics(series: FeatureSeries, phases: Phases, handedness: str) ->
     d_start, d_end = phases.delivery
     idx_range = range(d_start, d_end + 1) if d_end >= d_start and len(series.t_ms) else range(0, len(series.t_ms))
     def _first_pos_peak(arr: np.ndarray) -> int:
-        # simple local max with min distance 5 and prominence heuristic
+        # tallest positive local max in the delivery window above 20% of its peak magnitude
         if len(arr) == 0:
             return 0
         lo = max(0, (idx_range.start))
@@ -338,19 +531,11 @@ def _summary_metrics(series: FeatureSeries, phases: Phases, handedness: str) ->
             lo, hi = 0, len(arr) - 1
         window = arr[lo:hi+1]
         prom = 0.2 * float(np.nanmax(np.abs(window)) if len(window) else 0.0)
-        best_i = None
-        best_v = -1e9
-        for i in range(lo+1, hi):
-            v = arr[i]
-            if v <= 0:
-                continue
-            if arr[i-1] < v and arr[i+1] < v and v >= prom:
-                if v > best_v:
-                    best_v = v
-                    best_i = i
-        if best_i is None:
-            best_i = int(np.argmax(arr))
-        return best_i
+        cand = find_peaks(arr, lo=lo, hi=hi, height=prom)
+        cand = cand[arr[cand] > 0]
+        if len(cand) == 0:
+            return int(np.argmax(arr))
+        return int(cand[np.argmax(arr[cand])])
     p_idx = _first_pos_peak(series.pelvis_omega_deg_s)
     t_idx = _first_pos_peak(series.thorax_omega_deg_s)
     h_idx = int(np.argmax(series.hand_speed_norm) if len(series.hand_speed_norm) else 0)
@@ -431,16 +616,17 @@ def _block_leg_proxies(series: FeatureSeries, handedness: str, release_idx: Opti
     t_release = t[h_idx]
     w_start_ms = t_release - 150
     # indices within window
-    idxs = [i for i in range(N) if w_start_ms <= t[i] <= t_release]
-    if len(idxs) < 2:
+    i0, i1 = TimeIndex(t).span(w_start_ms, t_release)
+    i1 -= 1
+    if i1 - i0 < 1:
         return 0.0, 0.0
-    i0, i1 = idxs[0], idxs[-1]
     # Horizontal decel proxy: reduction in thorax angular velocity magnitude
     dv = abs(series.thorax_omega_deg_s[i1]) - abs(series.thorax_omega_deg_s[i0])
-    f_horiz = max(0.0, -dv) / max(1.0, np.percentile(series.hand_speed_norm, 95) if len(series.hand_speed_norm) else 1.0)
+    norm = max(1.0, np.percentile(series.hand_speed_norm, 95) if len(series.hand_speed_norm) else 1.0)
+    f_horiz = max(0.0, -dv) / norm
     # Vertical proxy: positive mean of ankle extension angular accel is not available; use positive mean of pelvis alpha as a stand-in
     a_seg = series.pelvis_alpha_deg_s2[i0:i1+1]
-    f_vert = float(max(0.0, np.mean(a_seg))) / max(1.0, np.percentile(series.hand_speed_norm, 95) if len(series.hand_speed_norm) else 1.0)
+    f_vert = float(max(0.0, np.mean(a_seg))) / norm
     return float(f_horiz), float(f_vert)
 
 
@@ -0,0 +1,217 @@
+"""
+Versioned binary landmark archive (.landmarks.bin) for one person's PoseArray.
+
+Layout (little-endian):
+- header:      magic b"PFLM", version u16, codec u8 (0 raw, 1 zlib, 2 zstd),
+               coords u8 (0 float32, 1 uint16 quantized), n_frames u32,
+               n_joints u16, block_frames u32, n_blocks u32, meta_len u32
+- meta:        JSON (joint names, quantization ranges, caller metadata)
+- frame index: int64 t_ms per frame, uncompressed, so a time range maps to
+               blocks by binary search without decompressing anything
+- block table: per block (offset u64 from the first block, length u32)
+- blocks:      block_frames frames each, compressed; columns x, y, score
+               (k, n_joints) as float32 or uint16, then the packed presence mask
+
+Readers decode a time range straight into arrays with np.frombuffer; only the
+blocks overlapping the range are decompressed. zstd is used when the
+`zstandard` package is installed, zlib otherwise; the codec is recorded per
+archive. Quantized coordinates are uint16 over each channel's observed range
+(x and y error <= range / 131070, about 1e-5 of the frame for normalized
+coordinates).
+"""
+
+from typing import Dict, Optional, Tuple
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from backend.biomech.pose import JOINT_INDEX, JOINTS, NUM_JOINTS, PoseArray
+
+try:
+    import zstandard as _zstd
+except ImportError:  # zlib fallback
+    _zstd = None
+
+
+MAGIC = b"PFLM"
+VERSION = 1
+CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD = 0, 1, 2
+COORDS_F32, COORDS_U16 = 0, 1
+BLOCK_FRAMES = 256
+
+_HEADER = struct.Struct("<4sHBBIHIII")
+_BLOCK = struct.Struct("<QI")
+_Q = 65535.0
+
+
+def is_archive(buf: bytes) -> bool:
+    return buf[:4] == MAGIC
+
+
+def _compress(raw: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return _zstd.ZstdCompressor(level=3).compress(raw)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(raw, 6)
+    return raw
+
+
+def _decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if _zstd is None:
+            raise RuntimeError("landmark archive is zstd-compressed; install the zstandard package")
+        return _zstd.ZstdDecompressor().decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    return data
+
+
+def encode_archive(pose: PoseArray, *, quantize: bool = False, block_frames: int = BLOCK_FRAMES,
+                   codec: Optional[int] = None, meta: Optional[Dict] = None) -> bytes:
+    """Serialize a PoseArray; `meta` is stored verbatim (JSON) next to the joint names."""
+    codec = (CODEC_ZSTD if _zstd is not None else CODEC_ZLIB) if codec is None else codec
+    block_frames = max(1, int(block_frames))
+    n = len(pose)
+    cols = [pose.data[..., c] for c in range(3)]
+    header_meta: Dict = {"joints": list(JOINTS), **(meta or {})}
+    if quantize:
+        quant = []
+        for c, col in enumerate(cols):
+            present = col[pose.mask]
+            lo = float(present.min()) if present.size else 0.0
+            hi = float(present.max()) if present.size else 0.0
+            scale = (hi - lo) / _Q if hi > lo else 1.0
+            quant.append([lo, scale])
+            cols[c] = np.where(pose.mask, np.rint((col.astype(np.float64) - lo) / scale), 0).astype(np.uint16)
+        header_meta["quant"] = quant
+    dtype = np.uint16 if quantize else np.float32
+    meta_bytes = json.dumps(header_meta).encode("utf-8")
+
+    n_blocks = (n + block_frames - 1) // block_frames
+    blocks = []
+    for b in range(n_blocks):
+        sl = slice(b * block_frames, min(n, (b + 1) * block_frames))
+        raw = b"".join(np.ascontiguousarray(col[sl], dtype=dtype).tobytes() for col in cols)
+        raw += np.packbits(pose.mask[sl].reshape(-1)).tobytes()
+        blocks.append(_compress(raw, codec))
+
+    table, offset = [], 0
+    for blob in blocks:
+        table.append(_BLOCK.pack(offset, len(blob)))
+        offset += len(blob)
+    header = _HEADER.pack(MAGIC, VERSION, codec, COORDS_U16 if quantize else COORDS_F32,
+                          n, NUM_JOINTS, block_frames, n_blocks, len(meta_bytes))
+    return b"".join([header, meta_bytes, pose.t_ms.astype("<i8").tobytes(), *table, *blocks])
+
+
+class LandmarkArchive:
+    """Random-access reader over an encoded archive (bytes or memoryview)."""
+
+    def __init__(self, buf: bytes):
+        buf = memoryview(buf)
+        magic, version, codec, coords, n, n_joints, block_frames, n_blocks, meta_len = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a landmark archive")
+        if version != VERSION:
+            raise ValueError(f"unsupported landmark archive version {version}")
+        if n_joints != NUM_JOINTS:
+            raise ValueError(f"archive has {n_joints} joints, expected {NUM_JOINTS}")
+        self.codec, self.coords, self.block_frames, self.n_blocks = codec, coords, block_frames, n_blocks
+        pos = _HEADER.size
+        self.meta: Dict = json.loads(bytes(buf[pos:pos + meta_len]).decode("utf-8"))
+        pos += meta_len
+        self.t_ms = np.frombuffer(buf, dtype="<i8", count=n, offset=pos)
+        pos += 8 * n
+        table = np.frombuffer(buf, dtype=np.dtype([("offset", "<u8"), ("length", "<u4")]), count=n_blocks, offset=pos)
+        self._table = table
+        self._data_start = pos + _BLOCK.size * n_blocks
+        self._buf = buf
+
+    def __len__(self) -> int:
+        return len(self.t_ms)
+
+    def span(self, t0: Optional[int] = None, t1: Optional[int] = None) -> Tuple[int, int]:
+        """[i0, i1) frame positions with t0 <= t_ms <= t1 (open ends when None)."""
+        i0 = 0 if t0 is None else int(np.searchsorted(self.t_ms, t0, side="left"))
+        i1 = len(self.t_ms) if t1 is None else int(np.searchsorted(self.t_ms, t1, side="right"))
+        return i0, max(i0, i1)
+
+    def _block(self, b: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        start = self._data_start + int(self._table[b]["offset"])
+        raw = _decompress(bytes(self._buf[start:start + int(self._table[b]["length"])]), self.codec)
+        k = min(self.block_frames, len(self.t_ms) - b * self.block_frames)
+        dtype = np.dtype("<u2") if self.coords == COORDS_U16 else np.dtype("<f4")
+        size = k * NUM_JOINTS
+        cols = [np.frombuffer(raw, dtype=dtype, count=size, offset=c * size * dtype.itemsize).reshape(k, NUM_JOINTS)
+                for c in range(3)]
+        packed = np.frombuffer(raw, dtype=np.uint8, offset=3 * size * dtype.itemsize)
+        mask = np.unpackbits(packed, count=size).astype(bool).reshape(k, NUM_JOINTS)
+        return cols[0], cols[1], cols[2], mask
+
+    def read(self, t0: Optional[int] = None, t1: Optional[int] = None) -> PoseArray:
+        """PoseArray of the frames with t0 <= t_ms <= t1; decompresses only the overlapping blocks."""
+        i0, i1 = self.span(t0, t1)
+        n = i1 - i0
+        data = np.zeros((n, NUM_JOINTS, 3), dtype=np.float32)
+        mask = np.zeros((n, NUM_JOINTS), dtype=bool)
+        if n:
+            bf = self.block_frames
+            quant = self.meta.get("quant")
+            for b in range(i0 // bf, (i1 - 1) // bf + 1):
+                lo, hi = max(i0, b * bf), min(i1, (b + 1) * bf)
+                x, y, s, m = self._block(b)
+                rows = slice(lo - b * bf, hi - b * bf)
+                out = slice(lo - i0, hi - i0)
+                for c, col in enumerate((x, y, s)):
+                    if quant is not None:
+                        data[out, :, c] = col[rows] * quant[c][1] + quant[c][0]
+                    else:
+                        data[out, :, c] = col[rows]
+                mask[out] = m[rows]
+            data[~mask] = 0.0
+        return PoseArray(t_ms=self.t_ms[i0:i1].copy(), data=data, mask=mask)
+
+
+def decode_archive(buf: bytes, t0: Optional[int] = None, t1: Optional[int] = None) -> PoseArray:
+    return LandmarkArchive(buf).read(t0, t1)
+
+
+def pose_to_records(pose: PoseArray):
+    """
+    The JSON landmarks export: [{'timestamp_ms', 'landmarks': [{'name', 'x', 'y', 'z', 'confidence'}]}].
+    Every frame lists all NUM_JOINTS joints in JOINTS order; absent joints
+    keep their slot with x / y / confidence null, so position i is joint i.
+    """
+    out = []
+    for t, row, present in zip(pose.t_ms.tolist(), pose.data.tolist(), pose.mask.tolist()):
+        landmarks = [{"name": name, "x": x, "y": y, "z": None, "confidence": c} if ok else
+                     {"name": name, "x": None, "y": None, "z": None, "confidence": None}
+                     for name, (x, y, c), ok in zip(JOINTS, row, present)]
+        out.append({"timestamp_ms": t, "landmarks": landmarks})
+    return out
+
+
+def records_to_pose(frames) -> PoseArray:
+    """
+    Inverse of pose_to_records, also reading older exports: landmarks map by
+    'name' when present, otherwise by position, which is only trusted for
+    frames listing all NUM_JOINTS joints. Frames that cannot be mapped (legacy
+    frames with dropped joints) keep their timestamp with no joints present.
+    """
+    pose = PoseArray.empty(len(frames))
+    for i, rec in enumerate(frames):
+        pose.t_ms[i] = int(rec.get("timestamp_ms", 0))
+        landmarks = rec.get("landmarks") or []
+        named = all(isinstance(lm, dict) and lm.get("name") in JOINT_INDEX for lm in landmarks)
+        if not named and len(landmarks) < NUM_JOINTS:
+            continue
+        for pos, lm in enumerate(landmarks if named else landmarks[:NUM_JOINTS]):
+            if not isinstance(lm, dict) or lm.get("x") is None or lm.get("y") is None:
+                continue
+            j = JOINT_INDEX[lm["name"]] if named else pos
+            c = lm.get("confidence")
+            pose.data[i, j] = (lm["x"], lm["y"], 1.0 if c is None else c)
+            pose.mask[i, j] = True
+    return pose
@@ -0,0 +1,166 @@
+"""
+Streaming parser for legacy full_analysis_*.txt / analysis_*.txt dumps.
+
+The dumps written by ComprehensiveDiscusAnalyzer.analyze_video_with_full_output
+list, per person, a 'Track confidence' line, 'Time: <s>s - <n> landmarks'
+lines and '  Landmark <i>: x=<x>, y=<y>' lines. iter_people() reads them line
+by line with precompiled patterns and yields one LegacyPerson per PERSON
+section as soon as the section ends:
+- landmarks accumulate in flat typed arrays (frame, joint, x, y) and are
+  scattered into a PoseArray once per person; no per-landmark dicts
+- a repeated timestamp replaces the earlier frame (as the dict-based parser
+  did); frames come out sorted by time, t_ms = int(t_s * 1000)
+- the dumps carry no landmark confidence, so scores are 1.0
+
+convert() turns a dump into binary landmark archives (landmark_archive.py) so
+historical sessions can be rescored without re-parsing text:
+  python -m backend.biomech.legacy_text full_analysis_x.txt --out archives/ [--all] [--quantize]
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Union
+import argparse
+import gzip
+import os
+import re
+
+import numpy as np
+
+from backend.biomech.pose import NUM_JOINTS, PoseArray
+
+
+_PERSON = re.compile(r'PERSON (\d+):')
+_CONFIDENCE = re.compile(r'Track confidence: ([\d.]+)')
+_TIME = re.compile(r'Time: ([\d.]+)s')
+_LANDMARK = re.compile(r'\s*Landmark (\d+): x=(-?[\d.]+), y=(-?[\d.]+)')
+
+
+@dataclass
+class LegacyPerson:
+    person_id: int
+    confidence: float
+    pose: PoseArray
+
+
+class _PersonBuilder:
+    def __init__(self, person_id: int):
+        self.person_id = person_id
+        self.confidence = 0.0
+        self.times: List[float] = []
+        self.frame = array('i')
+        self.joint = array('i')
+        self.x = array('d')
+        self.y = array('d')
+
+    def build(self) -> LegacyPerson:
+        times = np.asarray(self.times, dtype=float)
+        n = len(times)
+        if n == 0:
+            return LegacyPerson(self.person_id, self.confidence, PoseArray.empty())
+        # Last occurrence of each timestamp wins, output in time order
+        rev_unique, rev_first = np.unique(times[::-1], return_index=True)
+        keep = n - 1 - rev_first                                  # frame ids, ascending by time
+        row_of = np.full(n, -1, dtype=np.intp)
+        row_of[keep] = np.arange(len(keep))
+        pose = PoseArray.empty(len(keep))
+        pose.t_ms[:] = (rev_unique * 1000).astype(np.int64)
+        frame = np.frombuffer(self.frame, dtype=np.int32)
+        joint = np.frombuffer(self.joint, dtype=np.int32)
+        rows = row_of[frame]
+        ok = (rows >= 0) & (joint < NUM_JOINTS)
+        rows, joint = rows[ok], joint[ok]
+        pose.data[rows, joint, 0] = np.frombuffer(self.x, dtype=float)[ok]
+        pose.data[rows, joint, 1] = np.frombuffer(self.y, dtype=float)[ok]
+        pose.data[rows, joint, 2] = 1.0
+        pose.mask[rows, joint] = True
+        return LegacyPerson(self.person_id, self.confidence, pose)
+
+
+def _lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    if not isinstance(source, str):
+        yield from source
+        return
+    opener = gzip.open if source.endswith('.gz') else open
+    with opener(source, 'rt', encoding='utf-8', errors='replace') as f:
+        yield from f
+
+
+def iter_people(source: Union[str, IO[str], Iterable[str]]) -> Iterator[LegacyPerson]:
+    """One LegacyPerson per PERSON section of a dump (path, .gz path or iterable of lines)."""
+    person: Optional[_PersonBuilder] = None
+    frame = -1
+    landmark, time_line, confidence, person_line = _LANDMARK.match, _TIME.search, _CONFIDENCE.search, _PERSON.match
+    for line in _lines(source):
+        m = landmark(line)
+        if m is not None:
+            if person is not None and frame >= 0:
+                person.frame.append(frame)
+                person.joint.append(int(m.group(1)))
+                person.x.append(float(m.group(2)))
+                person.y.append(float(m.group(3)))
+            continue
+        if line.startswith('PERSON '):
+            m = person_line(line)
+            if m is not None:
+                if person is not None:
+                    yield person.build()
+                person = _PersonBuilder(int(m.group(1)))
+                frame = -1
+            continue
+        if person is None:
+            continue
+        if 'Time:' in line and 'landmarks' in line:
+            m = time_line(line)
+            if m is not None:
+                person.times.append(float(m.group(1)))
+                frame = len(person.times) - 1
+        elif 'Track confidence:' in line:
+            m = confidence(line)
+            if m is not None:
+                person.confidence = float(m.group(1))
+    if person is not None:
+        yield person.build()
+
+
+def convert(path: str, out_dir: str, *, all_people: bool = False, quantize: bool = False) -> List[str]:
+    """
+    Write {base}.landmarks.bin for the athlete (selected as in analyze_video), or
+    {base}.person{N}.landmarks.bin for every person with frames; returns the paths.
+    """
+    from backend.biomech.landmark_archive import encode_archive
+    from backend.biomech.person_select import candidate_from_pose, select_athlete
+    base = os.path.basename(path)
+    for suffix in ('.gz', '.txt'):
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+    people = [p for p in iter_people(path) if len(p.pose)]
+    if not all_people:
+        best = select_athlete([candidate_from_pose(p.person_id, p.confidence, p.pose) for p in people])
+        people = [] if best is None else [people[best]]
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for p in people:
+        name = f"{base}.person{p.person_id}.landmarks.bin" if all_people else f"{base}.landmarks.bin"
+        out = os.path.join(out_dir, name)
+        meta = {"source": os.path.basename(path), "person_id": p.person_id, "confidence": p.confidence}
+        with open(out, 'wb') as f:
+            f.write(encode_archive(p.pose, quantize=quantize, meta=meta))
+        written.append(out)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert legacy analysis text dumps to binary landmark archives")
+    parser.add_argument("paths", nargs="+", help="analysis .txt (or .txt.gz) dumps")
+    parser.add_argument("--out", default=".", help="output directory")
+    parser.add_argument("--all", dest="all_people", action="store_true", help="one archive per detected person")
+    parser.add_argument("--quantize", action="store_true", help="uint16 coordinates instead of float32")
+    args = parser.parse_args()
+    for path in args.paths:
+        for out in convert(path, args.out, all_people=args.all_people, quantize=args.quantize):
+            print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Peak detection on 1-D feature series.
+
+- Strict local maxima (x[i-1] < x[i] > x[i+1]) inside an inclusive search
+  window [lo, hi], found with one vectorized comparison
+- Minimum height filter
+- Topographic prominence for all peaks at once: nearest higher sample on
+  each side by binary lifting over a sparse max-table, base minima by
+  sparse min-table range queries (O(N log N) total, no per-sample loop)
+- Minimum distance between kept peaks, tallest first (loops over peaks only)
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+
+def local_maxima(x: np.ndarray, lo: int = 0, hi: Optional[int] = None) -> np.ndarray:
+    """Indices i with lo < i < hi and x[i-1] < x[i] > x[i+1]."""
+    n = len(x)
+    hi = n - 1 if hi is None else min(hi, n - 1)
+    lo = max(lo, 0)
+    if hi - lo < 2:
+        return np.zeros((0,), dtype=np.intp)
+    mid = x[lo + 1:hi]
+    is_peak = (x[lo:hi - 1] < mid) & (x[lo + 2:hi + 1] < mid)
+    return np.nonzero(is_peak)[0] + (lo + 1)
+
+
+def _sparse_table(x: np.ndarray, op) -> List[np.ndarray]:
+    """levels[k][i] = op over x[i : i + 2**k]."""
+    levels = [x]
+    k = 1
+    while 2 * k <= len(x):
+        prev = levels[-1]
+        levels.append(op(prev[:len(prev) - k], prev[k:]))
+        k *= 2
+    return levels
+
+
+def _range_min(levels: List[np.ndarray], a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """min(x[a..b]) (inclusive) for arrays of bounds with a <= b."""
+    k = np.floor(np.log2(b - a + 1)).astype(np.intp)
+    out = np.empty(len(a), dtype=float)
+    for j in np.unique(k):
+        sel = k == j
+        lvl = levels[j]
+        out[sel] = np.minimum(lvl[a[sel]], lvl[b[sel] - (1 << j) + 1])
+    return out
+
+
+def prominences(x: np.ndarray, peaks: np.ndarray, lo: int = 0, hi: Optional[int] = None) -> np.ndarray:
+    """
+    Prominence of each peak within [lo, hi]: its height above the higher of
+    the two lowest points between it and the nearest strictly higher sample
+    (or the window edge) on either side.
+    """
+    x = np.asarray(x, dtype=float)
+    peaks = np.asarray(peaks, dtype=np.intp)
+    if len(peaks) == 0:
+        return np.zeros((0,), dtype=float)
+    hi = len(x) - 1 if hi is None else min(hi, len(x) - 1)
+    lo = max(lo, 0)
+    mx = _sparse_table(x, np.maximum)
+    mn = _sparse_table(x, np.minimum)
+    h = x[peaks]
+    left = peaks.copy()       # x[left:peak] all <= h
+    right = peaks + 1         # x[peak+1:right] all <= h
+    for k in range(len(mx) - 1, -1, -1):
+        step = 1 << k
+        lvl = mx[k]
+        cand = left - step
+        ok = cand >= lo
+        ok[ok] = lvl[cand[ok]] <= h[ok]
+        left = np.where(ok, cand, left)
+        ok = right + step - 1 <= hi
+        ok[ok] = lvl[right[ok]] <= h[ok]
+        right = np.where(ok, right + step, right)
+    left_min = _range_min(mn, left, peaks)
+    right_min = _range_min(mn, peaks, right - 1)
+    return h - np.maximum(left_min, right_min)
+
+
+def _select_by_distance(x: np.ndarray, peaks: np.ndarray, distance: int) -> np.ndarray:
+    keep = np.ones(len(peaks), dtype=bool)
+    for i in np.argsort(-x[peaks], kind='stable'):  # tallest first, earlier on ties
+        if not keep[i]:
+            continue
+        a = np.searchsorted(peaks, peaks[i] - distance + 1, side='left')
+        b = np.searchsorted(peaks, peaks[i] + distance, side='left')
+        keep[a:i] = False
+        keep[i + 1:b] = False
+    return peaks[keep]
+
+
+def find_peaks(x: np.ndarray, *, lo: int = 0, hi: Optional[int] = None, height: Optional[float] = None,
+               prominence: Optional[float] = None, distance: int = 1) -> np.ndarray:
+    """Indices of peaks in x[lo..hi] passing the height, prominence and distance filters, ascending."""
+    x = np.asarray(x, dtype=float)
+    peaks = local_maxima(x, lo, hi)
+    if height is not None:
+        peaks = peaks[x[peaks] >= height]
+    if prominence is not None and len(peaks):
+        peaks = peaks[prominences(x, peaks, lo, hi) >= prominence]
+    if distance > 1 and len(peaks) > 1:
+        peaks = _select_by_distance(x, peaks, distance)
+    return peaks
+
+
+def tallest(x: np.ndarray, lo: int = 0, hi: Optional[int] = None) -> Optional[int]:
+    """Index of the highest peak in x[lo..hi] (earliest on ties), or None."""
+    peaks = local_maxima(np.asarray(x, dtype=float), lo, hi)
+    if len(peaks) == 0:
+        return None
+    return int(peaks[np.argmax(x[peaks])])
+
+
+def most_prominent(x: np.ndarray, lo: int = 0, hi: Optional[int] = None) -> Optional[int]:
+    """Index of the most prominent peak in x[lo..hi] (earliest on ties), or None."""
+    peaks = find_peaks(x, lo=lo, hi=hi)
+    if len(peaks) == 0:
+        return None
+    return int(peaks[np.argmax(prominences(x, peaks, lo, hi))])
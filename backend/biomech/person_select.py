@@ -0,0 +1,110 @@
+"""
+Athlete selection among the people detected in a video.
+
+A throw is the most energetic thing in the frame, so candidates are ranked on
+how much their wrists and hips move rather than on detector confidence alone
+(a coach or spectator standing still is usually detected just as confidently):
+- energy:   mean squared speed of both wrists and hips (norm units² / s²)
+- coverage: fraction of the video's timestamps the person is detected in
+- score:    energy × coverage × detection confidence
+All candidates are padded into one (P, T, 4, 2) array and scored together;
+only the four ranking joints are read at this stage, so the full landmark set
+is materialized for the selected person alone.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from backend.biomech.pose import JOINT_INDEX
+
+
+RANK_JOINTS = tuple(JOINT_INDEX[n] for n in ('left_wrist', 'right_wrist', 'left_hip', 'right_hip'))
+
+
+@dataclass
+class PersonCandidate:
+    person_id: int
+    confidence: float
+    t_ms: np.ndarray     # (n,) int64, ascending
+    xy: np.ndarray       # (n, 4, 2) float32, RANK_JOINTS order
+    present: np.ndarray  # (n, 4) bool
+
+
+def candidate_from_track_person(person_id: int, person) -> PersonCandidate:
+    """
+    Ranking samples for one Video Intelligence person detection annotation
+    (landmark index i is joint i of the 17-point set, as in analyze_video).
+    """
+    pose = getattr(person, 'pose', None)
+    if pose is not None:
+        return candidate_from_pose(person_id, person.tracks[0].confidence if person.tracks else 0.0, pose)
+    conf = float(person.tracks[0].confidence) if person.tracks else 0.0
+    samples = {}
+    for track in person.tracks:
+        for obj in track.timestamped_objects:
+            if not obj.landmarks:
+                continue
+            t = int(float(obj.time_offset.total_seconds()) * 1000)
+            row = samples.setdefault(t, [None] * len(RANK_JOINTS))
+            for k, j in enumerate(RANK_JOINTS):
+                if j < len(obj.landmarks):
+                    p = obj.landmarks[j].point
+                    row[k] = (float(p.x), float(p.y))
+    t_ms = np.array(sorted(samples), dtype=np.int64)
+    xy = np.zeros((len(t_ms), len(RANK_JOINTS), 2), dtype=np.float32)
+    present = np.zeros((len(t_ms), len(RANK_JOINTS)), dtype=bool)
+    for i, t in enumerate(t_ms.tolist()):
+        for k, pt in enumerate(samples[t]):
+            if pt is not None:
+                xy[i, k] = pt
+                present[i, k] = True
+    return PersonCandidate(person_id=person_id, confidence=conf, t_ms=t_ms, xy=xy, present=present)
+
+
+def candidate_from_pose(person_id: int, confidence: float, pose) -> PersonCandidate:
+    """Ranking samples from an already decoded PoseArray (e.g. legacy text dumps)."""
+    j = list(RANK_JOINTS)
+    return PersonCandidate(person_id=person_id, confidence=float(confidence), t_ms=pose.t_ms.copy(),
+                           xy=pose.data[:, j, :2].astype(np.float32), present=pose.mask[:, j].copy())
+
+
+def rank_scores(candidates: Sequence[PersonCandidate]) -> np.ndarray:
+    """(P,) selection score per candidate (see module docstring)."""
+    P = len(candidates)
+    if P == 0:
+        return np.zeros((0,), dtype=float)
+    T = max(1, max(len(c.t_ms) for c in candidates))
+    J = len(RANK_JOINTS)
+    t = np.zeros((P, T), dtype=np.int64)
+    xy = np.zeros((P, T, J, 2), dtype=np.float64)
+    present = np.zeros((P, T, J), dtype=bool)
+    for p, c in enumerate(candidates):
+        n = len(c.t_ms)
+        t[p, :n] = c.t_ms
+        xy[p, :n] = c.xy
+        present[p, :n] = c.present
+    conf = np.array([c.confidence for c in candidates], dtype=float)
+    counts = np.array([len(c.t_ms) for c in candidates], dtype=float)
+
+    dt = np.diff(t, axis=1) / 1000.0                                   # (P, T-1)
+    pair = present[:, 1:] & present[:, :-1] & (dt > 0)[..., None]      # (P, T-1, J)
+    step = np.diff(xy, axis=1)                                         # (P, T-1, J, 2)
+    speed2 = (step ** 2).sum(axis=-1) / np.where(dt > 0, dt, 1.0)[..., None] ** 2
+    n_pairs = pair.sum(axis=(1, 2))
+    energy = np.where(pair, speed2, 0.0).sum(axis=(1, 2)) / np.maximum(n_pairs, 1)
+
+    all_t = np.unique(np.concatenate([c.t_ms for c in candidates]))
+    coverage = counts / max(1, len(all_t))
+    return energy * coverage * conf
+
+
+def select_athlete(candidates: Sequence[PersonCandidate]) -> Optional[int]:
+    """Index of the most likely thrower; detector confidence breaks ties (e.g. nobody moves)."""
+    if not candidates:
+        return None
+    scores = rank_scores(candidates)
+    conf = np.array([c.confidence for c in candidates], dtype=float)
+    order = np.lexsort((np.arange(len(candidates)), -conf, -scores))
+    return int(order[0])
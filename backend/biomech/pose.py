@@ -0,0 +1,163 @@
+"""
+Columnar pose container shared by the PQS v1/v2 scoring pipeline.
+
+A PoseArray stores one person's landmarks as contiguous arrays instead of a
+List[Frame] of per-joint dataclasses:
+- t_ms:  (T,)        int64 timestamps in milliseconds, ascending
+- data:  (T, 17, 3)  float32 [x, y, score] per joint, normalized image space
+- mask:  (T, 17)     bool, True where the joint was detected
+
+Joint order follows the Google Video Intelligence 17-point set (see JOINTS).
+Adapters to and from List[Frame] keep the legacy scorers working: to_frames()
+returns lightweight Frame objects whose `kp` mapping reads straight from the
+backing arrays, so no Landmark objects exist until a scorer asks for one.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+
+JOINTS = (
+    'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
+    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+    'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle',
+)
+JOINT_INDEX: Dict[str, int] = {name: i for i, name in enumerate(JOINTS)}
+NUM_JOINTS = len(JOINTS)
+
+# Channel indices into PoseArray.data[..., c]
+X, Y, SCORE = 0, 1, 2
+
+
+class _JointView(Mapping):
+    """Read-only `Frame.kp` stand-in backed by one PoseArray row."""
+
+    __slots__ = ('_row', '_present')
+
+    def __init__(self, row: np.ndarray, present: np.ndarray):
+        self._row = row
+        self._present = present
+
+    def __getitem__(self, name: str):
+        from backend.pqs_algorithm import Landmark
+        j = JOINT_INDEX.get(name)
+        if j is None or not self._present[j]:
+            raise KeyError(name)
+        x, y, s = self._row[j]
+        return Landmark(x=float(x), y=float(y), score=float(s))
+
+    def __contains__(self, name: object) -> bool:
+        j = JOINT_INDEX.get(name)  # type: ignore[arg-type]
+        return j is not None and bool(self._present[j])
+
+    def __iter__(self) -> Iterator[str]:
+        return (JOINTS[j] for j in np.flatnonzero(self._present))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._present))
+
+
+@dataclass
+class PoseArray:
+    t_ms: np.ndarray
+    data: np.ndarray
+    mask: np.ndarray
+
+    def __post_init__(self):
+        self.t_ms = np.ascontiguousarray(self.t_ms, dtype=np.int64).reshape(-1)
+        self.data = np.ascontiguousarray(self.data, dtype=np.float32)
+        self.mask = np.ascontiguousarray(self.mask, dtype=bool)
+        T = len(self.t_ms)
+        if self.data.shape != (T, NUM_JOINTS, 3):
+            raise ValueError(f"data must have shape ({T}, {NUM_JOINTS}, 3), got {self.data.shape}")
+        if self.mask.shape != (T, NUM_JOINTS):
+            raise ValueError(f"mask must have shape ({T}, {NUM_JOINTS}), got {self.mask.shape}")
+
+    # ------------------------------ Constructors ------------------------------
+
+    @classmethod
+    def empty(cls, n: int = 0) -> 'PoseArray':
+        """All-missing pose with `n` zero timestamps."""
+        return cls(
+            t_ms=np.zeros((n,), dtype=np.int64),
+            data=np.zeros((n, NUM_JOINTS, 3), dtype=np.float32),
+            mask=np.zeros((n, NUM_JOINTS), dtype=bool),
+        )
+
+    @classmethod
+    def from_frames(cls, frames: Sequence) -> 'PoseArray':
+        """
+        Pack a List[Frame] into preallocated columns in a single pass.
+        Joint names outside JOINTS are dropped; a missing score counts as 1.0.
+        """
+        pose = cls.empty(len(frames))
+        t_ms, data, mask = pose.t_ms, pose.data, pose.mask
+        for i, f in enumerate(frames):
+            t_ms[i] = int(f.t_ms)
+            for name, lm in f.kp.items():
+                j = JOINT_INDEX.get(name)
+                if j is None:
+                    continue
+                data[i, j, X] = lm.x
+                data[i, j, Y] = lm.y
+                data[i, j, SCORE] = 1.0 if lm.score is None else lm.score
+                mask[i, j] = True
+        return pose
+
+    # ------------------------------ Adapters ----------------------------------
+
+    def to_frames(self) -> List:
+        """
+        Frame views over this array. Each `kp` reads from the backing row on
+        access, so converting a PoseArray for the legacy scorers copies nothing.
+        """
+        from backend.pqs_algorithm import Frame
+        return [Frame(t_ms=int(t), kp=_JointView(self.data[i], self.mask[i]))  # type: ignore[arg-type]
+                for i, t in enumerate(self.t_ms)]
+
+    # ------------------------------ Accessors ---------------------------------
+
+    def __len__(self) -> int:
+        return len(self.t_ms)
+
+    def joint(self, name: str) -> np.ndarray:
+        """(T, 3) view of [x, y, score] for one joint."""
+        return self.data[:, JOINT_INDEX[name], :]
+
+    def xy(self, name: str) -> np.ndarray:
+        """(T, 2) view of [x, y] for one joint."""
+        return self.data[:, JOINT_INDEX[name], :2]
+
+    def present(self, name: str) -> np.ndarray:
+        """(T,) presence mask for one joint."""
+        return self.mask[:, JOINT_INDEX[name]]
+
+    def take(self, idx: np.ndarray) -> 'PoseArray':
+        """Gather frames by index (e.g. a resampling map)."""
+        idx = np.asarray(idx, dtype=np.intp)
+        return PoseArray(t_ms=self.t_ms[idx], data=self.data[idx], mask=self.mask[idx])
+
+    def __getitem__(self, sl: slice) -> 'PoseArray':
+        if not isinstance(sl, slice):
+            raise TypeError("PoseArray supports slice indexing only; use take() for index arrays")
+        return PoseArray(t_ms=self.t_ms[sl], data=self.data[sl], mask=self.mask[sl])
+
+
+def as_pose_array(frames: Union[PoseArray, Sequence, None]) -> PoseArray:
+    """Accept either a PoseArray or a List[Frame] and return a PoseArray."""
+    if isinstance(frames, PoseArray):
+        return frames
+    if not frames:
+        return PoseArray.empty()
+    return PoseArray.from_frames(frames)
+
+
+def as_frames(frames: Union[PoseArray, Sequence, None]) -> List:
+    """Accept either a PoseArray or a List[Frame] and return a frame list."""
+    if isinstance(frames, PoseArray):
+        return frames.to_frames()
+    return list(frames or [])
@@ -0,0 +1,225 @@
+"""
+Resampling stage for the PQS v2 feature engine.
+
+- Uniform grid at TARGET_HZ from the first to the last source timestamp
+- Per-joint linear interpolation between the bracketing detections
+  (one searchsorted over the source timeline shared by all joints)
+- Gaps longer than MAX_GAP_MS are not bridged; those samples are masked
+- Savitzky–Golay smoothing of x/y (SMOOTH_WINDOW_SAMPLES, SMOOTH_POLY) applied
+  to all joints at once; each contiguous detected run is edge-padded with its
+  nearest sample, so masked samples never leak into their neighbours
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+from backend.biomech import envelopes as E
+from backend.biomech.pose import PoseArray
+from backend.biomech.time_index import nearest_index
+
+
+@lru_cache(maxsize=8)
+def savgol_coeffs(window: int, poly: int) -> np.ndarray:
+    """Smoothing (0th derivative) Savitzky–Golay weights for a centered odd window."""
+    if window % 2 != 1 or window < 1:
+        raise ValueError("window must be a positive odd number")
+    if poly >= window:
+        raise ValueError("poly must be less than window")
+    h = window // 2
+    k = np.arange(-h, h + 1, dtype=float)
+    A = k[:, None] ** np.arange(poly + 1)[None, :]
+    coeffs = np.linalg.pinv(A)[0]
+    coeffs.setflags(write=False)
+    return coeffs
+
+
+def effective_window(n: int, window: int = E.SMOOTH_WINDOW_SAMPLES, poly: int = E.SMOOTH_POLY) -> int:
+    """Largest odd window <= `window` that fits `n` samples and exceeds `poly`; 0 disables smoothing."""
+    w = min(window, n if n % 2 == 1 else n - 1)
+    return w if w > poly else 0
+
+
+def run_bounds(valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For a (T, ...) validity mask, the first and last index of the contiguous
+    valid run containing each sample (undefined where invalid).
+    """
+    T = valid.shape[0]
+    idx = np.arange(T).reshape((T,) + (1,) * (valid.ndim - 1))
+    prev = np.zeros_like(valid)
+    prev[1:] = valid[:-1]
+    nxt = np.zeros_like(valid)
+    nxt[:-1] = valid[1:]
+    starts = np.where(valid & ~prev, idx, 0)
+    ends = np.where(valid & ~nxt, idx, T - 1)
+    start = np.maximum.accumulate(starts, axis=0)
+    end = np.minimum.accumulate(ends[::-1], axis=0)[::-1]
+    return start, end
+
+
+def savgol_smooth(values: np.ndarray, valid: np.ndarray, window: int = E.SMOOTH_WINDOW_SAMPLES, poly: int = E.SMOOTH_POLY) -> np.ndarray:
+    """
+    Savitzky–Golay smoothing along axis 0 of `values` (T, J, C) for all joints
+    and channels at once, restricted to the valid runs of `valid` (T, J).
+    """
+    T = values.shape[0]
+    w = effective_window(T, window, poly)
+    if w == 0:
+        return values.astype(np.float64)
+    coeffs = savgol_coeffs(w, poly)
+    h = w // 2
+    values = values.astype(np.float64)
+    # Plain convolution over contiguous slices; correct wherever the whole window lies in one run
+    out = np.zeros(values.shape, dtype=np.float64)
+    for c, off in zip(coeffs, range(-h, h + 1)):
+        out[h:T - h] += c * values[h + off:T - h + off]
+    # Redo samples within h of a run edge (or of either end) with run-clamped taps
+    start, end = run_bounds(valid)
+    rows = np.arange(T)[:, None]
+    edge_t, edge_j = np.nonzero(valid & (((rows - start) < h) | ((end - rows) < h)))
+    if len(edge_t):
+        s, e = start[edge_t, edge_j], end[edge_t, edge_j]
+        acc = np.zeros((len(edge_t),) + values.shape[2:], dtype=np.float64)
+        for c, off in zip(coeffs, range(-h, h + 1)):
+            acc += c * values[np.clip(edge_t + off, s, e), edge_j]
+        out[edge_t, edge_j] = acc
+    return out
+
+
+def savgol_rows(values: np.ndarray, valid: np.ndarray, lo: int, hi: int, window: int = E.SMOOTH_WINDOW_SAMPLES, poly: int = E.SMOOTH_POLY) -> np.ndarray:
+    """
+    Smoothed samples lo..hi-1 of `values` (T, J, C) with every tap clamped to
+    the sample's valid run, matching savgol_smooth(values, valid)[lo:hi] when
+    the local array covers each window (used by the streaming engine).
+    """
+    values = values.astype(np.float64)
+    if window == 0:
+        return values[lo:hi].copy()
+    coeffs = savgol_coeffs(window, poly)
+    h = window // 2
+    start, end = run_bounds(valid)
+    out = np.zeros((hi - lo,) + values.shape[1:], dtype=np.float64)
+    rows, joints = np.nonzero(valid[lo:hi])
+    if len(rows):
+        t = rows + lo
+        s, e = start[t, joints], end[t, joints]
+        acc = np.zeros((len(t),) + values.shape[2:], dtype=np.float64)
+        for c, off in zip(coeffs, range(-h, h + 1)):
+            acc += c * values[np.clip(t + off, s, e), joints]
+        out[rows, joints] = acc
+    return out
+
+
+def interpolate_grid(t: np.ndarray, data: np.ndarray, mask: np.ndarray, grid: np.ndarray, max_gap_ms: int = E.MAX_GAP_MS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Linear interpolation of source samples (t (T,), data (T, J, 3), mask (T, J))
+    onto `grid`; returns float64 values (G, J, 3) and validity (G, J). Every
+    grid time must be at or after t[0].
+    """
+    T, J = mask.shape
+    # Last/next detected source index per joint at or after each source index
+    src_idx = np.arange(T)[:, None]
+    last_valid = np.maximum.accumulate(np.where(mask, src_idx, -1), axis=0)
+    next_valid = np.full((T + 1, J), T, dtype=np.int64)
+    next_valid[:T] = np.minimum.accumulate(np.where(mask, src_idx, T)[::-1], axis=0)[::-1]
+
+    i = np.searchsorted(t, grid, side='right') - 1  # last source sample at or before each grid time
+    L = last_valid[i]                                # (G, J)
+    R = next_valid[i + 1]                            # first detection strictly after grid time
+    has_l = L >= 0
+    has_r = R < T
+    t_pad = np.append(t, t[-1])
+    tL = t_pad[np.where(has_l, L, T)]
+    tR = t_pad[np.where(has_r, R, T)]
+    exact = has_l & (tL == grid[:, None])
+    bridge = has_l & has_r & ~exact & ((tR - tL) <= max_gap_ms)
+    valid = exact | bridge
+
+    # Flat (T*J, 3) gathers are much cheaper than 2-D fancy indexing
+    flat = data.reshape(T * J, 3)
+    cols = np.arange(J)[None, :]
+    vL = flat.take((np.where(has_l, L, 0) * J + cols).ravel(), axis=0).reshape(-1, J, 3).astype(np.float64)
+    vR = flat.take((np.where(has_r, R, 0) * J + cols).ravel(), axis=0).reshape(-1, J, 3).astype(np.float64)
+    span = np.where(bridge, tR - tL, 1).astype(np.float64)
+    w = np.where(bridge, (grid[:, None] - tL) / span, 0.0)[..., None]
+    return vL + w * (vR - vL), valid
+
+
+def resample_pose(pose: PoseArray, hz: int = E.TARGET_HZ, max_gap_ms: int = E.MAX_GAP_MS, smooth: bool = True) -> PoseArray:
+    """Resample, gap-fill and smooth a pose onto a uniform `hz` grid."""
+    if len(pose) == 0:
+        return pose
+    t = pose.t_ms
+    step = int(round(1000 / hz))
+    grid = np.arange(t[0], t[-1] + 1, step, dtype=np.int64)
+    data, valid = interpolate_grid(t, pose.data, pose.mask, grid, max_gap_ms)
+    if smooth:
+        data[..., :2] = savgol_smooth(data[..., :2], valid)
+    data[~valid] = 0.0
+    return PoseArray(t_ms=grid, data=data, mask=valid)
+
+
+def resample_batch(data: np.ndarray, mask: np.ndarray, t_ms: np.ndarray, lengths: np.ndarray,
+                   hz: int = E.TARGET_HZ, max_gap_ms: int = E.MAX_GAP_MS,
+                   smooth: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    resample_pose for B padded sessions (data (B, T, 17, 3), mask (B, T, 17),
+    t_ms (B, T), lengths (B,)) in a single pass.
+
+    Sessions are laid end to end on one timeline, each shifted so its first
+    sample lands on a grid step and separated by a spacer longer than
+    max_gap_ms plus the smoothing window, so no interpolation or smoothing tap
+    crosses from one session into the next. Returns (data, mask, t_ms, lengths)
+    on the resampled grid, padded to the longest session; each session's
+    samples are identical to resample_pose on that session alone.
+    """
+    B, T = t_ms.shape[:2]
+    J = data.shape[2]
+    step = int(round(1000 / hz))
+    lengths = np.asarray(lengths, dtype=np.int64)
+    nonempty = lengths > 0
+    last = np.maximum(lengths - 1, 0)
+    t0 = t_ms[:, 0].astype(np.int64)
+    span = np.where(nonempty, t_ms[np.arange(B), last].astype(np.int64) - t0, 0)
+    g_len = np.where(nonempty, span // step + 1, 0)
+
+    # Very short sessions use a narrower smoothing window on their own; keep them separate
+    alone = nonempty & (g_len < E.SMOOTH_WINDOW_SAMPLES)
+    joint = nonempty & ~alone
+    spacer = (max_gap_ms // step + E.SMOOTH_WINDOW_SAMPLES + 2) * step
+    slot = np.where(joint, g_len * step + spacer, 0)
+    base = np.cumsum(slot) - slot  # offset of each session on the shared timeline
+
+    G = int(g_len.max()) if B else 0
+    out_data = np.zeros((B, G, J, 3), dtype=np.float32)
+    out_mask = np.zeros((B, G, J), dtype=bool)
+    k = np.arange(G)
+    out_t = t0[:, None] + k[None, :] * step
+
+    if joint.any():
+        rows = (np.arange(T)[None, :] < lengths[:, None]) & joint[:, None]
+        shifted = (t_ms.astype(np.int64) - t0[:, None]) + base[:, None]
+        merged = resample_pose(PoseArray(t_ms=shifted[rows], data=data[rows], mask=mask[rows]),
+                               hz=hz, max_gap_ms=max_gap_ms, smooth=smooth)
+        start = (base - base[np.argmax(joint)]) // step
+        take = np.clip(start[:, None] + k[None, :], 0, len(merged) - 1)
+        keep = joint[:, None] & (k[None, :] < g_len[:, None])
+        out_data[keep] = merged.data[take[keep]]
+        out_mask[keep] = merged.mask[take[keep]]
+    for b in np.nonzero(alone)[0]:
+        n = int(lengths[b])
+        r = resample_pose(PoseArray(t_ms=t_ms[b, :n], data=data[b, :n], mask=mask[b, :n]),
+                          hz=hz, max_gap_ms=max_gap_ms, smooth=smooth)
+        out_data[b, :len(r)] = r.data
+        out_mask[b, :len(r)] = r.mask
+    return out_data, out_mask, out_t, g_len
+
+
+def grid_index(pose: PoseArray, resampled: PoseArray, src_idx: int) -> int:
+    """Map an index into the source pose onto the nearest resampled sample."""
+    if len(resampled) == 0:
+        return 0
+    t = pose.t_ms[min(max(src_idx, 0), len(pose) - 1)]
+    return nearest_index(resampled.t_ms, t)
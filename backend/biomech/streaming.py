@@ -0,0 +1,254 @@
+"""
+Streaming feature engine for live capture.
+
+Frames are pushed one at a time (or in small chunks) and each stage keeps only
+the samples it still needs:
+- Source ring spanning MAX_GAP_MS: a 100 Hz grid sample is final once a frame
+  more than MAX_GAP_MS later has arrived (no later detection can bridge it)
+- Raw grid ring: Savitzky–Golay taps need SMOOTH_WINDOW_SAMPLES // 2 samples
+  of lookahead
+- Pose tail: unwrap carries its running correction, central derivatives need
+  two samples of lookahead and jerk three of lookback
+
+Committed samples are bitwise identical to compute_features on the full
+session; flush() closes the stream and returns the same
+(FeatureSeries, Phases, metrics) tuple.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from backend.pqs_algorithm import Frame
+from backend.biomech import envelopes as E
+from backend.biomech.features import (
+    SERIES_FIELDS,
+    FeatureSeries,
+    Phases,
+    _Kinematics,
+    _empty_features,
+    _release_metrics,
+    _segment_phases,
+    _summary_metrics,
+)
+from backend.biomech.pose import JOINT_INDEX, NUM_JOINTS, PoseArray
+from backend.biomech.resample import effective_window, interpolate_grid, savgol_rows
+from backend.biomech.time_index import nearest_index
+
+
+class _Ring:
+    """FIFO of fixed-shape rows in preallocated arrays, addressed by absolute row index."""
+
+    def __init__(self, capacity: int, **columns: Tuple[tuple, type]):
+        self._cols = {name: np.zeros((capacity,) + shape, dtype=dtype) for name, (shape, dtype) in columns.items()}
+        self._lo = 0
+        self._hi = 0
+        self.start = 0  # absolute index of the oldest live row
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    @property
+    def stop(self) -> int:
+        return self.start + len(self)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._cols[name][self._lo:self._hi]
+
+    def append(self, **rows: np.ndarray) -> None:
+        n = len(next(iter(rows.values())))
+        cap = len(next(iter(self._cols.values())))
+        if self._hi + n > cap:
+            # Compact to the front; only grow when the live rows don't fit
+            live = len(self)
+            size = cap if live + n <= cap else 2 * (live + n)
+            for name, arr in self._cols.items():
+                dst = arr if size == cap else np.zeros((size,) + arr.shape[1:], dtype=arr.dtype)
+                dst[:live] = arr[self._lo:self._hi]
+                self._cols[name] = dst
+            self._lo, self._hi = 0, live
+        for name, values in rows.items():
+            self._cols[name][self._hi:self._hi + n] = values
+        self._hi += n
+
+    def drop_before(self, index: int) -> None:
+        n = min(max(0, index - self.start), len(self))
+        self._lo += n
+        self.start += n
+
+
+def _unwrap_from(p: np.ndarray, prev: float, cum: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    np.unwrap of `p` continuing after a sample with raw angle `prev` and
+    cumulative correction `cum`; returns (unwrapped, cumulative corrections).
+    """
+    dd = np.diff(p, prepend=prev)
+    ddmod = np.mod(dd + np.pi, 2 * np.pi) - np.pi
+    ddmod[(ddmod == -np.pi) & (dd > 0)] = np.pi
+    correct = ddmod - dd
+    correct[np.abs(dd) < np.pi] = 0
+    cums = np.cumsum(np.concatenate(([cum], correct)))[1:]
+    return p + cums, cums
+
+
+class StreamingFeatureEngine:
+    """
+    Incremental compute_features. Push frames as they arrive; committed
+    feature samples trail the newest frame by MAX_GAP_MS plus a few grid
+    samples. Work and memory per pushed frame are constant apart from the
+    committed output itself.
+    """
+
+    def __init__(self, handedness: str = 'right'):
+        self.handedness = handedness
+        self._step = int(round(1000 / E.TARGET_HZ))
+        self._h = E.SMOOTH_WINDOW_SAMPLES // 2
+        side = 'right' if handedness == 'right' else 'left'
+        self._wrist = np.array([JOINT_INDEX[f'{side}_wrist']], dtype=np.intp)
+        self._release_joints = [JOINT_INDEX[f'{side}_{j}'] for j in ('wrist', 'elbow', 'shoulder')]
+        J = NUM_JOINTS
+        self._src = _Ring(64, t=((), np.int64), data=((J, 3), np.float32), mask=((J,), bool))
+        self._raw = _Ring(64, data=((J, 3), np.float64), mask=((J,), bool))
+        self._pose = _Ring(32, t=((), np.int64), data=((J, 3), np.float32), mask=((J,), bool),
+                           pelvis_rad=((), np.float64), thorax_rad=((), np.float64))
+        self._src_t: List[int] = []
+        self._t0: Optional[int] = None
+        self._carry: Optional[Tuple[float, float, float, float]] = None
+        self._shoulder_w0: Optional[np.ndarray] = None
+        self._committed = 0
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._closed = False
+
+    def __len__(self) -> int:
+        """Number of committed (final) 100 Hz feature samples."""
+        return self._committed
+
+    def push(self, frame: Frame) -> int:
+        """Add one frame; returns the number of committed samples."""
+        return self.extend(PoseArray.from_frames([frame]))
+
+    def extend(self, frames: Union[List[Frame], PoseArray]) -> int:
+        """Add a chunk of frames in time order; returns the number of committed samples."""
+        if self._closed:
+            raise RuntimeError("stream already flushed")
+        pose = frames if isinstance(frames, PoseArray) else PoseArray.from_frames(frames)
+        if len(pose) == 0:
+            return self._committed
+        t = pose.t_ms
+        if (np.diff(t) <= 0).any() or (self._src_t and t[0] <= self._src_t[-1]):
+            raise ValueError("frame timestamps must be strictly increasing")
+        if self._t0 is None:
+            self._t0 = int(t[0])
+        self._src_t.extend(t.tolist())
+        self._src.append(t=t, data=pose.data, mask=pose.mask)
+        self._advance(final=False)
+        return self._committed
+
+    def series(self) -> FeatureSeries:
+        """Committed samples so far (release metrics are only set by flush)."""
+        return self._series(None)
+
+    def flush(self, release_idx: Optional[int] = None) -> Tuple[FeatureSeries, Phases, Dict[str, float]]:
+        """
+        End the stream and return compute_features' result for every pushed
+        frame. release_idx indexes the pushed frames, as in compute_features.
+        """
+        if self._closed:
+            raise RuntimeError("stream already flushed")
+        self._closed = True
+        if self._t0 is None:
+            return _empty_features()
+        self._advance(final=True)
+        series = self._series(release_idx)
+        phases = _segment_phases(series)
+        metrics = _summary_metrics(series, phases, self.handedness)
+        return series, phases, metrics
+
+    def _series(self, release_idx: Optional[int]) -> FeatureSeries:
+        if not self._chunks:
+            return _empty_features()[0]
+        cols = {name: np.concatenate([c[name] for c in self._chunks]) for name in self._chunks[0]}
+        rel_data, rel_mask = cols.pop('_rel_data'), cols.pop('_rel_mask')
+        rel_angle = rel_height = None
+        if release_idx is not None and 0 <= release_idx < len(self._src_t):
+            gi = nearest_index(cols['t_ms'], self._src_t[release_idx])
+            row = np.zeros((NUM_JOINTS, 3), dtype=np.float32)
+            present = np.zeros((NUM_JOINTS,), dtype=bool)
+            row[self._release_joints] = rel_data[gi]
+            present[self._release_joints] = rel_mask[gi]
+            rel_angle, rel_height = _release_metrics(row, present, self.handedness)
+        return FeatureSeries(release_angle_deg=rel_angle, release_height_norm=rel_height, **cols)
+
+    def _advance(self, final: bool) -> None:
+        t0, step, h = self._t0, self._step, self._h
+
+        # 1. Grid samples no future frame can change
+        t_last = int(self._src['t'][-1])
+        if final:
+            n_grid = (t_last - t0) // step + 1
+        else:
+            lim = t_last - E.MAX_GAP_MS - t0
+            n_grid = (lim - 1) // step + 1 if lim > 0 else 0
+        if n_grid > self._raw.stop:
+            grid = t0 + np.arange(self._raw.stop, n_grid, dtype=np.int64) * step
+            data, valid = interpolate_grid(self._src['t'], self._src['data'], self._src['mask'], grid)
+            self._raw.append(data=data, mask=valid)
+            # Keep the last frame at or before (next grid time - MAX_GAP_MS); older ones can't bridge
+            keep = np.searchsorted(self._src['t'], t0 + n_grid * step - E.MAX_GAP_MS, side='right') - 1
+            self._src.drop_before(self._src.start + max(0, int(keep)))
+
+        # 2. Smoothing: h samples of lookahead, window fixed once the stream outgrows it
+        n_raw = self._raw.stop
+        if final:
+            window, n_smooth = effective_window(n_raw), n_raw
+        else:
+            window, n_smooth = E.SMOOTH_WINDOW_SAMPLES, (n_raw - h if n_raw >= E.SMOOTH_WINDOW_SAMPLES else 0)
+        lo = self._pose.stop
+        if n_smooth > lo:
+            base = self._raw.start
+            values, valid = self._raw['data'], self._raw['mask']
+            data = values[lo - base:n_smooth - base].copy()
+            data[..., :2] = savgol_rows(values[..., :2], valid, lo - base, n_smooth - base, window)
+            v = valid[lo - base:n_smooth - base]
+            data[~v] = 0.0
+            self._add_pose(t0 + np.arange(lo, n_smooth, dtype=np.int64) * step, data.astype(np.float32), v)
+            self._raw.drop_before(n_smooth - h)
+
+        # 3. Features: derivatives need two samples of lookahead until the stream ends
+        end = self._pose.stop if final else self._pose.stop - 2
+        if end > self._committed:
+            self._commit(end)
+
+    def _add_pose(self, t: np.ndarray, data: np.ndarray, mask: np.ndarray) -> None:
+        kin = _Kinematics(data[None], mask[None], t[None], [len(t)], self._wrist, self._shoulder_w0)
+        if self._shoulder_w0 is None:
+            self._shoulder_w0 = kin.shoulder_w0
+        p = np.deg2rad(kin.pelvis_ang_deg[0])
+        q = np.deg2rad(kin.thorax_ang_deg[0])
+        if self._carry is None:
+            # The first sample is taken as is, like np.unwrap
+            p_rad, p_cum = p.copy(), np.zeros_like(p)
+            q_rad, q_cum = q.copy(), np.zeros_like(q)
+            if len(p) > 1:
+                p_rad[1:], p_cum[1:] = _unwrap_from(p[1:], p[0], 0.0)
+                q_rad[1:], q_cum[1:] = _unwrap_from(q[1:], q[0], 0.0)
+        else:
+            p_rad, p_cum = _unwrap_from(p, self._carry[0], self._carry[1])
+            q_rad, q_cum = _unwrap_from(q, self._carry[2], self._carry[3])
+        self._carry = (p[-1], p_cum[-1], q[-1], q_cum[-1])
+        self._pose.append(t=t, data=data, mask=mask, pelvis_rad=p_rad, thorax_rad=q_rad)
+
+    def _commit(self, end: int) -> None:
+        # Three samples of lookback cover hand speed, jerk and the derivative stencils
+        w0 = max(self._pose.start, self._committed - 3)
+        self._pose.drop_before(w0)
+        t = self._pose['t'][None]
+        data, mask = self._pose['data'][None], self._pose['mask'][None]
+        kin = _Kinematics(data, mask, t, [t.shape[1]], self._wrist, self._shoulder_w0,
+                          unwrapped=(self._pose['pelvis_rad'][None], self._pose['thorax_rad'][None]))
+        sl = slice(self._committed - w0, end - w0)
+        chunk = {name: getattr(kin, name)[0, sl].copy() for name in SERIES_FIELDS if not name.startswith('release_')}
+        chunk['_rel_data'] = data[0, sl][:, self._release_joints].copy()
+        chunk['_rel_mask'] = mask[0, sl][:, self._release_joints].copy()
+        self._chunks.append(chunk)
+        self._committed = end
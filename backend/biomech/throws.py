@@ -0,0 +1,133 @@
+"""
+Throw segmentation for session videos with several throws.
+
+The scorers assume one throw per pose and look for a single global wrist-speed
+peak, so a practice video with 5-10 throws is cut into throw windows first:
+- activity: wrist speed (faster wrist) plus pelvis rotation rate (hip-line
+  angle), each normalized by its session-wide 99th percentile, on the
+  resampled TARGET_HZ grid and smoothed over THROW_SMOOTH_MS
+- hysteresis: a window opens when activity rises above THROW_ENTER and
+  closes when it falls below THROW_EXIT (fractions of the way from the
+  session's idle floor to its peak level), so a throw is not split by one
+  quiet sample
+- bursts closer than THROW_MERGE_GAP_MS are one throw; bursts shorter than
+  THROW_MIN_MS are dropped (a wave, picking up the implement)
+- each window is padded by THROW_PRE_MS (wind-up) and THROW_POST_MS
+  (follow-through), never past the midpoint to the neighbouring throw
+All stages are vectorized over the session; only the (few) windows are looped.
+Frames outside every window are dead time and are never scored.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from backend.biomech import envelopes as E
+from backend.biomech.pose import JOINT_INDEX, PoseArray
+from backend.biomech.resample import resample_pose
+
+
+THROW_SMOOTH_MS = 250
+THROW_ENTER = 0.4
+THROW_EXIT = 0.15
+THROW_MIN_MS = 300
+THROW_MERGE_GAP_MS = 1500
+THROW_PRE_MS = 1500
+THROW_POST_MS = 700
+
+_WRISTS = [JOINT_INDEX['left_wrist'], JOINT_INDEX['right_wrist']]
+_HIPS = [JOINT_INDEX['left_hip'], JOINT_INDEX['right_hip']]
+
+
+def _rate(values: np.ndarray, valid: np.ndarray, dt: float) -> np.ndarray:
+    """|d values / dt| between consecutive valid samples (0 elsewhere), aligned to the later sample."""
+    out = np.zeros(values.shape[0], dtype=float)
+    step = np.abs(np.diff(values, axis=0))
+    if step.ndim > 1:
+        step = np.sqrt((step ** 2).sum(axis=-1))
+    ok = valid[1:] & valid[:-1]
+    out[1:] = np.where(ok, step / dt, 0.0)
+    return out
+
+
+def _normalized(x: np.ndarray) -> np.ndarray:
+    scale = np.percentile(x, 99) if len(x) else 0.0
+    return x / scale if scale > 0 else np.zeros_like(x)
+
+
+def throw_activity(pose: PoseArray) -> Tuple[np.ndarray, np.ndarray]:
+    """(grid t_ms, activity) on the resampled grid; see the module docstring."""
+    grid = resample_pose(pose)
+    n = len(grid)
+    if n < 2:
+        return grid.t_ms, np.zeros(n, dtype=float)
+    dt = 1.0 / E.TARGET_HZ
+    xy = grid.data[..., :2].astype(float)
+
+    wrist = np.max([_rate(xy[:, j], grid.mask[:, j], dt) for j in _WRISTS], axis=0)
+
+    hips_ok = grid.mask[:, _HIPS].all(axis=1)
+    d = xy[:, _HIPS[1]] - xy[:, _HIPS[0]]
+    angle = np.arctan2(d[:, 1], d[:, 0])
+    # Carry the last valid angle through gaps so unwrap sees no jumps from missing samples
+    last = np.maximum.accumulate(np.where(hips_ok, np.arange(n), 0))
+    angle = np.unwrap(angle[last])
+    pelvis = _rate(angle, hips_ok, dt)
+
+    activity = _normalized(wrist) + _normalized(pelvis)
+    k = max(1, int(round(THROW_SMOOTH_MS * E.TARGET_HZ / 1000.0)))
+    if k > 1 and n >= k:
+        c = np.concatenate(([0.0], np.cumsum(activity)))
+        smooth = (c[k:] - c[:-k]) / k
+        pad = k // 2
+        activity = np.concatenate((np.full(pad, smooth[0]), smooth, np.full(n - len(smooth) - pad, smooth[-1])))
+    return grid.t_ms, activity
+
+
+def _hysteresis(activity: np.ndarray, enter: float, exit_: float) -> np.ndarray:
+    """On from a sample >= enter until the next sample < exit_."""
+    event = np.where(activity >= enter, 1, np.where(activity < exit_, -1, 0))
+    last = np.maximum.accumulate(np.where(event != 0, np.arange(len(event)), 0))
+    return event[last] == 1
+
+
+def _runs(on: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """[start, end) indices of contiguous True runs."""
+    edges = np.diff(np.concatenate(([0], on.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def segment_throws(pose: PoseArray) -> List[Tuple[int, int]]:
+    """[i0, i1) frame ranges of `pose`, one per detected throw, in time order."""
+    if len(pose) < 2:
+        return []
+    t, activity = throw_activity(pose)
+    if not len(activity):
+        return []
+    floor, peak = float(np.median(activity)), float(np.percentile(activity, 99.5))
+    if peak - floor <= 1e-9:
+        return []
+    on = _hysteresis(activity, floor + THROW_ENTER * (peak - floor), floor + THROW_EXIT * (peak - floor))
+    starts, ends = _runs(on)
+    if not len(starts):
+        return []
+    t0, t1 = t[starts].astype(np.int64), t[ends - 1].astype(np.int64)
+
+    # Merge bursts separated by short pauses, then drop the ones too short to be a throw
+    keep = np.concatenate(([True], t0[1:] - t1[:-1] > THROW_MERGE_GAP_MS))
+    t0 = t0[keep]
+    t1 = np.maximum.reduceat(t1, np.flatnonzero(keep))
+    long_enough = t1 - t0 >= THROW_MIN_MS
+    t0, t1 = t0[long_enough], t1[long_enough]
+    if not len(t0):
+        return []
+
+    # Pad for wind-up and follow-through, without crossing into the neighbouring throw
+    lo = t0 - THROW_PRE_MS
+    hi = t1 + THROW_POST_MS
+    mid = (t1[:-1] + t0[1:]) // 2
+    lo[1:] = np.maximum(lo[1:], mid)
+    hi[:-1] = np.minimum(hi[:-1], mid)
+    i0 = np.searchsorted(pose.t_ms, lo, side='left')
+    i1 = np.searchsorted(pose.t_ms, hi, side='left')
+    return [(int(a), int(b)) for a, b in zip(i0, i1) if b - a >= 2]
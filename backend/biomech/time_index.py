@@ -0,0 +1,98 @@
+"""
+Sorted timestamp index for window and nearest-sample queries.
+
+- window(lo, hi): indices of samples with lo <= t_ms <= hi, by binary search
+- nearest(t): index of the closest sample (earlier sample on ties)
+- conf_mean(lo, hi): mean landmark confidence over a window from prefix sums
+  of per-frame score totals and landmark counts, O(1) after the searches
+
+Timestamps are expected ascending (as PoseArray and the analyzers produce
+them); an unsorted input is indexed through a stable argsort, so queries
+stay O(log n) and return indices into the original order.
+"""
+
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.biomech.pose import SCORE, PoseArray
+
+
+def nearest_index(grid: np.ndarray, t: int) -> int:
+    """Index of the sample in ascending `grid` closest to `t` (earlier sample on ties)."""
+    hi = int(np.clip(np.searchsorted(grid, t, side='left'), 0, len(grid) - 1))
+    lo = max(hi - 1, 0)
+    return hi if abs(grid[hi] - t) < abs(grid[lo] - t) else lo
+
+
+class TimeIndex:
+    def __init__(self, t_ms: Sequence[int], conf_sum: Optional[np.ndarray] = None, conf_count: Optional[np.ndarray] = None):
+        t = np.asarray(t_ms, dtype=np.int64).reshape(-1)
+        self.order: Optional[np.ndarray] = None
+        if len(t) > 1 and not bool(np.all(t[1:] >= t[:-1])):
+            self.order = np.argsort(t, kind='stable')
+            t = t[self.order]
+        self.t_ms = t
+        n = len(t)
+        if conf_sum is None:
+            conf_sum = np.zeros((n,), dtype=float)
+            conf_count = np.zeros((n,), dtype=np.int64)
+        if self.order is not None:
+            conf_sum = np.asarray(conf_sum)[self.order]
+            conf_count = np.asarray(conf_count)[self.order]
+        self._conf_sum = np.concatenate(([0.0], np.cumsum(conf_sum, dtype=float)))
+        self._conf_count = np.concatenate(([0], np.cumsum(conf_count, dtype=np.int64)))
+
+    @classmethod
+    def from_frames(cls, frames: Sequence) -> 'TimeIndex':
+        """Index a List[Frame]; every landmark in `kp` counts toward confidence (missing score = 1.0)."""
+        n = len(frames)
+        conf_sum = np.empty((n,), dtype=float)
+        conf_count = np.empty((n,), dtype=np.int64)
+        for i, f in enumerate(frames):
+            total = 0.0
+            for lm in f.kp.values():
+                total += (lm.score if lm.score is not None else 1.0)
+            conf_sum[i] = total
+            conf_count[i] = len(f.kp)
+        return cls([f.t_ms for f in frames], conf_sum, conf_count)
+
+    @classmethod
+    def from_pose(cls, pose: PoseArray) -> 'TimeIndex':
+        scores = np.where(pose.mask, pose.data[..., SCORE].astype(np.float64), 0.0)
+        return cls(pose.t_ms, scores.sum(axis=1), pose.mask.sum(axis=1))
+
+    @classmethod
+    def of(cls, frames: Union[PoseArray, Sequence]) -> 'TimeIndex':
+        return cls.from_pose(frames) if isinstance(frames, PoseArray) else cls.from_frames(frames)
+
+    def __len__(self) -> int:
+        return len(self.t_ms)
+
+    def span(self, lo: int, hi: int) -> Tuple[int, int]:
+        """[i0, i1) positions in time order of the samples with lo <= t_ms <= hi."""
+        i0 = int(np.searchsorted(self.t_ms, lo, side='left'))
+        i1 = int(np.searchsorted(self.t_ms, hi, side='right'))
+        return i0, max(i0, i1)
+
+    def window(self, lo: int, hi: int) -> np.ndarray:
+        """Indices (into the original order) of the samples with lo <= t_ms <= hi, in time order."""
+        i0, i1 = self.span(lo, hi)
+        if self.order is not None:
+            return self.order[i0:i1]
+        return np.arange(i0, i1)
+
+    def nearest(self, t: int) -> int:
+        """Index (into the original order) of the sample closest to `t`; -1 when empty."""
+        if len(self.t_ms) == 0:
+            return -1
+        i = nearest_index(self.t_ms, t)
+        return int(self.order[i]) if self.order is not None else i
+
+    def conf_mean(self, lo: int, hi: int) -> Optional[float]:
+        """Mean landmark confidence over the samples in [lo, hi]; None when the window has no landmarks."""
+        i0, i1 = self.span(lo, hi)
+        count = int(self._conf_count[i1] - self._conf_count[i0])
+        if count == 0:
+            return None
+        return float(self._conf_sum[i1] - self._conf_sum[i0]) / count
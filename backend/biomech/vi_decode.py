@@ -0,0 +1,88 @@
+"""
+Columnar decoding of Video Intelligence person detections into a PoseArray.
+
+- One pass over each track's timestamped_objects fills preallocated arrays
+  (t_ms, joint [x, y, confidence], presence); no per-landmark dicts or
+  Landmark objects
+- proto-plus messages are read through their raw protobuf (`pb`), which skips
+  the per-attribute marshalling; the VI-shaped records from pose_providers
+  (timedelta offsets) decode through the same loop
+- Landmark i of an object is joint i of the 17-point set (as the analyzer has
+  always read it); the real per-landmark confidence is kept
+- Tracks of one person are merged by a stable sort on time; when several tracks
+  cover the same millisecond, the later track's landmark wins per joint
+"""
+
+from datetime import timedelta
+from typing import Tuple
+
+import numpy as np
+
+from backend.biomech.pose import NUM_JOINTS, PoseArray
+
+
+def _raw(msg):
+    """Underlying protobuf for a proto-plus message, or the object itself."""
+    pb = getattr(type(msg), 'pb', None)
+    if pb is None:
+        return msg
+    try:
+        return pb(msg)
+    except TypeError:
+        return msg
+
+
+def _offset_ms(offset) -> int:
+    if isinstance(offset, timedelta):
+        return offset // timedelta(milliseconds=1)
+    return int(offset.seconds) * 1000 + int(offset.nanos) // 1_000_000
+
+
+def _decode_track(track) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    objs = [o for o in track.timestamped_objects if len(o.landmarks)]
+    n = len(objs)
+    t_ms = np.empty((n,), dtype=np.int64)
+    data = np.zeros((n, NUM_JOINTS, 3), dtype=np.float32)
+    mask = np.zeros((n, NUM_JOINTS), dtype=bool)
+    for i, obj in enumerate(objs):
+        t_ms[i] = _offset_ms(obj.time_offset)
+        row = data[i]
+        lms = obj.landmarks
+        k = min(len(lms), NUM_JOINTS)
+        for j in range(k):
+            lm = lms[j]
+            p = lm.point
+            row[j, 0] = p.x
+            row[j, 1] = p.y
+            row[j, 2] = lm.confidence
+        mask[i, :k] = True
+    return t_ms, data, mask
+
+
+def decode_person(person) -> PoseArray:
+    """PoseArray (ascending t_ms, one row per distinct millisecond) for one person detection annotation."""
+    pose = getattr(person, 'pose', None)
+    if isinstance(pose, PoseArray):
+        return pose
+    parts = [_decode_track(track) for track in _raw(person).tracks]
+    parts = [p for p in parts if len(p[0])]
+    if not parts:
+        return PoseArray.empty()
+    if len(parts) == 1:
+        t_ms, data, mask = parts[0]
+    else:
+        t_ms = np.concatenate([p[0] for p in parts])
+        data = np.concatenate([p[1] for p in parts])
+        mask = np.concatenate([p[2] for p in parts])
+    order = np.argsort(t_ms, kind='stable')
+    t_ms, data, mask = t_ms[order], data[order], mask[order]
+    starts = np.flatnonzero(np.concatenate(([True], t_ms[1:] != t_ms[:-1])))
+    if len(starts) == len(t_ms):
+        return PoseArray(t_ms=t_ms, data=data, mask=mask)
+    # Duplicate timestamps: per joint, take the last row (latest track) that has it
+    rows = np.where(mask, np.arange(len(t_ms))[:, None], -1)
+    last = np.maximum.reduceat(rows, starts, axis=0)            # (G, 17)
+    present = last >= 0
+    merged = data[np.maximum(last, 0), np.arange(NUM_JOINTS)[None, :]]
+    merged[~present] = 0.0
+    return PoseArray(t_ms=t_ms[starts], data=merged, mask=present)
@@ -0,0 +1,122 @@
+"""
+Byte-level cache tiers shared by the analysis caches.
+
+- DiskLRU: files under a local directory, evicted least-recently-used once the
+  directory exceeds max_bytes (access time tracked via mtime)
+- GcsTier: objects under a bucket prefix; any storage error is a miss
+- TieredCache: reads tiers in order (optionally only the first few) and
+  backfills the faster ones on a hit; writes go to every tier
+"""
+
+from typing import List, Optional
+import os
+import tempfile
+import threading
+
+from google.cloud import storage
+
+
+class DiskLRU:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key.replace("/", "_"))
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        # The lock only covers this process; workers of a process pool share the directory,
+        # so an entry may vanish between listing and stat
+        with self._lock:
+            entries = []
+            try:
+                listing = list(os.scandir(self.root))
+            except OSError:
+                return
+            for entry in listing:
+                try:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+                except OSError:
+                    continue
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+class GcsTier:
+    def __init__(self, bucket_name: str, prefix: str):
+        self.bucket_name = bucket_name
+        self.prefix = prefix.rstrip("/") + "/"
+        self._bucket = None
+
+    def _blob(self, key: str):
+        if self._bucket is None:
+            self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket.blob(self.prefix + key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._blob(key).download_as_bytes()
+        except Exception:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        try:
+            self._blob(key).upload_from_string(data, content_type="application/octet-stream")
+        except Exception:
+            pass
+
+
+class TieredCache:
+    def __init__(self, tiers: List[object]):
+        self.tiers = tiers
+
+    def get(self, key: str, tiers: Optional[int] = None) -> Optional[bytes]:
+        """First hit among the tiers (only the first `tiers` of them when given)."""
+        for i, tier in enumerate(self.tiers[:tiers]):
+            data = tier.get(key)
+            if data is not None:
+                for faster in self.tiers[:i]:
+                    faster.put(key, data)
+                return data
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        for tier in self.tiers:
+            tier.put(key, data)
@@ -1,10 +1,37 @@
 import os
+import tempfile
 
 
 GCP_PROJECT = os.getenv("GCP_PROJECT", os.getenv("GOOGLE_CLOUD_PROJECT", "throwpro"))
 GCS_BUCKET = os.getenv("GCS_BUCKET", "praxisforma-videos")
 PUBSUB_TOPIC = os.getenv("PUBSUB_TOPIC", "throwpro-analyze")
 FIRESTORE_COLLECTION = os.getenv("FIRESTORE_COLLECTION", "throwSessions")
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "throwpro-feature-cache"))
+FEATURE_CACHE_MAX_MB = int(os.getenv("FEATURE_CACHE_MAX_MB", "512"))
+FEATURE_CACHE_GCS = os.getenv("FEATURE_CACHE_GCS", "1") not in ("0", "false", "False", "")
+PQS_V1_BACKEND = os.getenv("PQS_V1_BACKEND", "auto")
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", "2"))
+ANALYZE_QUEUE_DEPTH = int(os.getenv("ANALYZE_QUEUE_DEPTH", "8"))
+ANALYZE_EXECUTOR = os.getenv("ANALYZE_EXECUTOR", "process")
+ANALYZE_JOB_TTL_S = int(os.getenv("ANALYZE_JOB_TTL_S", "3600"))
+POSE_PROVIDER = os.getenv("POSE_PROVIDER", "videointelligence")
+POSE_REPLAY_SOURCE = os.getenv("POSE_REPLAY_SOURCE", "")
+POSE_RECORD_DIR = os.getenv("POSE_RECORD_DIR", "")
+POSE_SYNTHETIC_LATENCY_MS = float(os.getenv("POSE_SYNTHETIC_LATENCY_MS", "0"))
+ANNOTATION_CACHE_DIR = os.getenv("ANNOTATION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "throwpro-annotation-cache"))
+ANNOTATION_CACHE_MAX_MB = int(os.getenv("ANNOTATION_CACHE_MAX_MB", "1024"))
+ANNOTATION_CACHE_GCS = os.getenv("ANNOTATION_CACHE_GCS", "1") not in ("0", "false", "False", "")
+ANNOTATE_SEGMENT_S = float(os.getenv("ANNOTATE_SEGMENT_S", "120"))
+ANNOTATE_SEGMENT_OVERLAP_S = float(os.getenv("ANNOTATE_SEGMENT_OVERLAP_S", "2"))
+ANNOTATE_SEGMENT_CONCURRENCY = int(os.getenv("ANNOTATE_SEGMENT_CONCURRENCY", "4"))
+MOTION_PREPASS = os.getenv("MOTION_PREPASS", "1") not in ("0", "false", "False", "")
+MOTION_PREPASS_FPS = float(os.getenv("MOTION_PREPASS_FPS", "5"))
+MOTION_PREPASS_WIDTH = int(os.getenv("MOTION_PREPASS_WIDTH", "160"))
+MOTION_PREPASS_PAD_S = float(os.getenv("MOTION_PREPASS_PAD_S", "2"))
+# The pre-pass streams the whole object through this process; larger gs:// videos are annotated untrimmed (0: local files only)
+MOTION_PREPASS_GCS_MAX_MB = float(os.getenv("MOTION_PREPASS_GCS_MAX_MB", "100"))
+ARTIFACT_UPLOAD_WORKERS = int(os.getenv("ARTIFACT_UPLOAD_WORKERS", "4"))
+LANDMARKS_JSON_EXPORT = os.getenv("LANDMARKS_JSON_EXPORT", "0") not in ("0", "false", "False", "")
 
 
 def as_dict() -> dict:
@@ -13,6 +40,31 @@ def as_dict() -> dict:
         "GCS_BUCKET": GCS_BUCKET,
         "PUBSUB_TOPIC": PUBSUB_TOPIC,
         "FIRESTORE_COLLECTION": FIRESTORE_COLLECTION,
+        "FEATURE_CACHE_DIR": FEATURE_CACHE_DIR,
+        "FEATURE_CACHE_MAX_MB": FEATURE_CACHE_MAX_MB,
+        "FEATURE_CACHE_GCS": FEATURE_CACHE_GCS,
+        "PQS_V1_BACKEND": PQS_V1_BACKEND,
+        "ANALYZE_WORKERS": ANALYZE_WORKERS,
+        "ANALYZE_QUEUE_DEPTH": ANALYZE_QUEUE_DEPTH,
+        "ANALYZE_EXECUTOR": ANALYZE_EXECUTOR,
+        "ANALYZE_JOB_TTL_S": ANALYZE_JOB_TTL_S,
+        "POSE_PROVIDER": POSE_PROVIDER,
+        "POSE_REPLAY_SOURCE": POSE_REPLAY_SOURCE,
+        "POSE_RECORD_DIR": POSE_RECORD_DIR,
+        "POSE_SYNTHETIC_LATENCY_MS": POSE_SYNTHETIC_LATENCY_MS,
+        "ANNOTATION_CACHE_DIR": ANNOTATION_CACHE_DIR,
+        "ANNOTATION_CACHE_MAX_MB": ANNOTATION_CACHE_MAX_MB,
+        "ANNOTATION_CACHE_GCS": ANNOTATION_CACHE_GCS,
+        "ANNOTATE_SEGMENT_S": ANNOTATE_SEGMENT_S,
+        "ANNOTATE_SEGMENT_OVERLAP_S": ANNOTATE_SEGMENT_OVERLAP_S,
+        "ANNOTATE_SEGMENT_CONCURRENCY": ANNOTATE_SEGMENT_CONCURRENCY,
+        "MOTION_PREPASS": MOTION_PREPASS,
+        "MOTION_PREPASS_FPS": MOTION_PREPASS_FPS,
+        "MOTION_PREPASS_WIDTH": MOTION_PREPASS_WIDTH,
+        "MOTION_PREPASS_PAD_S": MOTION_PREPASS_PAD_S,
+        "MOTION_PREPASS_GCS_MAX_MB": MOTION_PREPASS_GCS_MAX_MB,
+        "ARTIFACT_UPLOAD_WORKERS": ARTIFACT_UPLOAD_WORKERS,
+        "LANDMARKS_JSON_EXPORT": LANDMARKS_JSON_EXPORT,
     }
 
 
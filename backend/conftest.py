@@ -0,0 +1,22 @@
+"""
+Shared test fixtures.
+
+- the analyzer's default feature cache (local directory plus GCS) is off for
+  every test; tests that exercise caching build a FeatureCache and pass it in
+- offline: no envelope lookup or GCS client against live GCP
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _no_default_feature_cache(monkeypatch):
+    monkeypatch.setattr('backend.biomech.feature_cache.FeatureCache.default', lambda *a, **k: None)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    # Fixed envelope; any storage.Client (artifact uploads, replay lookups) fails like an unreachable GCS
+    env = ({'version': 1, 'components': {}}, False)
+    monkeypatch.setattr('backend.scoring.load_active_envelope', lambda *a: env)
+    monkeypatch.setattr('google.cloud.storage.Client', lambda *a, **k: (_ for _ in ()).throw(RuntimeError('offline')))
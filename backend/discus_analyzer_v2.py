@@ -1,18 +1,26 @@
-from google.cloud import videointelligence
 from google.cloud import storage
 import json
 import gzip
 from datetime import datetime
 import os
 import math
-import re
+import time
 import glob
-import tempfile
 from typing import List, Dict, Optional
 import argparse
-from backend.coaching.throwpro import generate_throw_feedback
 
-from pqs_algorithm import Frame as PQSFrame, Landmark as PQSLandmark, calculate_pqs, calculate_pqs_v2, detect_handedness, detect_release_idx
+import numpy as np
+
+from backend.artifacts import ArtifactUploads
+from backend.biomech.person_select import candidate_from_track_person, select_athlete
+from backend.biomech.legacy_text import iter_people
+from backend.biomech.landmark_archive import encode_archive, pose_to_records
+from backend.biomech.vi_decode import decode_person
+from backend.config import LANDMARKS_JSON_EXPORT
+from backend.pose_providers import PoseProvider, VideoIntelligenceProvider, get_pose_provider
+from backend.biomech.throws import segment_throws
+from backend.scoring import pqs_block, score_session, score_throws, session_summary
+
 
 class ComprehensiveDiscusAnalyzer:
     def __init__(self):
@@ -38,7 +46,7 @@ class ComprehensiveDiscusAnalyzer:
         }
     
     def check_video_size(self, video_name):
-        """Check if video is under 400MB"""
+        """Check the video exists; videos over 400MB are annotated in overlapping segments"""
         try:
             storage_client = storage.Client()
             bucket_name = "praxisforma-videos"
@@ -56,12 +64,10 @@ class ComprehensiveDiscusAnalyzer:
             print("Video size: " + str(round(file_size_mb, 1)) + " MB")
             
             if file_size_mb > 400:
-                print("ERROR: Video is too large (" + str(round(file_size_mb, 1)) + "MB)")
-                print("Maximum file size is 400MB for reliable processing.")
-                return False
+                print("Large video (" + str(round(file_size_mb, 1)) + "MB): long recordings are annotated in parallel segments")
             else:
                 print("Video size OK for processing (under 400MB)")
-                return True
+            return True
                 
         except Exception as e:
             print("ERROR checking video size: " + str(e))
@@ -80,39 +86,12 @@ class ComprehensiveDiscusAnalyzer:
         safe_video_name = video_name.replace(" ", "_").replace("(", "").replace(")", "").replace(".mp4", "")
         output_filename = "full_analysis_" + safe_video_name + "_" + timestamp + ".txt"
         
-        # Initialize Video Intelligence client
-        client = videointelligence.VideoIntelligenceServiceClient()
-        
-        # Configure for person detection with ALL pose landmarks
-        features = [videointelligence.Feature.PERSON_DETECTION]
-        
-        person_config = videointelligence.PersonDetectionConfig(
-            include_bounding_boxes=True,
-            include_attributes=True,
-            include_pose_landmarks=True,
-        )
-        
-        video_context = videointelligence.VideoContext(
-            person_detection_config=person_config
-        )
-        
-        # Full path to video
+        # Person detection with ALL pose landmarks; long videos go out as concurrent segments
         input_uri = "gs://praxisforma-videos/" + video_name
-        
-        # Start the analysis
-        operation = client.annotate_video(
-            request={
-                "features": features,
-                "input_uri": input_uri,
-                "video_context": video_context,
-            }
-        )
-        
         print("Processing video... this may take up to 30 minutes")
-        result = operation.result(timeout=1800)  # 30 minute timeout
-        
-        # Extract ALL pose data
-        annotations = result.annotation_results[0]
+        annotations, ingest = VideoIntelligenceProvider(record_dir="").annotate(input_uri)
+        if ingest.get("segments"):
+            print("Annotated " + str(ingest["segments"]) + " segments in " + str(round(ingest["annotate_ms"] / 1000.0, 1)) + "s")
         
         # Open output file for writing
         with open(output_filename, 'w') as f:
@@ -187,133 +166,63 @@ class ComprehensiveDiscusAnalyzer:
     def analyze_biomechanics_from_file(self, analysis_filename):
         """Extract biomechanics from comprehensive analysis file"""
         print("Analyzing biomechanics from: " + analysis_filename)
-        
-        with open(analysis_filename, 'r') as f:
-            content = f.read()
-        
-        lines = content.split('\n')
-        all_people_data = {}
-        current_person = None
-        current_time = None
-        
-        # Parse all people and their landmark data
-        for line in lines:
-            # Look for person sections
-            if line.startswith("PERSON ") and ":" in line:
-                person_match = re.search(r'PERSON (\d+):', line)
-                if person_match:
-                    current_person = int(person_match.group(1))
-                    all_people_data[current_person] = {'confidence': 0, 'frames': {}}
-            
-            # Look for confidence
-            elif "Track confidence:" in line and current_person is not None:
-                conf_match = re.search(r'confidence: ([\d.]+)', line)
-                if conf_match:
-                    all_people_data[current_person]['confidence'] = float(conf_match.group(1))
-            
-            # Look for time stamps
-            elif "Time:" in line and "landmarks" in line and current_person is not None:
-                time_match = re.search(r'Time: ([\d.]+)s', line)
-                if time_match:
-                    current_time = float(time_match.group(1))
-                    all_people_data[current_person]['frames'][current_time] = {}
-            
-            # Look for landmark coordinates
-            elif "Landmark" in line and "x=" in line and current_person is not None and current_time is not None:
-                landmark_match = re.search(r'Landmark (\d+): x=([\d.]+), y=([\d.]+)', line)
-                if landmark_match:
-                    landmark_id = int(landmark_match.group(1))
-                    x = float(landmark_match.group(2))
-                    y = float(landmark_match.group(3))
-                    all_people_data[current_person]['frames'][current_time][landmark_id] = {'x': x, 'y': y}
-        
+
+        # Stream the dump into per-person landmark arrays
+        people = {p.person_id: p for p in iter_people(analysis_filename)}
+
         # Now analyze biomechanics for each person
         print("\n" + "=" * 60)
         print("BIOMECHANICAL ANALYSIS OF ALL PEOPLE")
         print("=" * 60)
-        
-        for person_id, person_data in all_people_data.items():
-            if not person_data['frames']:
+
+        name_by_id = {v: k for k, v in self.LANDMARKS.items()}
+        for person_id, person in people.items():
+            pose = person.pose
+            if not len(pose):
                 continue
-                
+
             print(f"\n=== PERSON {person_id} ===")
-            print(f"Confidence: {person_data['confidence']:.3f}")
-            print(f"Frames with data: {len(person_data['frames'])}")
-            
-            # Analyze key frames for this person
-            times = sorted(person_data['frames'].keys())
-            if len(times) == 0:
-                continue
-                
+            print(f"Confidence: {person.confidence:.3f}")
+            print(f"Frames with data: {len(pose)}")
+
             # Sample frames throughout the sequence
-            sample_times = times[::max(1, len(times)//5)] if len(times) > 5 else times
-            
-            for time in sample_times[:3]:  # Show first 3 sample frames
-                landmarks = person_data['frames'][time]
+            n = len(pose)
+            sample_rows = list(range(0, n, max(1, n // 5))) if n > 5 else list(range(n))
+
+            for row in sample_rows[:3]:  # Show first 3 sample frames
+                landmarks = {j: {'x': float(pose.data[row, j, 0]), 'y': float(pose.data[row, j, 1])}
+                             for j in np.flatnonzero(pose.mask[row]).tolist()}
                 insights = self.analyze_frame_biomechanics(landmarks)
-                
+
                 if insights:
-                    print(f"\n--- Time: {time:.2f}s ---")
+                    print(f"\n--- Time: {pose.t_ms[row] / 1000.0:.2f}s ---")
                     for key, value in insights.items():
                         if 'feedback' in key:
                             print(f"{key.replace('_feedback', '').upper()}: {value}")
                         elif 'angle' in key:
                             print(f"{key.replace('_', ' ').upper()}: {value:.1f}°")
-        
-        # Build PQS-ready frames for the highest-confidence person (if available)
-        top_person_id = None
-        top_conf = -1.0
-        for pid, pdata in all_people_data.items():
-            if pdata.get('confidence', 0) > top_conf and pdata.get('frames'):
-                top_conf = pdata['confidence']
-                top_person_id = pid
-
-        if top_person_id is None:
+
+        # Score the highest-confidence person with frames (if available)
+        top = None
+        for person in people.values():
+            if len(person.pose) and (top is None or person.confidence > top.confidence):
+                top = person
+
+        if top is None:
             print("No person with frames to compute PQS")
-            return all_people_data
-
-        person_frames = all_people_data[top_person_id]['frames']
-        # Convert to ordered PQSFrame list
-        ordered_times = sorted(person_frames.keys())
-        pqs_frames: List[PQSFrame] = []
-        for t_sec in ordered_times:
-            lm_map: Dict[str, PQSLandmark] = {}
-            fv = person_frames[t_sec]
-            # Map numeric ids to names per LANDMARKS
-            name_by_id = {v: k for k, v in self.LANDMARKS.items()}
-            for lm_id, xy in fv.items():
-                name = name_by_id.get(lm_id)
-                if not name:
-                    continue
-                lm_map[name] = PQSLandmark(x=xy['x'], y=xy['y'], score=1.0)
-            pqs_frames.append(PQSFrame(t_ms=int(t_sec * 1000), kp=lm_map))
+            return people
 
         # PQS v1 and v2
-        handedness = detect_handedness(pqs_frames)
-        rel_idx = detect_release_idx(pqs_frames, handedness)
-        pqs = calculate_pqs(pqs_frames)
-        pqs_v2 = calculate_pqs_v2(pqs_frames, handedness, rel_idx)
+        scored = score_session(top.pose)
+        pqs = scored.pqs
 
         # Emit compact JSON alongside verbose text file
         video_basename = os.path.splitext(os.path.basename(analysis_filename))[0]
+        t_ms = top.pose.t_ms
         json_out = {
-            "video": {"name": video_basename, "duration_ms": (ordered_times[-1] - ordered_times[0]) * 1000 if ordered_times else 0},
-            "pqs": {
-                "total": pqs.total,
-                "components": {
-                    "shoulder_alignment": pqs.shoulder_alignment,
-                    "hip_rotation": pqs.hip_rotation,
-                    "release_angle": pqs.release_angle,
-                    "power_transfer": pqs.power_transfer,
-                    "footwork_timing": pqs.footwork_timing,
-                },
-                "deductions": pqs.deductions,
-                "release_t_ms": pqs.release_t_ms,
-                "handedness": pqs.handedness,
-                "flags": pqs.flags,
-                "notes": pqs.notes,
-            },
-            "pqs_v2": pqs_v2,
+            "video": {"name": video_basename, "duration_ms": int(t_ms[-1] - t_ms[0])},
+            "pqs": pqs_block(pqs),
+            "pqs_v2": scored.pqs_v2,
         }
         json_name = f"{video_basename}.pqs.json"
         with open(json_name, "w") as jf:
@@ -322,220 +231,129 @@ class ComprehensiveDiscusAnalyzer:
         print(f"PQS={pqs.total} (R@{pqs.release_t_ms}) [side={pqs.handedness}]")
         print(f"Wrote {json_name}")
 
-        return all_people_data
-
-
-def _annotate_video_from_local(path: str):
-    client = videointelligence.VideoIntelligenceServiceClient()
-    features = [videointelligence.Feature.PERSON_DETECTION]
-    person_config = videointelligence.PersonDetectionConfig(
-        include_bounding_boxes=True,
-        include_attributes=True,
-        include_pose_landmarks=True,
-    )
-    video_context = videointelligence.VideoContext(person_detection_config=person_config)
-    with open(path, "rb") as f:
-        content = f.read()
-    operation = client.annotate_video(
-        request={
-            "features": features,
-            "input_content": content,
-            "video_context": video_context,
-        }
-    )
-    result = operation.result(timeout=1800)
-    return result.annotation_results[0]
+        return people
+
+
+def _gcs_target(video_uri_or_path: str):
+    """(bucket, uid or None, basename) for outputs derived from an input video path or gs:// URI."""
+    bucket_name = os.getenv("GCS_BUCKET", "praxisforma-videos")
+    user_id = None
+    base = os.path.splitext(os.path.basename(video_uri_or_path))[0]
+    if isinstance(video_uri_or_path, str) and video_uri_or_path.startswith("gs://"):
+        try:
+            _, rest = video_uri_or_path.split("gs://", 1)
+            bkt, path = rest.split("/", 1)
+            bucket_name = bkt
+            parts = path.split("/")
+            if len(parts) >= 3:
+                user_id = parts[1]
+                base = os.path.splitext(parts[-1])[0]
+        except Exception:
+            pass
+    return bucket_name, user_id, base
 
 
-def _download_gsuri_to_temp(gs_uri: str) -> str:
-    assert gs_uri.startswith("gs://")
-    _, rest = gs_uri.split("gs://", 1)
-    bucket_name, blob_name = rest.split("/", 1)
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
-    os.close(fd)
-    blob.download_to_filename(tmp_path)
-    return tmp_path
+def _put_landmarks(uploads: ArtifactUploads, pose, prefix: str, video_name: str) -> Dict[str, str]:
+    """Queue the landmark archive (and the optional JSON export) as {prefix}.landmarks.*; returns the asset URIs."""
+    assets = {"landmarks_uri": f"{prefix}.landmarks.bin"}
+    uploads.put(assets["landmarks_uri"], lambda: encode_archive(pose, meta={"video": video_name}), "application/octet-stream")
+    if LANDMARKS_JSON_EXPORT:
+        assets["landmarks_json_uri"] = f"{prefix}.landmarks.json"
+        uploads.put(assets["landmarks_json_uri"], lambda: gzip.compress(json.dumps(pose_to_records(pose)).encode("utf-8")),
+                    "application/json")
+    return assets
 
 
-def analyze_video(video_uri_or_path: str, with_coaching: bool = False, event_type: str = "discus", athlete_profile: dict | None = None) -> dict:
+def analyze_video(video_uri_or_path: str, with_coaching: bool = False, event_type: str = "discus", athlete_profile: dict | None = None,
+                  provider: Optional[PoseProvider] = None, uploads: Optional[ArtifactUploads] = None,
+                  artifacts_prefix: Optional[str] = None) -> dict:
     """
-    Accepts a local path or gs:// URI. If gs://, downloads to temp.
-    Runs pose -> PQS -> returns a dict matching the .pqs.json schema.
+    Accepts a local path or gs:// URI. Landmarks come from `provider` (default
+    POSE_PROVIDER: Video Intelligence, which annotates gs:// URIs in place and
+    uploads local files inline; or replay / synthetic, see pose_providers).
+    Runs pose -> PQS -> returns a dict matching the .pqs.json schema. When the
+    video holds several throws, each is scored separately: 'session' lists them
+    and the top-level pqs / pqs_v2 / coaching are those of the best throw.
+    Artifacts (landmark archive under assets) upload in the background on
+    `uploads` and may still be in flight on return; uploads.completion()
+    reports when they land. They are written as {artifacts_prefix}.landmarks.bin
+    (gs:// or local), by default gs://{bucket}/landmarks/{uid}/{basename}.
     """
-    local_path: Optional[str] = None
-    temp_to_cleanup: Optional[str] = None
-    try:
-        if video_uri_or_path.startswith("gs://"):
-            local_path = _download_gsuri_to_temp(video_uri_or_path)
-            temp_to_cleanup = local_path
-        else:
-            local_path = video_uri_or_path
-
-        annotations = _annotate_video_from_local(local_path)
-
-        # Build all_people_data in-memory
-        all_people_data: Dict[int, Dict] = {}
-        if annotations.person_detection_annotations:
-            for person_idx, person in enumerate(annotations.person_detection_annotations):
-                conf = float(person.tracks[0].confidence) if person.tracks else 0.0
-                frames_map: Dict[float, Dict[int, Dict[str, float]]] = {}
-                for track in person.tracks:
-                    for timestamped_object in track.timestamped_objects:
-                        if not timestamped_object.landmarks:
-                            continue
-                        t = float(timestamped_object.time_offset.total_seconds())
-                        if t not in frames_map:
-                            frames_map[t] = {}
-                        for landmark_idx, landmark in enumerate(timestamped_object.landmarks):
-                            frames_map[t][landmark_idx] = {
-                                "x": float(landmark.point.x),
-                                "y": float(landmark.point.y),
-                            }
-                all_people_data[person_idx + 1] = {"confidence": conf, "frames": frames_map}
-
-        # Choose top person by confidence
-        if not all_people_data:
-            ordered_times = []
-            pqs_total = 0
-            pqs_obj = {
-                "total": 0,
-                "components": {
-                    "shoulder_alignment": 0,
-                    "hip_rotation": 0,
-                    "release_angle": 0,
-                    "power_transfer": 0,
-                    "footwork_timing": 0,
-                },
-                "deductions": 0,
-                "release_t_ms": None,
-                "handedness": "right",
-                "flags": ["no_person_detected"],
-                "notes": ["No pose landmarks detected"],
-            }
-            return {
-                "video": {"name": os.path.basename(video_uri_or_path), "duration_ms": 0},
-                "pqs": pqs_obj,
-            }
-
-        top_person_id = max(all_people_data.keys(), key=lambda pid: all_people_data[pid].get("confidence", 0))
-        person_frames = all_people_data[top_person_id]["frames"]
-        ordered_times = sorted(person_frames.keys())
-        name_by_id = {
-            0: "nose",
-            1: "left_eye",
-            2: "right_eye",
-            3: "left_ear",
-            4: "right_ear",
-            5: "left_shoulder",
-            6: "right_shoulder",
-            7: "left_elbow",
-            8: "right_elbow",
-            9: "left_wrist",
-            10: "right_wrist",
-            11: "left_hip",
-            12: "right_hip",
-            13: "left_knee",
-            14: "right_knee",
-            15: "left_ankle",
-            16: "right_ankle",
-        }
-        pqs_frames: List[PQSFrame] = []
-        for t_sec in ordered_times:
-            lm_map: Dict[str, PQSLandmark] = {}
-            fv = person_frames[t_sec]
-            for lm_id, xy in fv.items():
-                name = name_by_id.get(lm_id)
-                if not name:
-                    continue
-                lm_map[name] = PQSLandmark(x=xy["x"], y=xy["y"], score=1.0)
-            pqs_frames.append(PQSFrame(t_ms=int(t_sec * 1000), kp=lm_map))
-
-        # v1
-        pqs = calculate_pqs(pqs_frames)
-        # v2
-        handedness = detect_handedness(pqs_frames)
-        rel_idx = detect_release_idx(pqs_frames, handedness)
-        # Use athlete profile context if provided, else defaults
-        ctx = athlete_profile or {}
-        ctx_event = event_type or 'discus'
-        ctx_age = ctx.get('ageBand') or 'Open'
-        ctx_sex = ctx.get('sex') or 'M'
-        ctx_hand = ctx.get('handedness') or handedness
-        pqs_v2 = calculate_pqs_v2(pqs_frames, ctx_hand, rel_idx, event=ctx_event, age_band=ctx_age, sex=ctx_sex)
-
-        result = {
-            "video": {
-                "name": os.path.basename(video_uri_or_path),
-                "duration_ms": int((ordered_times[-1] - ordered_times[0]) * 1000) if ordered_times else 0,
-            },
-            "pqs": {
-                "total": pqs.total,
-                "components": {
-                    "shoulder_alignment": pqs.shoulder_alignment,
-                    "hip_rotation": pqs.hip_rotation,
-                    "release_angle": pqs.release_angle,
-                    "power_transfer": pqs.power_transfer,
-                    "footwork_timing": pqs.footwork_timing,
-                },
-                "deductions": pqs.deductions,
-                "release_t_ms": pqs.release_t_ms,
-                "handedness": pqs.handedness,
-                "flags": pqs.flags,
-                "notes": pqs.notes,
+    annotations, ingest = (provider or get_pose_provider()).annotate(video_uri_or_path)
+
+    # Rank every detected person on wrist/hip motion from four joints each, then
+    # materialize the full landmark set for the selected athlete only
+    people = list(annotations.person_detection_annotations or [])
+    candidates = [candidate_from_track_person(i + 1, person) for i, person in enumerate(people)]
+    best = select_athlete(candidates)
+
+    if best is None:
+        ordered_times = []
+        pqs_total = 0
+        pqs_obj = {
+            "total": 0,
+            "components": {
+                "shoulder_alignment": 0,
+                "hip_rotation": 0,
+                "release_angle": 0,
+                "power_transfer": 0,
+                "footwork_timing": 0,
             },
-            "pqs_v2": pqs_v2,
+            "deductions": 0,
+            "release_t_ms": None,
+            "handedness": "right",
+            "flags": ["no_person_detected"],
+            "notes": ["No pose landmarks detected"],
+        }
+        return {
+            "video": {"name": os.path.basename(video_uri_or_path), "duration_ms": 0},
+            "pqs": pqs_obj,
+            "ingest": ingest,
         }
-        if with_coaching:
-            result["coaching"] = generate_throw_feedback(pqs_v2, event_type=event_type, athlete_profile=athlete_profile or {})
 
-        # Persist per-frame landmarks (compressed JSON) to GCS and include URI in result.assets
-        try:
-            frames_out = []
-            for t_sec in ordered_times:
-                fv = person_frames[t_sec]
-                landmarks = [{"x": float(xy["x"]), "y": float(xy["y"]), "z": None, "confidence": 1.0} for _, xy in fv.items()]
-                frames_out.append({"timestamp_ms": int(t_sec * 1000), "landmarks": landmarks})
-
-            # Determine bucket, uid, and basename
-            bucket_name = os.getenv("GCS_BUCKET", "praxisforma-videos")
-            user_id = None
-            base = os.path.splitext(os.path.basename(video_uri_or_path))[0]
-            if isinstance(video_uri_or_path, str) and video_uri_or_path.startswith("gs://"):
-                try:
-                    _, rest = video_uri_or_path.split("gs://", 1)
-                    bkt, path = rest.split("/", 1)
-                    bucket_name = bkt
-                    parts = path.split("/")
-                    if len(parts) >= 3:
-                        user_id = parts[1]
-                        base = os.path.splitext(parts[-1])[0]
-                except Exception:
-                    pass
-            if not user_id:
-                user_id = "unknown"
-
-            landmarks_path = f"landmarks/{user_id}/{base}.landmarks.json"
-            client = storage.Client()
-            bucket = client.bucket(bucket_name)
-            blob = bucket.blob(landmarks_path)
-            payload = json.dumps(frames_out).encode("utf-8")
-            gz = gzip.compress(payload)
-            blob.upload_from_string(gz, content_type="application/json")
-            result.setdefault("assets", {})["landmarks_uri"] = f"gs://{bucket_name}/{landmarks_path}"
-        except Exception:
-            pass
+    pose = decode_person(people[best])
 
-        return result
-    finally:
-        # Cleanup temp file if created
-        if 'temp_to_cleanup' in locals() and temp_to_cleanup and os.path.exists(temp_to_cleanup):
-            try:
-                os.remove(temp_to_cleanup)
-            except Exception:
-                pass
+    # Determine bucket, uid, and basename
+    bucket_name, user_id, base = _gcs_target(video_uri_or_path)
+
+    # Landmarks are final now: persist them in the background while scoring runs
+    uploads = uploads if uploads is not None else ArtifactUploads()
+    prefix = artifacts_prefix or f"gs://{bucket_name}/landmarks/{user_id or 'unknown'}/{base}"
+    assets = _put_landmarks(uploads, pose, prefix, os.path.basename(video_uri_or_path))
+
+    # v1, v2 and coaching in one pass; athlete profile supplies age band / sex / side when known
+    try:
+        from backend.biomech.feature_cache import FeatureCache
+        # Landmarks fresh from the pose service are first-seen: their features cannot be in GCS yet
+        seen_before = ingest.get("source") in ("cache", "replay")
+        feature_cache = FeatureCache.default(user_id, remote_reads=seen_before)
+    except Exception:
+        feature_cache = None
+    # Session videos with several throws are scored per throw window; dead time between throws is never scored
+    seg_start = time.perf_counter()
+    windows = segment_throws(pose)
+    segment_ms = round((time.perf_counter() - seg_start) * 1000.0, 3)
+    if len(windows) >= 2:
+        throw_scores, timings = score_throws(pose, windows, athlete_profile, event=event_type, with_coaching=with_coaching,
+                                            feature_cache=feature_cache)
+        session = session_summary(pose, windows, throw_scores)
+        scored_block = {**throw_scores[session["best_index"]].as_result(), "session": session}
+        scored_block["timings_ms"] = {"segment": segment_ms, **timings}
+    else:
+        scored = score_session(pose, athlete_profile, event=event_type, with_coaching=with_coaching, feature_cache=feature_cache)
+        scored_block = scored.as_result()
+
+    result = {
+        "video": {
+            "name": os.path.basename(video_uri_or_path),
+            "duration_ms": int(pose.t_ms[-1] - pose.t_ms[0]) if len(pose) else 0,
+        },
+        **scored_block,
+        "ingest": ingest,
+        "assets": assets,
+    }
+
+    return result
     
     def analyze_frame_biomechanics(self, landmarks):
         """Analyze biomechanics for a single frame"""
@@ -624,19 +442,15 @@ def analyze_existing_file(analysis_filename):
     return results
 
 def list_available_videos():
-    """List all videos in the bucket"""
+    """List all videos in the bucket (one paged listing with name/size only; no per-blob reload)"""
     try:
         storage_client = storage.Client()
         bucket_name = "praxisforma-videos"
-        bucket = storage_client.bucket(bucket_name)
-        blobs = bucket.list_blobs()
+        blobs = storage_client.list_blobs(bucket_name, fields="items(name,size),nextPageToken")
         
         videos = []
         for blob in blobs:
             if blob.name.endswith('.mp4'):
-                # Reload blob to get current metadata
-                blob.reload()
-                
                 if blob.size is not None:
                     size_mb = float(blob.size) / (1024.0 * 1024.0)
                     videos.append({
@@ -664,19 +478,29 @@ if __name__ == "__main__":
     args, _ = parser.parse_known_args()
 
     if args.input_path:
-        out = analyze_video(args.input_path)
+        uploads = ArtifactUploads()
+        out = analyze_video(args.input_path, uploads=uploads)
         base = os.path.splitext(os.path.basename(args.input_path))[0]
         json_name = f"{base}.pqs.json"
         with open(json_name, "w") as jf:
             json.dump(out, jf, indent=2)
         pqs = out.get("pqs", {})
         print(f"PQS={pqs.get('total', 0)} (R@{pqs.get('release_t_ms')}) [side={pqs.get('handedness','?')}]")
+        print("scoring ms: " + ", ".join(f"{k}={v:.1f}" for k, v in (out.get("timings_ms") or {}).items()))
+        session = out.get("session")
+        if session:
+            print(f"throws={session['throw_count']} best=#{session['best_index']} " +
+                  " ".join(f"[{t['start_ms']}-{t['end_ms']}ms PQS={t['pqs']['total']}]" for t in session["throws"]))
+        ingest = out.get("ingest") or {}
+        print(f"ingest: {ingest.get('source')} sent={ingest.get('bytes_sent')}B annotate={ingest.get('annotate_ms')}ms")
         print(f"Wrote {json_name}")
+        for uri, err in uploads.wait().items():
+            print(f"Uploaded {uri}" if err is None else f"Upload failed {uri}: {err}")
     else:
         print("=== PRAXISFORMA DISCUS ANALYZER ===")
     print("1. Analyze new video (single)")
     print("2. Analyze new video (select from bucket)")
-    print("3. Analyze new video (process ALL videos under 400MB)")
+    print("3. Analyze new video (process ALL videos; for backfills use python -m backend.batch_analyze)")
     print("4. Analyze existing analysis file (select)")
     print("5. Analyze existing analysis file (process ALL analysis files)")
     
@@ -698,21 +522,18 @@ if __name__ == "__main__":
         else:
             print("\nAvailable videos:")
             for i, video in enumerate(videos):
-                status = "✅" if video['under_400mb'] else "❌ TOO LARGE"
+                status = "✅" if video['under_400mb'] else "✅ (segmented)"
                 print(str(i+1) + ". " + video['name'] + " (" + str(round(video['size_mb'], 1)) + " MB) " + status)
             
             try:
                 selection = int(input("\nSelect video (1-" + str(len(videos)) + "): ")) - 1
                 if 0 <= selection < len(videos):
                     selected_video = videos[selection]
-                    if selected_video['under_400mb']:
-                        print("Processing: " + selected_video['name'])
-                        result_file = analyze_new_video(selected_video['name'])
-                        if result_file:
-                            print("Analysis complete! Now analyzing biomechanics...")
-                            analyze_existing_file(result_file)
-                    else:
-                        print("Selected video is too large (over 400MB)")
+                    print("Processing: " + selected_video['name'])
+                    result_file = analyze_new_video(selected_video['name'])
+                    if result_file:
+                        print("Analysis complete! Now analyzing biomechanics...")
+                        analyze_existing_file(result_file)
                 else:
                     print("Invalid selection")
             except ValueError:
@@ -721,12 +542,12 @@ if __name__ == "__main__":
     elif choice == "3":
         print("\nFetching all videos...")
         videos = list_available_videos()
-        processable_videos = [v for v in videos if v['under_400mb']]
+        processable_videos = videos
         
         if not processable_videos:
-            print("No videos under 400MB found!")
+            print("No videos found!")
         else:
-            print("Found " + str(len(processable_videos)) + " videos under 400MB:")
+            print("Found " + str(len(processable_videos)) + " videos:")
             for video in processable_videos:
                 print("  - " + video['name'] + " (" + str(round(video['size_mb'], 1)) + " MB)")
             
@@ -0,0 +1,154 @@
+"""
+Local motion pre-pass: find the active part of a video before paying for pose annotation.
+
+Video Intelligence bills and queues by video duration, and session recordings
+carry long stretches of setup (walking to the ring, waiting). Before the
+annotate call the video is skimmed locally:
+- decode with OpenCV, retrieving only MOTION_PREPASS_FPS frames per second
+  (the frames in between are grabbed, never converted)
+- each sampled frame is downscaled to MOTION_PREPASS_WIDTH px, grayscale,
+  blurred, and differenced against the previous sample
+- motion = fraction of pixels whose change exceeds _PIXEL_DELTA
+- active samples are those above MOTION_ACTIVE_FRAC of the session's peak
+  motion level (throws are the most energetic thing in the frame); the
+  window runs from the first to the last active sample, padded by
+  MOTION_PREPASS_PAD_S
+
+The window is sent as a VideoSegment, so annotation time and cost scale with
+the trimmed duration. When the window would save less than
+MOTION_MIN_SAVING of the video, or nothing moves, the video is annotated whole.
+
+Every frame is grabbed, so the pre-pass reads the whole video: for gs:// inputs
+that is the full object streamed through a signed URL, which is what input_uri
+annotation otherwise avoids. The provider reports it as prepass_bytes_read /
+prepass_ms in ingest and skips the pre-pass for objects over
+MOTION_PREPASS_GCS_MAX_MB.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+import os
+import time
+
+import numpy as np
+
+from backend.config import MOTION_PREPASS_FPS, MOTION_PREPASS_PAD_S, MOTION_PREPASS_WIDTH
+
+
+MOTION_ACTIVE_FRAC = 0.25
+MOTION_MIN_SAVING = 0.1
+_PIXEL_DELTA = 12
+
+
+@dataclass
+class MotionWindow:
+    start_s: float
+    end_s: float
+    duration_s: float
+    prepass_ms: float
+    samples: int
+    bytes_read: int = 0
+
+    @property
+    def trimmed(self) -> bool:
+        return self.start_s > 0.0 or self.end_s < self.duration_s
+
+    def as_ingest(self) -> dict:
+        return {
+            "start_s": round(self.start_s, 3),
+            "end_s": round(self.end_s, 3),
+            "duration_s": round(self.duration_s, 3),
+        }
+
+
+def prepass_settings() -> dict:
+    """Every setting that moves the window for a given video (part of the annotation cache key)."""
+    return {
+        "fps": MOTION_PREPASS_FPS,
+        "width": MOTION_PREPASS_WIDTH,
+        "pad_s": MOTION_PREPASS_PAD_S,
+        "active_frac": MOTION_ACTIVE_FRAC,
+        "min_saving": MOTION_MIN_SAVING,
+        "pixel_delta": _PIXEL_DELTA,
+    }
+
+
+def source_size(video_uri_or_path: str) -> Optional[int]:
+    """Bytes in the video (one metadata call for gs://); None when unknown."""
+    try:
+        if not video_uri_or_path.startswith("gs://"):
+            return os.path.getsize(video_uri_or_path)
+        from google.cloud import storage
+        bucket_name, blob_name = video_uri_or_path[len("gs://"):].split("/", 1)
+        blob = storage.Client().bucket(bucket_name).get_blob(blob_name)
+        return int(blob.size) if blob is not None and blob.size is not None else None
+    except Exception:
+        return None
+
+
+def capture_source(video_uri_or_path: str) -> str:
+    """What cv2.VideoCapture should open: the path, or a short-lived signed URL for gs:// objects."""
+    if not video_uri_or_path.startswith("gs://"):
+        return video_uri_or_path
+    from datetime import timedelta
+    from google.cloud import storage
+    bucket_name, blob_name = video_uri_or_path[len("gs://"):].split("/", 1)
+    blob = storage.Client().bucket(bucket_name).blob(blob_name)
+    return blob.generate_signed_url(expiration=timedelta(minutes=30), method="GET")
+
+
+def motion_series(video_uri_or_path: str, fps: Optional[float] = None, width: Optional[int] = None):
+    """(sample times s, motion fraction per sample, video duration s); raises when the video cannot be read."""
+    import cv2
+    fps = MOTION_PREPASS_FPS if fps is None else fps
+    width = MOTION_PREPASS_WIDTH if width is None else width
+    cap = cv2.VideoCapture(capture_source(video_uri_or_path))
+    if not cap.isOpened():
+        raise IOError(f"cannot open {video_uri_or_path}")
+    try:
+        src_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        stride = max(1, int(round(src_fps / fps)))
+        times, motion = [], []
+        prev = None
+        i = 0
+        while cap.grab():
+            if i % stride == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                h, w = frame.shape[:2]
+                small = cv2.resize(frame, (width, max(1, int(h * width / w))), interpolation=cv2.INTER_AREA)
+                gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+                if prev is not None:
+                    times.append(i / src_fps)
+                    motion.append(float(np.count_nonzero(cv2.absdiff(gray, prev) > _PIXEL_DELTA)) / gray.size)
+                prev = gray
+            i += 1
+        duration = i / src_fps
+    finally:
+        cap.release()
+    return np.asarray(times, dtype=float), np.asarray(motion, dtype=float), duration
+
+
+def active_window(video_uri_or_path: str, pad_s: Optional[float] = None, size: Optional[int] = None) -> Optional[MotionWindow]:
+    """Padded window around the video's motion; None when the pre-pass cannot read the video. size: known byte size."""
+    start = time.perf_counter()
+    pad_s = MOTION_PREPASS_PAD_S if pad_s is None else pad_s
+    try:
+        t, motion, duration = motion_series(video_uri_or_path)
+    except Exception:
+        return None
+    elapsed = round((time.perf_counter() - start) * 1000.0, 1)
+    # The decode runs to the end of the stream, so the whole video was read
+    read = (size if size is not None else source_size(video_uri_or_path)) or 0
+    peak = float(np.percentile(motion, 99)) if len(motion) else 0.0
+    active = np.flatnonzero(motion >= MOTION_ACTIVE_FRAC * peak) if peak > 0 else np.zeros(0, dtype=np.intp)
+    if not len(active):
+        return MotionWindow(0.0, duration, duration, elapsed, len(t), read)
+    # The first sample differences against the one before it, so reach back one sample interval
+    step = float(np.median(np.diff(t))) if len(t) > 1 else 0.0
+    lo = max(0.0, t[active[0]] - step - pad_s)
+    hi = min(duration, t[active[-1]] + pad_s)
+    if (lo + (duration - hi)) < MOTION_MIN_SAVING * duration:
+        lo, hi = 0.0, duration
+    return MotionWindow(float(lo), float(hi), float(duration), elapsed, len(t), read)
@@ -4,59 +4,35 @@ Simple parser for PraxisForma analysis results
 Run this in your Cloud Shell to get your first biomechanical insights!
 """
 
-import re
 import math
+import os
+
+import numpy as np
+
+from backend.biomech.legacy_text import iter_people
 
 def parse_person_data(filename):
     """Parse your analysis file and extract high-confidence detections"""
     print(f"Reading {filename}...")
-    
-    try:
-        with open(filename, 'r') as f:
-            content = f.read()
-    except FileNotFoundError:
+
+    if not os.path.exists(filename):
         print(f"❌ File {filename} not found")
         return []
-    
+
     persons = []
-    lines = content.split('\n')
-    current_person = None
-    current_landmarks = {}
-    
-    for line in lines:
-        # Look for person headers
-        if line.startswith('PERSON '):
-            # Save previous person if it was high confidence
-            if current_person and current_person.get('confidence', 0) > 0.7:
-                current_person['landmarks'] = current_landmarks
-                persons.append(current_person)
-            
-            # Start new person
-            person_match = re.match(r'PERSON (\d+):', line)
-            if person_match:
-                current_person = {'id': int(person_match.group(1))}
-                current_landmarks = {}
-        
-        # Look for confidence
-        elif line.startswith('Track confidence:'):
-            conf_match = re.search(r'([\d.]+)', line)
-            if conf_match and current_person:
-                current_person['confidence'] = float(conf_match.group(1))
-        
-        # Look for landmarks
-        elif 'Landmark' in line and 'x=' in line and 'y=' in line:
-            landmark_match = re.search(r'Landmark (\d+): x=([\d.]+), y=([\d.]+)', line)
-            if landmark_match:
-                landmark_id = int(landmark_match.group(1))
-                x = float(landmark_match.group(2))
-                y = float(landmark_match.group(3))
-                current_landmarks[landmark_id] = {'x': x, 'y': y}
-    
-    # Don't forget the last person
-    if current_person and current_person.get('confidence', 0) > 0.7:
-        current_person['landmarks'] = current_landmarks
-        persons.append(current_person)
-    
+    # Stream the file person by person; keep each joint's last detected position
+    for person in iter_people(filename):
+        if person.confidence <= 0.7:
+            continue
+        pose = person.pose
+        landmarks = {}
+        if len(pose):
+            seen = pose.mask.any(axis=0)
+            last = len(pose) - 1 - np.argmax(pose.mask[::-1], axis=0)
+            for j in np.flatnonzero(seen).tolist():
+                landmarks[j] = {'x': float(pose.data[last[j], j, 0]), 'y': float(pose.data[last[j], j, 1])}
+        persons.append({'id': person.person_id, 'confidence': person.confidence, 'landmarks': landmarks})
+
     return persons
 
 def calculate_shoulder_tilt(landmarks):
@@ -0,0 +1,381 @@
+"""
+Pose providers: where analyze_video gets person detection annotations from.
+
+Every provider returns (annotations, ingest) where annotations has the shape of
+a Video Intelligence VideoAnnotationResults (person_detection_annotations ->
+tracks -> timestamped_objects -> landmarks[i].point.x/y, time_offset), so
+person selection and scoring run unchanged on any of them:
+- videointelligence: the live service; gs:// by input_uri, local files inline.
+  A local motion pre-pass (motion_prepass.py, MOTION_PREPASS) trims the
+  request to the active part of the video; it reads the whole video, so gs://
+  objects over MOTION_PREPASS_GCS_MAX_MB skip it. gs:// videos whose active part is
+  longer than ANNOTATE_SEGMENT_S are annotated as concurrent,
+  overlapping segments and stitched (pose_segments.py). With POSE_RECORD_DIR
+  set, each response is also saved as {base}.annotations.pb for replay
+- replay: stored results, no vendor call. Looks up {base}.landmarks.bin (binary
+  landmark archive), {base}.annotations.pb (recorded AnnotateVideoResponse),
+  {base}.annotations.json or {base}.landmarks.json (the JSON landmarks export,
+  gzip or plain) under POSE_REPLAY_SOURCE (local dir or gs:// prefix); without
+  a source, the video's own landmarks/{uid}/{base}.landmarks.bin (or .json)
+- synthetic: generated landmarks (one moving thrower plus still bystanders)
+  after POSE_SYNTHETIC_LATENCY_MS, for load tests of everything but the vendor
+
+POSE_PROVIDER selects the default; analyze_video(provider=...) overrides it.
+The default Video Intelligence provider is wrapped in the content-addressed
+annotation cache (annotation_cache.py), so re-analysis of a clip skips the call.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import gzip
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+from backend.biomech.pose import PoseArray
+from backend.config import (
+    ANNOTATE_SEGMENT_CONCURRENCY,
+    ANNOTATE_SEGMENT_OVERLAP_S,
+    ANNOTATE_SEGMENT_S,
+    MOTION_PREPASS,
+    MOTION_PREPASS_GCS_MAX_MB,
+    POSE_PROVIDER,
+    POSE_RECORD_DIR,
+    POSE_REPLAY_SOURCE,
+    POSE_SYNTHETIC_LATENCY_MS,
+)
+
+
+# ------------------------- VI-shaped annotation records -------------------------
+
+@dataclass
+class Point:
+    x: float
+    y: float
+
+
+@dataclass
+class PoseLandmark:
+    point: Point
+    confidence: float = 1.0
+
+
+@dataclass
+class TimestampedObject:
+    time_offset: timedelta
+    landmarks: List[PoseLandmark]
+
+
+@dataclass
+class Track:
+    confidence: float
+    timestamped_objects: List[TimestampedObject]
+
+
+@dataclass
+class PersonDetection:
+    tracks: List[Track]
+    # Already decoded landmarks (archive replay); decode_person and ranking read it directly
+    pose: Optional[PoseArray] = None
+
+
+@dataclass
+class Annotations:
+    person_detection_annotations: List[PersonDetection] = field(default_factory=list)
+
+
+def person_from_frames(frames: List[Dict], confidence: float = 1.0) -> PersonDetection:
+    """
+    One person from landmarks-export records ({'timestamp_ms', 'landmarks': [{'name', 'x', 'y', 'confidence'}]}),
+    decoded by records_to_pose: joints by name, null slots absent, legacy frames by position only when complete.
+    """
+    from backend.biomech.landmark_archive import records_to_pose
+    return person_from_pose(records_to_pose(frames), confidence)
+
+
+def person_from_xy(t_ms: np.ndarray, xy: np.ndarray, confidence: float = 1.0) -> PersonDetection:
+    """One person from (T,) timestamps and (T, 17, 2) normalized coordinates."""
+    objs = [TimestampedObject(time_offset=timedelta(milliseconds=int(t)),
+                              landmarks=[PoseLandmark(point=Point(float(x), float(y))) for x, y in row])
+            for t, row in zip(t_ms.tolist(), xy.tolist())]
+    return PersonDetection(tracks=[Track(confidence=confidence, timestamped_objects=objs)])
+
+
+def person_from_pose(pose: PoseArray, confidence: float = 1.0) -> PersonDetection:
+    """One person carrying its PoseArray, with VI-shaped tracks (missing joints at 0, 0) for duck-typed readers."""
+    person = person_from_xy(pose.t_ms, np.where(pose.mask[..., None], pose.data[..., :2], 0.0), confidence)
+    person.pose = pose
+    return person
+
+
+# ---------------------------------- I/O ----------------------------------------
+
+def _basename(video_uri_or_path: str) -> str:
+    return os.path.splitext(os.path.basename(video_uri_or_path))[0]
+
+
+def _read_bytes(uri: str) -> Optional[bytes]:
+    """Object or file contents; None when it does not exist or cannot be read."""
+    try:
+        if uri.startswith("gs://"):
+            from google.cloud import storage
+            bucket_name, blob_name = uri[len("gs://"):].split("/", 1)
+            return storage.Client().bucket(bucket_name).blob(blob_name).download_as_bytes()
+        with open(uri, "rb") as f:
+            return f.read()
+    except Exception:
+        return None
+
+
+def _write_bytes(uri: str, data: bytes) -> None:
+    if uri.startswith("gs://"):
+        from google.cloud import storage
+        bucket_name, blob_name = uri[len("gs://"):].split("/", 1)
+        storage.Client().bucket(bucket_name).blob(blob_name).upload_from_string(data, content_type="application/octet-stream")
+        return
+    os.makedirs(os.path.dirname(uri) or ".", exist_ok=True)
+    with open(uri, "wb") as f:
+        f.write(data)
+
+
+def _join(prefix: str, name: str) -> str:
+    return prefix.rstrip("/") + "/" + name if prefix.startswith("gs://") else os.path.join(prefix, name)
+
+
+# --------------------------------- Providers -----------------------------------
+
+class PoseProvider:
+    name = "base"
+
+    def annotate(self, video_uri_or_path: str) -> Tuple[Any, Dict[str, Any]]:
+        """(annotations, ingest) for one video; ingest always has 'source' and 'annotate_ms'."""
+        raise NotImplementedError
+
+    def cache_variant(self) -> str:
+        """Settings that change the annotations returned for a given video ('' when none); part of cache keys."""
+        return ""
+
+
+class VideoIntelligenceProvider(PoseProvider):
+    name = "videointelligence"
+
+    def __init__(self, record_dir: Optional[str] = None, segment_s: Optional[float] = None,
+                 overlap_s: Optional[float] = None, concurrency: Optional[int] = None, prepass: Optional[bool] = None,
+                 prepass_gcs_max_mb: Optional[float] = None):
+        self.record_dir = POSE_RECORD_DIR if record_dir is None else record_dir
+        self.prepass = MOTION_PREPASS if prepass is None else prepass
+        self.prepass_gcs_max_mb = MOTION_PREPASS_GCS_MAX_MB if prepass_gcs_max_mb is None else prepass_gcs_max_mb
+        self.segment_s = ANNOTATE_SEGMENT_S if segment_s is None else segment_s
+        self.overlap_s = ANNOTATE_SEGMENT_OVERLAP_S if overlap_s is None else overlap_s
+        self.concurrency = ANNOTATE_SEGMENT_CONCURRENCY if concurrency is None else concurrency
+
+    @staticmethod
+    def _request(segment: Optional[Tuple[float, float]] = None, **source) -> Dict:
+        """Person detection request with pose landmarks for one video source (input_uri or input_content)."""
+        from google.cloud import videointelligence
+        person_config = videointelligence.PersonDetectionConfig(
+            include_bounding_boxes=True,
+            include_attributes=True,
+            include_pose_landmarks=True,
+        )
+        context = {"person_detection_config": person_config}
+        if segment is not None:
+            context["segments"] = [videointelligence.VideoSegment(
+                start_time_offset=timedelta(seconds=segment[0]),
+                end_time_offset=timedelta(seconds=segment[1]),
+            )]
+        return {
+            "features": [videointelligence.Feature.PERSON_DETECTION],
+            "video_context": videointelligence.VideoContext(**context),
+            **source,
+        }
+
+    def _segments(self, video_uri: str, window=None) -> List[Tuple[float, float]]:
+        """Planned windows over the active span of a gs:// video; empty when segmenting is off or the duration is unknown."""
+        from backend.pose_segments import plan_segments, probe_duration_s
+        if self.segment_s <= 0:
+            return []
+        if window is not None:
+            return plan_segments(window.end_s, self.segment_s, self.overlap_s, start_s=window.start_s)
+        duration = probe_duration_s(video_uri)
+        return plan_segments(duration, self.segment_s, self.overlap_s) if duration else []
+
+    def cache_variant(self) -> str:
+        """Hash of the trim and segmentation settings: the same video annotates differently under each."""
+        import hashlib
+        from backend.motion_prepass import prepass_settings
+        settings = {
+            "segment_s": self.segment_s,
+            "overlap_s": self.overlap_s,
+            "prepass": prepass_settings() if self.prepass else None,
+            "prepass_gcs_max_mb": self.prepass_gcs_max_mb if self.prepass else None,
+        }
+        return "opts-" + hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def _window(self, video_uri_or_path: str) -> Tuple[Any, Dict[str, Any]]:
+        """(motion pre-pass window or None, ingest fields on what the pre-pass cost or why it was skipped)."""
+        if not self.prepass:
+            return None, {}
+        from backend.motion_prepass import active_window, source_size
+        size = source_size(video_uri_or_path)
+        if video_uri_or_path.startswith("gs://"):
+            # The pre-pass would stream the whole object through this process
+            cap = self.prepass_gcs_max_mb * 1024 * 1024
+            if size is None or size > cap:
+                return None, {"prepass_skipped": "object_size"}
+        window = active_window(video_uri_or_path, size=size)
+        if window is None:
+            return None, {"prepass_skipped": "unreadable"}
+        return window, {"prepass_ms": window.prepass_ms, "prepass_bytes_read": window.bytes_read}
+
+    def _annotate_segments(self, client, video_uri: str, segments: List[Tuple[float, float]]) -> Tuple[Any, List[float]]:
+        """(AnnotateVideoResponse stitched from concurrent segment operations, per-segment ms)."""
+        from concurrent.futures import ThreadPoolExecutor
+        from google.cloud import videointelligence
+        from backend.pose_segments import stitch_segments
+
+        def one(segment):
+            t0 = time.perf_counter()
+            resp = client.annotate_video(request=self._request(segment, input_uri=video_uri)).result(timeout=1800)
+            return resp.annotation_results[0], round((time.perf_counter() - t0) * 1000.0, 1)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(segments)))) as pool:
+            parts = list(pool.map(one, segments))
+        merged = stitch_segments(segments, [p[0] for p in parts])
+        merged.input_uri = video_uri
+        return videointelligence.AnnotateVideoResponse(annotation_results=[merged]), [p[1] for p in parts]
+
+    def annotate(self, video_uri_or_path: str) -> Tuple[Any, Dict[str, Any]]:
+        from google.cloud import videointelligence
+        start = time.perf_counter()
+        client = videointelligence.VideoIntelligenceServiceClient()
+        window, prepass = self._window(video_uri_or_path)
+        trim = (window.start_s, window.end_s) if window is not None and window.trimmed else None
+        if video_uri_or_path.startswith("gs://"):
+            # Video Intelligence reads the object from GCS itself; nothing is uploaded (the pre-pass,
+            # when it ran, read the object and is reported separately as prepass_bytes_read)
+            ingest: Dict[str, Any] = {"source": "input_uri", "bytes_sent": 0}
+            segments = self._segments(video_uri_or_path, window)
+            if len(segments) > 1:
+                result, segment_ms = self._annotate_segments(client, video_uri_or_path, segments)
+                ingest.update({"segments": len(segments), "segment_ms": segment_ms,
+                               "duration_s": round(segments[-1][1], 3)})
+            else:
+                result = client.annotate_video(request=self._request(trim, input_uri=video_uri_or_path)).result(timeout=1800)
+        else:
+            # Inline upload for local files (multipart uploads to /analyze, CLI runs on local clips);
+            # not segmented, since every segment request would carry the whole file again
+            with open(video_uri_or_path, "rb") as f:
+                content = f.read()
+            ingest = {"source": "input_content", "bytes_sent": len(content)}
+            result = client.annotate_video(request=self._request(trim, input_content=content)).result(timeout=1800)
+        ingest.update(prepass)
+        if window is not None:
+            ingest["trim"] = window.as_ingest()
+        ingest["annotate_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+        if self.record_dir:
+            try:
+                out = _join(self.record_dir, f"{_basename(video_uri_or_path)}.annotations.pb")
+                _write_bytes(out, type(result).serialize(result))
+                ingest["recorded_uri"] = out
+            except Exception:
+                pass
+        return result.annotation_results[0], ingest
+
+
+class ReplayPoseProvider(PoseProvider):
+    name = "replay"
+
+    def __init__(self, source: Optional[str] = None):
+        self.source = POSE_REPLAY_SOURCE if source is None else source
+
+    def _candidates(self, video_uri_or_path: str) -> List[str]:
+        base = _basename(video_uri_or_path)
+        if self.source:
+            names = (f"{base}.landmarks.bin", f"{base}.annotations.pb", f"{base}.annotations.json", f"{base}.landmarks.json", f"{base}.landmarks.json.gz")
+            return [_join(self.source, n) for n in names]
+        from backend.discus_analyzer_v2 import _gcs_target
+        bucket_name, user_id, base = _gcs_target(video_uri_or_path)
+        prefix = f"gs://{bucket_name}/landmarks/{user_id or 'unknown'}/{base}"
+        return [f"{prefix}.landmarks.bin", f"{prefix}.landmarks.json"]
+
+    def annotate(self, video_uri_or_path: str) -> Tuple[Any, Dict[str, Any]]:
+        start = time.perf_counter()
+        for uri in self._candidates(video_uri_or_path):
+            data = _read_bytes(uri)
+            if data is None:
+                continue
+            annotations = self._decode(uri, data)
+            ingest = {"source": "replay", "replay_uri": uri, "bytes_read": len(data), "bytes_sent": 0,
+                      "annotate_ms": round((time.perf_counter() - start) * 1000.0, 1)}
+            return annotations, ingest
+        raise FileNotFoundError(f"No replay data for {video_uri_or_path} (tried {', '.join(self._candidates(video_uri_or_path))})")
+
+    @staticmethod
+    def _decode(uri: str, data: bytes):
+        from backend.biomech.landmark_archive import decode_archive, is_archive
+        if is_archive(data):
+            return Annotations(person_detection_annotations=[person_from_pose(decode_archive(data))])
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        if ".annotations." in os.path.basename(uri):
+            from google.cloud import videointelligence
+            msg = videointelligence.AnnotateVideoResponse
+            resp = msg.from_json(data.decode("utf-8"), ignore_unknown_fields=True) if uri.endswith(".json") else msg.deserialize(data)
+            return resp.annotation_results[0]
+        frames = json.loads(data.decode("utf-8"))
+        # Same decoding as the archive branch: records_to_pose maps joints, person_from_pose wraps them
+        return Annotations(person_detection_annotations=[person_from_frames(frames)] if frames else [])
+
+
+class SyntheticPoseProvider(PoseProvider):
+    name = "synthetic"
+
+    def __init__(self, latency_ms: Optional[float] = None, duration_s: float = 5.0, fps: float = 30.0, bystanders: int = 1):
+        self.latency_ms = POSE_SYNTHETIC_LATENCY_MS if latency_ms is None else latency_ms
+        self.duration_s = duration_s
+        self.fps = fps
+        self.bystanders = bystanders
+
+    def annotate(self, video_uri_or_path: str) -> Tuple[Any, Dict[str, Any]]:
+        from backend.bench_features import synthetic_pose
+        start = time.perf_counter()
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        # Deterministic per video name so repeated runs score identically
+        seed = zlib.crc32(os.path.basename(video_uri_or_path).encode("utf-8"))
+        pose = synthetic_pose(self.duration_s, self.fps, seed=seed)
+        xy = pose.data[..., :2]
+        people = [person_from_xy(pose.t_ms, xy, confidence=0.8)]
+        for k in range(self.bystanders):
+            # A still, confidently detected figure beside the thrower (coach, official)
+            still = np.broadcast_to(np.clip(xy[:1] + 0.15 * (k + 1), 0.0, 1.0), xy.shape)
+            people.append(person_from_xy(pose.t_ms, still, confidence=0.95))
+        ingest = {"source": "synthetic", "bytes_sent": 0, "annotate_ms": round((time.perf_counter() - start) * 1000.0, 1)}
+        return Annotations(person_detection_annotations=people), ingest
+
+
+PROVIDERS = {
+    VideoIntelligenceProvider.name: VideoIntelligenceProvider,
+    ReplayPoseProvider.name: ReplayPoseProvider,
+    SyntheticPoseProvider.name: SyntheticPoseProvider,
+}
+
+
+def get_pose_provider(name: Optional[str] = None) -> PoseProvider:
+    """Provider by name (default POSE_PROVIDER); Video Intelligence sits behind the annotation cache when enabled."""
+    name = name or POSE_PROVIDER
+    try:
+        provider = PROVIDERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown pose provider {name!r}; expected one of {sorted(PROVIDERS)}")
+    if isinstance(provider, VideoIntelligenceProvider):
+        from backend.annotation_cache import AnnotationCache, CachedPoseProvider
+        cache = AnnotationCache.default()
+        if cache is not None:
+            return CachedPoseProvider(provider, cache)
+    return provider
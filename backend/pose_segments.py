@@ -0,0 +1,162 @@
+"""
+Segmented annotation of long videos.
+
+Video Intelligence annotates a whole clip in one long-running operation, so a
+full training-session recording is one very slow request. For gs:// inputs
+longer than ANNOTATE_SEGMENT_S the Video Intelligence provider instead:
+- plans overlapping windows (plan_segments): ANNOTATE_SEGMENT_S long, each
+  starting ANNOTATE_SEGMENT_OVERLAP_S before the previous one ends
+- annotates them concurrently (up to ANNOTATE_SEGMENT_CONCURRENCY operations
+  in flight), each request restricted by VideoContext.segments; the service
+  reads the object itself, so nothing is uploaded per segment
+- stitches the results (stitch_segments) into one VideoAnnotationResults:
+  people are linked across a boundary when their joints agree on the frames
+  both segments annotated, and every segment keeps only the frames on its
+  side of the overlap midpoint, so no timestamp appears twice
+
+Time offsets in segment responses are relative to the start of the video, so
+stitched tracks form one continuous timeline and person selection, decoding,
+caching and recording treat the result like a single-request response.
+"""
+
+from dataclasses import is_dataclass, replace
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.biomech.pose import PoseArray
+from backend.biomech.vi_decode import _offset_ms, _raw, decode_person
+
+
+# Mean joint distance (normalized units) below which two detections in the
+# overlap are taken to be the same person
+LINK_MAX_DIST = 0.05
+# Frames of two segments closer than this are compared as the same video frame
+LINK_TOLERANCE_MS = 20
+
+
+def plan_segments(duration_s: float, segment_s: float, overlap_s: float, start_s: float = 0.0) -> List[Tuple[float, float]]:
+    """[(start_s, end_s)] windows covering [start_s, duration_s]; one window when it fits in a single segment."""
+    length = duration_s - start_s
+    if length <= 0 or segment_s <= 0 or length <= segment_s + overlap_s:
+        return [(float(start_s), float(max(duration_s, start_s)))]
+    overlap_s = min(max(overlap_s, 0.0), segment_s / 2.0)
+    step = segment_s - overlap_s
+    segments, start = [], float(start_s)
+    while True:
+        end = start + segment_s
+        if end >= duration_s - overlap_s:
+            segments.append((start, float(duration_s)))
+            return segments
+        segments.append((start, end))
+        start += step
+
+
+def probe_duration_s(video_uri_or_path: str) -> Optional[float]:
+    """Container duration in seconds (gs:// read through a short-lived signed URL); None when unknown."""
+    try:
+        import cv2
+        from backend.motion_prepass import capture_source
+        cap = cv2.VideoCapture(capture_source(video_uri_or_path))
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+        finally:
+            cap.release()
+        if fps <= 0 or frames <= 0:
+            return None
+        return float(frames) / float(fps)
+    except Exception:
+        return None
+
+
+def _cuts_ms(segments: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Per segment, the [lo, hi) ms window it owns: boundaries sit at the middle of each overlap."""
+    mids = [(segments[k + 1][0] + segments[k][1]) * 500.0 for k in range(len(segments) - 1)]
+    return [(mids[k - 1] if k else -np.inf, mids[k] if k < len(mids) else np.inf) for k in range(len(segments))]
+
+
+def _trimmed_track(track, lo: float, hi: float):
+    """Copy of a track keeping the timestamped objects with lo <= t_ms < hi; None when nothing is left."""
+    raw = _raw(track)
+    kept = [o for o in raw.timestamped_objects if lo <= _offset_ms(o.time_offset) < hi]
+    if not kept:
+        return None
+    if len(kept) == len(raw.timestamped_objects):
+        return track
+    if is_dataclass(track):
+        return replace(track, timestamped_objects=kept)
+    pb = type(raw)()
+    pb.CopyFrom(raw)
+    del pb.timestamped_objects[:]
+    pb.timestamped_objects.extend(kept)
+    return type(track).wrap(pb)
+
+
+def _link_cost(a: PoseArray, b: PoseArray, lo_ms: float, hi_ms: float) -> float:
+    """Mean joint distance between two poses over the frames both have in [lo_ms, hi_ms]; inf when none."""
+    ia = np.flatnonzero((a.t_ms >= lo_ms - LINK_TOLERANCE_MS) & (a.t_ms <= hi_ms + LINK_TOLERANCE_MS))
+    if not len(ia) or not len(b):
+        return np.inf
+    pos = np.clip(np.searchsorted(b.t_ms, a.t_ms[ia]), 1, max(len(b) - 1, 1))
+    left = np.minimum(pos - 1, len(b) - 1)
+    right = np.minimum(pos, len(b) - 1)
+    nearest = np.where(np.abs(b.t_ms[left] - a.t_ms[ia]) <= np.abs(b.t_ms[right] - a.t_ms[ia]), left, right)
+    close = np.abs(b.t_ms[nearest] - a.t_ms[ia]) <= LINK_TOLERANCE_MS
+    ia, ib = ia[close], nearest[close]
+    both = a.mask[ia] & b.mask[ib]
+    if not both.any():
+        return np.inf
+    dist = np.linalg.norm(a.data[ia, :, :2] - b.data[ib, :, :2], axis=-1)
+    return float(dist[both].mean())
+
+
+def stitch_segments(segments: Sequence[Tuple[float, float]], results: Sequence[Any]) -> Any:
+    """
+    One annotation result from per-segment results (same order as `segments`).
+    Output people have the type of the inputs (proto-plus or the VI-shaped
+    records in pose_providers); each carries the trimmed tracks of every
+    segment detection linked to it.
+    """
+    windows = _cuts_ms(segments)
+    people = [list(r.person_detection_annotations or []) for r in results]
+    poses = [[decode_person(p) for p in seg] for seg in people]
+
+    # chain[k][i]: output person id of detection i in segment k
+    chain: List[List[int]] = []
+    next_id = 0
+    for k, seg in enumerate(people):
+        ids = [-1] * len(seg)
+        if k:
+            lo_ms, hi_ms = segments[k][0] * 1000.0, segments[k - 1][1] * 1000.0
+            pairs = sorted((_link_cost(poses[k - 1][i], poses[k][j], lo_ms, hi_ms), i, j)
+                           for i in range(len(people[k - 1])) for j in range(len(seg)))
+            used_prev = set()
+            for cost, i, j in pairs:
+                if cost > LINK_MAX_DIST:
+                    break
+                if i in used_prev or ids[j] >= 0:
+                    continue
+                used_prev.add(i)
+                ids[j] = chain[k - 1][i]
+        for j in range(len(seg)):
+            if ids[j] < 0:
+                ids[j] = next_id
+                next_id += 1
+        chain.append(ids)
+
+    tracks: List[List[Any]] = [[] for _ in range(next_id)]
+    for k, seg in enumerate(people):
+        lo, hi = windows[k]
+        for j, person in enumerate(seg):
+            for track in person.tracks:
+                trimmed = _trimmed_track(track, lo, hi)
+                if trimmed is not None:
+                    tracks[chain[k][j]].append(trimmed)
+
+    first = next((seg[0] for seg in people if seg), None)
+    if first is None:
+        return results[0] if results else None
+    person_type = type(first)
+    merged = [person_type(tracks=t) for t in tracks if t]
+    return type(results[0])(person_detection_annotations=merged)
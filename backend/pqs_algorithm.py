@@ -23,11 +23,14 @@ and should be refined with data.
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import math
-from backend.biomech.features import compute_features
 from backend.biomech import envelopes as E
 from backend.biomech.envelope_store import load_active_envelope
+from backend.biomech.pose import PoseArray, as_frames
+from backend.biomech.time_index import TimeIndex
+from backend.config import PQS_V1_BACKEND
+# compute_features is imported lazily in calculate_pqs_v2: biomech.features imports Frame/Landmark from here
 
 
 # ----------------------------- Data Models -----------------------------
@@ -62,15 +65,162 @@ class PQSBreakdown:
     notes: List[str]
 
 
+class KinematicsContext:
+    """
+    Per-session memo of the kinematic series the scorers share.
+
+    Built once per analysis; speed, axis-angle and angular-velocity series,
+    handedness, release index, confidence windows and the PoseArray view are
+    each computed on first use and reused by every v1 scorer and by
+    calculate_pqs_v2, so one analysis walks the landmarks once per series
+    instead of once per caller.
+
+    backend selects the v1 implementation: 'numpy' (pqs_v1_numpy column
+    scorers), 'python' (the reference loops below) or 'auto' (numpy when the
+    landmarks are already a PoseArray, python for a List[Frame], where packing
+    columns costs more than it saves); default PQS_V1_BACKEND. Every backend
+    produces identical results.
+    """
+
+    def __init__(self, frames: Union[List[Frame], PoseArray], backend: Optional[str] = None):
+        self._source = frames if isinstance(frames, PoseArray) else list(frames or [])
+        self.backend = backend or PQS_V1_BACKEND
+        self._frames: Optional[List[Frame]] = None
+        self._columns = None
+        self._index: Optional[TimeIndex] = None
+        self._speed: Dict[str, List[float]] = {}
+        self._angle: Dict[str, List[Optional[float]]] = {}
+        self._omega: Dict[str, List[float]] = {}
+        self._conf: Dict[Tuple[Optional[int], int], float] = {}
+        self._release: Dict[str, Optional[int]] = {}
+        self._handedness: Optional[str] = None
+        self._pose: Optional[PoseArray] = frames if isinstance(frames, PoseArray) else None
+
+    def __len__(self) -> int:
+        return len(self._source)
+
+    @property
+    def frames(self) -> List[Frame]:
+        if self._frames is None:
+            self._frames = as_frames(self._source)
+        return self._frames
+
+    @property
+    def columns(self):
+        """pqs_v1_numpy.V1Columns for this session, or None when the reference scorers are selected."""
+        if self.backend == 'python' or (self.backend == 'auto' and not isinstance(self._source, PoseArray)):
+            return None
+        if self._columns is None:
+            from backend.pqs_v1_numpy import V1Columns
+            self._columns = V1Columns.from_source(self._source)
+        return self._columns
+
+    def speed(self, key: str) -> List[float]:
+        if key not in self._speed:
+            self._speed[key] = _speed_series(self.frames, key)
+        return self._speed[key]
+
+    def axis_angle(self, axis: str) -> List[Optional[float]]:
+        if axis not in self._angle:
+            self._angle[axis] = _axis_angle_series(self.frames, axis)
+        return self._angle[axis]
+
+    def angular_velocity(self, axis: str) -> List[float]:
+        if axis not in self._omega:
+            self._omega[axis] = _derivative(self.axis_angle(axis), self.frames)
+        return self._omega[axis]
+
+    def avg_conf(self, rel_idx: Optional[int], window_ms: int) -> float:
+        key = (rel_idx, window_ms)
+        if key not in self._conf:
+            self._conf[key] = _avg_conf(self.frames, rel_idx, window_ms, index=self.time_index)
+        return self._conf[key]
+
+    @property
+    def time_index(self) -> TimeIndex:
+        if self._index is None:
+            cols = self.columns
+            self._index = cols.index if cols is not None else TimeIndex.of(self._source)
+        return self._index
+
+    def t_ms(self, i: int) -> int:
+        cols = self.columns
+        return int(cols.t_ms[i]) if cols is not None else self.frames[i].t_ms
+
+    @property
+    def handedness(self) -> str:
+        if self._handedness is None:
+            cols = self.columns
+            self._handedness = cols.handedness() if cols is not None else detect_handedness(self.frames, ctx=self)
+        return self._handedness
+
+    def release_idx(self, handedness: Optional[str] = None) -> Optional[int]:
+        hand = handedness or self.handedness
+        if hand not in self._release:
+            cols = self.columns
+            self._release[hand] = cols.release_idx(hand) if cols is not None else detect_release_idx(self.frames, hand, ctx=self)
+        return self._release[hand]
+
+    @property
+    def pose(self) -> PoseArray:
+        if self._pose is None:
+            self._pose = PoseArray.from_frames(self.frames)
+        return self._pose
+
+    def scorers(self):
+        """The v1 scorers bound to this session: V1Columns or the reference functions."""
+        return self.columns or _ReferenceScorers(self)
+
+
+class _ReferenceScorers:
+    """Reference scorers with the V1Columns call shape."""
+
+    def __init__(self, ctx: KinematicsContext):
+        self.ctx = ctx
+
+    def confidence_gate(self, rel_idx: Optional[int], window_ms: int = 200) -> float:
+        return confidence_gate(self.ctx.frames, rel_idx, window_ms, ctx=self.ctx)
+
+    def score_shoulder_alignment(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        return score_shoulder_alignment(self.ctx.frames, rel_idx, handedness, ctx=self.ctx)
+
+    def score_hip_rotation(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        return score_hip_rotation(self.ctx.frames, rel_idx, handedness, ctx=self.ctx)
+
+    def score_release_angle(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        return score_release_angle(self.ctx.frames, rel_idx, handedness, ctx=self.ctx)
+
+    def score_power_transfer(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        return score_power_transfer(self.ctx.frames, rel_idx, handedness, ctx=self.ctx)
+
+    def score_footwork_timing(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        return score_footwork_timing(self.ctx.frames, rel_idx, handedness, ctx=self.ctx)
+
+    def score_deductions(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str], List[str]]:
+        return score_deductions(self.ctx.frames, rel_idx, handedness, ctx=self.ctx)
+
+
+def _context(frames: Union[List[Frame], PoseArray, KinematicsContext], ctx: Optional[KinematicsContext] = None, backend: Optional[str] = None) -> KinematicsContext:
+    if ctx is not None:
+        return ctx
+    if isinstance(frames, KinematicsContext):
+        return frames
+    return KinematicsContext(frames, backend=backend)
+
+
 # ----------------------------- Public API ------------------------------
 
 
-def calculate_pqs(frames: List[Frame]) -> PQSBreakdown:
+def calculate_pqs(frames: Union[List[Frame], PoseArray, KinematicsContext], backend: Optional[str] = None) -> PQSBreakdown:
     """
     Minimal PQS scaffold focusing on release detection first.
     Returns zeros for component scores until full scorers are added.
+    Accepts a List[Frame], a PoseArray or a KinematicsContext, whose memoized
+    series are then shared with the caller. backend ('auto' | 'numpy' | 'python',
+    default PQS_V1_BACKEND) applies when no context is passed.
     """
-    if not frames:
+    ctx = _context(frames, backend=backend)
+    if len(ctx) == 0:
         return PQSBreakdown(
             total=0,
             shoulder_alignment=0,
@@ -85,8 +235,8 @@ def calculate_pqs(frames: List[Frame]) -> PQSBreakdown:
             notes=["No frames provided"],
         )
 
-    handedness = detect_handedness(frames)
-    rel_idx = detect_release_idx(frames, handedness)
+    handedness = ctx.handedness
+    rel_idx = ctx.release_idx(handedness)
     flags: List[str] = []
     notes: List[str] = []
 
@@ -95,21 +245,22 @@ def calculate_pqs(frames: List[Frame]) -> PQSBreakdown:
         notes.append("Could not confidently detect release. Try clearer video and full throw.")
 
     # Component scores (0–200 each)
-    shoulder_alignment, notes_sa = score_shoulder_alignment(frames, rel_idx, handedness)
-    hip_rotation, notes_hr = score_hip_rotation(frames, rel_idx, handedness)
-    release_angle, notes_ra = score_release_angle(frames, rel_idx, handedness)
-    power_transfer, notes_pt = score_power_transfer(frames, rel_idx, handedness)
-    footwork_timing, notes_ft = score_footwork_timing(frames, rel_idx, handedness)
+    v1 = ctx.scorers()
+    shoulder_alignment, notes_sa = v1.score_shoulder_alignment(rel_idx, handedness)
+    hip_rotation, notes_hr = v1.score_hip_rotation(rel_idx, handedness)
+    release_angle, notes_ra = v1.score_release_angle(rel_idx, handedness)
+    power_transfer, notes_pt = v1.score_power_transfer(rel_idx, handedness)
+    footwork_timing, notes_ft = v1.score_footwork_timing(rel_idx, handedness)
 
     # Confidence gating
-    gate = confidence_gate(frames, rel_idx, window_ms=200)
+    gate = v1.confidence_gate(rel_idx, window_ms=200)
     shoulder_alignment = int(round(shoulder_alignment * gate))
     hip_rotation = int(round(hip_rotation * gate))
     release_angle = int(round(release_angle * gate))
     power_transfer = int(round(power_transfer * gate))
     footwork_timing = int(round(footwork_timing * gate))
 
-    deductions, ded_flags, ded_notes = score_deductions(frames, rel_idx, handedness)
+    deductions, ded_flags, ded_notes = v1.score_deductions(rel_idx, handedness)
 
     total = max(0, shoulder_alignment + hip_rotation + release_angle + power_transfer + footwork_timing + deductions)
 
@@ -121,15 +272,26 @@ def calculate_pqs(frames: List[Frame]) -> PQSBreakdown:
         power_transfer=power_transfer,
         footwork_timing=footwork_timing,
         deductions=deductions,
-        release_t_ms=(frames[rel_idx].t_ms if rel_idx is not None else None),
+        release_t_ms=(ctx.t_ms(rel_idx) if rel_idx is not None else None),
         handedness=handedness,
         flags=flags + ded_flags,
         notes=notes + notes_sa + notes_hr + notes_ra + notes_pt + notes_ft + ded_notes,
     )
 
 
-def calculate_pqs_v2(frames: List[Frame], handedness: str, rel_idx: Optional[int], *, event: str = 'discus', age_band: str = 'Open', sex: str = 'M') -> Dict[str, object]:
-    series, phases, metrics = compute_features(frames, handedness, rel_idx)
+def calculate_pqs_v2(frames: Union[List[Frame], PoseArray, KinematicsContext], handedness: str, rel_idx: Optional[int], *, event: str = 'discus', age_band: str = 'Open', sex: str = 'M', feature_cache=None) -> Dict[str, object]:
+    """feature_cache: optional biomech.feature_cache.FeatureCache; unchanged landmarks then skip feature extraction."""
+    from backend.biomech.features import compute_features
+    features = feature_cache.compute if feature_cache is not None else compute_features
+    if isinstance(frames, KinematicsContext):
+        frames = frames.pose
+    series, phases, metrics = features(frames, handedness, rel_idx)
+    envelope, used_fallback = load_active_envelope(event, age_band, sex, handedness)
+    return score_pqs_v2(series, phases, metrics, envelope, used_fallback)
+
+
+def score_pqs_v2(series, phases, metrics: Dict[str, float], envelope: Dict, used_fallback: bool = False) -> Dict[str, object]:
+    """PQS v2 from already-extracted features (compute_features output) and a loaded envelope."""
     # Confidence score: mean over series
     conf = float(sum(series.confidence) / len(series.confidence)) if len(series.confidence) else 0.0
     attenuation = min(1.0, max(0.0, conf))
@@ -150,7 +312,6 @@ def calculate_pqs_v2(frames: List[Frame], handedness: str, rel_idx: Optional[int
     aik = int(min(200, (min(hand_peak_norm, 3.0) / 3.0) * 200))
 
     # Release quality: use envelope band if available
-    envelope, used_fallback = load_active_envelope(event, age_band, sex, handedness)
     r_angle = float(metrics.get("release_angle_deg", 0.0))
     band = (((envelope.get('components') or {}).get('release_quality') or {}).get('release_angle_deg'))
     low, high = (E.RELEASE_ANGLE_LOW, E.RELEASE_ANGLE_HIGH)
@@ -241,7 +402,7 @@ def calculate_pqs_v2(frames: List[Frame], handedness: str, rel_idx: Optional[int
         "ω_thorax": [float(v) for v in list(series.thorax_omega_deg_s)],
         "v_hand_norm": [float(v) for v in list(series.hand_speed_norm)],
     }
-    if 'used_fallback' in locals() and used_fallback:
+    if used_fallback:
         out.setdefault('flags', []).append('envelope_fallback')
     return out
 
@@ -249,13 +410,15 @@ def calculate_pqs_v2(frames: List[Frame], handedness: str, rel_idx: Optional[int
 # ----------------------------- Core Logic ------------------------------
 
 
-def detect_handedness(frames: List[Frame]) -> str:
+def detect_handedness(frames: List[Frame], ctx: Optional[KinematicsContext] = None) -> str:
     """
     Detect throwing side by comparing wrist peak speeds across the motion.
     Returns 'right' or 'left'. If ambiguous, default to 'right'.
     """
-    right_v = _speed_series(frames, "right_wrist")
-    left_v = _speed_series(frames, "left_wrist")
+    ctx = _context(frames, ctx)
+    frames = ctx.frames
+    right_v = ctx.speed("right_wrist")
+    left_v = ctx.speed("left_wrist")
 
     if not right_v and not left_v:
         return "right"
@@ -269,7 +432,7 @@ def detect_handedness(frames: List[Frame]) -> str:
     return "right"
 
 
-def detect_release_idx(frames: List[Frame], handedness: str) -> Optional[int]:
+def detect_release_idx(frames: List[Frame], handedness: str, ctx: Optional[KinematicsContext] = None) -> Optional[int]:
     """
     Release detection:
     - Peak wrist speed near when the wrist is at/above shoulder height
@@ -280,7 +443,9 @@ def detect_release_idx(frames: List[Frame], handedness: str) -> Optional[int]:
     shoulder_key = f"{handedness}_shoulder"
     elbow_key = f"{handedness}_elbow"
 
-    v = _speed_series(frames, wrist_key)
+    ctx = _context(frames, ctx)
+    frames = ctx.frames
+    v = ctx.speed(wrist_key)
     if not v:
         return None
 
@@ -500,24 +665,18 @@ def _knee_valgus_deg(frame: Frame, side: str) -> float:
     return max(0.0, 180.0 - ang)
 
 
-def _avg_conf(frames: List[Frame], rel_idx: Optional[int], window_ms: int) -> float:
+def _avg_conf(frames: List[Frame], rel_idx: Optional[int], window_ms: int, index: Optional[TimeIndex] = None) -> float:
+    """Mean landmark score within ±window_ms of release (1.0 when unknown or empty)."""
     if rel_idx is None or not frames:
         return 1.0
+    index = index or TimeIndex.from_frames(frames)
     rel_t = frames[rel_idx].t_ms
-    total = 0.0
-    count = 0
-    for f in frames:
-        if abs(f.t_ms - rel_t) <= window_ms:
-            # average landmark scores in this frame
-            if f.kp:
-                for lm in f.kp.values():
-                    total += (lm.score if lm.score is not None else 1.0)
-                    count += 1
-    return (total / count) if count > 0 else 1.0
+    mean = index.conf_mean(rel_t - window_ms, rel_t + window_ms)
+    return 1.0 if mean is None else mean
 
 
-def confidence_gate(frames: List[Frame], rel_idx: Optional[int], window_ms: int = 200) -> float:
-    min_avg = _avg_conf(frames, rel_idx, window_ms)
+def confidence_gate(frames: List[Frame], rel_idx: Optional[int], window_ms: int = 200, ctx: Optional[KinematicsContext] = None) -> float:
+    min_avg = _context(frames, ctx).avg_conf(rel_idx, window_ms)
     if min_avg >= 0.7:
         return 1.0
     return max(0.0, min(1.0, min_avg / 0.7))
@@ -526,12 +685,14 @@ def confidence_gate(frames: List[Frame], rel_idx: Optional[int], window_ms: int
 # ------------------------------ Scorers --------------------------------
 
 
-def score_shoulder_alignment(frames: List[Frame], rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+def score_shoulder_alignment(frames: List[Frame], rel_idx: Optional[int], handedness: str, ctx: Optional[KinematicsContext] = None) -> Tuple[int, List[str]]:
     # Rotation phase window: -600 ms to release
     if rel_idx is None:
         return 0, ["No release detected for shoulder alignment scoring"]
+    ctx = _context(frames, ctx)
+    frames = ctx.frames
     rel_t = frames[rel_idx].t_ms
-    window = [f for f in frames if rel_t - 600 <= f.t_ms <= rel_t]
+    window = [frames[i] for i in ctx.time_index.window(rel_t - 600, rel_t)]
     tilts = []
     for f in window:
         t = _tilt_deg(f, "left_shoulder", "right_shoulder")
@@ -546,11 +707,11 @@ def score_shoulder_alignment(frames: List[Frame], rel_idx: Optional[int], handed
     return int(score), notes
 
 
-def score_hip_rotation(frames: List[Frame], rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
-    pelvis_ang = _axis_angle_series(frames, "hip")
-    shoulder_ang = _axis_angle_series(frames, "shoulder")
-    pelvis_w = _derivative(pelvis_ang, frames)
-    shoulder_w = _derivative(shoulder_ang, frames)
+def score_hip_rotation(frames: List[Frame], rel_idx: Optional[int], handedness: str, ctx: Optional[KinematicsContext] = None) -> Tuple[int, List[str]]:
+    ctx = _context(frames, ctx)
+    frames = ctx.frames
+    pelvis_w = ctx.angular_velocity("hip")
+    shoulder_w = ctx.angular_velocity("shoulder")
     p_idx = _peak_idx(pelvis_w)
     s_idx = _peak_idx(shoulder_w)
     lag_ms = frames[s_idx].t_ms - frames[p_idx].t_ms
@@ -562,7 +723,7 @@ def score_hip_rotation(frames: List[Frame], rel_idx: Optional[int], handedness:
     return total, notes
 
 
-def score_release_angle(frames: List[Frame], rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+def score_release_angle(frames: List[Frame], rel_idx: Optional[int], handedness: str, ctx: Optional[KinematicsContext] = None) -> Tuple[int, List[str]]:
     if rel_idx is None:
         return 0, ["No release detected for release-angle scoring"]
     f = frames[rel_idx]
@@ -579,10 +740,12 @@ def score_release_angle(frames: List[Frame], rel_idx: Optional[int], handedness:
     return int(score), [note]
 
 
-def score_power_transfer(frames: List[Frame], rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
-    pelvis_w = _derivative(_axis_angle_series(frames, "hip"), frames)
-    shoulder_w = _derivative(_axis_angle_series(frames, "shoulder"), frames)
-    wrist_v = _speed_series(frames, f"{handedness}_wrist")
+def score_power_transfer(frames: List[Frame], rel_idx: Optional[int], handedness: str, ctx: Optional[KinematicsContext] = None) -> Tuple[int, List[str]]:
+    ctx = _context(frames, ctx)
+    frames = ctx.frames
+    pelvis_w = ctx.angular_velocity("hip")
+    shoulder_w = ctx.angular_velocity("shoulder")
+    wrist_v = ctx.speed(f"{handedness}_wrist")
     p_idx, s_idx = _peak_idx(pelvis_w), _peak_idx(shoulder_w)
     w_idx = _peak_idx(wrist_v)
     order_bonus = 100 if p_idx < s_idx < w_idx else 40 if p_idx < w_idx else 0
@@ -594,7 +757,7 @@ def score_power_transfer(frames: List[Frame], rel_idx: Optional[int], handedness
     return total, notes
 
 
-def score_footwork_timing(frames: List[Frame], rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+def score_footwork_timing(frames: List[Frame], rel_idx: Optional[int], handedness: str, ctx: Optional[KinematicsContext] = None) -> Tuple[int, List[str]]:
     if rel_idx is None:
         return 0, ["No release detected for footwork scoring"]
     f_rel = frames[rel_idx]
@@ -602,10 +765,11 @@ def score_footwork_timing(frames: List[Frame], rel_idx: Optional[int], handednes
     # Block foot timing heuristic using ankle speed minima near release
     block_side = "left" if handedness == "right" else "right"
     block_key = f"{block_side}_ankle"
-    speeds = _speed_series(frames, block_key)
+    ctx = _context(frames, ctx)
+    speeds = ctx.speed(block_key)
     # Local minimum in a -400..0 ms window
     rel_t = f_rel.t_ms
-    idxs = [i for i, f in enumerate(frames) if rel_t - 400 <= f.t_ms <= rel_t]
+    idxs = ctx.time_index.window(rel_t - 400, rel_t).tolist()
     min_i = None
     if idxs and speeds:
         min_i = min(idxs, key=lambda i: speeds[i])
@@ -618,7 +782,7 @@ def score_footwork_timing(frames: List[Frame], rel_idx: Optional[int], handednes
     return total, notes
 
 
-def score_deductions(frames: List[Frame], rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str], List[str]]:
+def score_deductions(frames: List[Frame], rel_idx: Optional[int], handedness: str, ctx: Optional[KinematicsContext] = None) -> Tuple[int, List[str], List[str]]:
     ded = 0
     flags: List[str] = []
     notes: List[str] = []
@@ -637,7 +801,7 @@ def score_deductions(frames: List[Frame], rel_idx: Optional[int], handedness: st
             ded += d
             flags.append("knee_valgus")
             notes.append("Knee over toes on the block leg")
-    avg_c = _avg_conf(frames, rel_idx, window_ms=200)
+    avg_c = _context(frames, ctx).avg_conf(rel_idx, window_ms=200)
     if avg_c < 0.6:
         d = -int((0.6 - avg_c) * 100)
         ded += d
@@ -0,0 +1,271 @@
+"""
+Vectorized PQS v1 scorers over landmark columns.
+
+Mirrors the reference scorers in pqs_algorithm frame for frame, so a session
+scores to an identical PQSBreakdown with either backend:
+- Columns: (T,) t_ms, (T, 17, 3) float64 [x, y, score], (T, 17) presence,
+  plus the session TimeIndex shared with the reference for windows and
+  confidence means
+- Speed, axis-angle and angular-velocity series as whole-array ops with
+  forward fill by index accumulation instead of per-frame loops
+- atan2/hypot go through libm elementwise (np.arctan2/np.hypot use SIMD kernels
+  that can differ by an ulp, enough to flip an argmax near-tie)
+- Sums that the reference takes with builtin sum() are taken the same way
+- Release-frame checks (stance, trunk lean, knee valgus, forearm angle) reuse
+  the reference helpers on a single frame view
+"""
+
+from typing import List, Optional, Sequence, Tuple, Union
+import math
+
+import numpy as np
+
+from backend import pqs_algorithm as ref
+from backend.biomech.pose import JOINT_INDEX, JOINTS, NUM_JOINTS, PoseArray
+from backend.biomech.time_index import TimeIndex
+
+
+_LS, _RS = JOINT_INDEX['left_shoulder'], JOINT_INDEX['right_shoulder']
+
+
+def _ffill(values: np.ndarray, valid: np.ndarray, initial: float) -> np.ndarray:
+    """values[i] where valid, else the last valid value before i (or `initial`)."""
+    padded = np.concatenate(([initial], values))
+    idx = np.where(valid, np.arange(1, len(values) + 1), 0)
+    return padded[np.maximum.accumulate(idx)]
+
+
+def _libm(fn, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.fromiter(map(fn, a.tolist(), b.tolist()), dtype=float, count=len(a))
+
+
+class V1Columns:
+    def __init__(self, t_ms: np.ndarray, data: np.ndarray, mask: np.ndarray, index: TimeIndex):
+        self.t_ms = t_ms
+        self.data = data
+        self.mask = mask
+        self.index = index
+        self._speed = {}
+        self._omega = {}
+        self._frames = {}
+
+    @classmethod
+    def from_source(cls, source: Union[PoseArray, Sequence]) -> 'V1Columns':
+        """
+        Columns for a PoseArray or List[Frame]. Joint names outside the
+        17-point set get no column; they only count toward confidence, which
+        the TimeIndex reads from the frames themselves.
+        """
+        index = TimeIndex.of(source)
+        if isinstance(source, PoseArray):
+            return cls(source.t_ms, source.data.astype(np.float64), source.mask, index)
+        n = len(source)
+        slots: List[int] = []
+        rows: List[Tuple[float, float, float]] = []
+        for i, f in enumerate(source):
+            base = i * NUM_JOINTS
+            for name, lm in f.kp.items():
+                j = JOINT_INDEX.get(name)
+                if j is None:
+                    continue
+                slots.append(base + j)
+                rows.append((lm.x, lm.y, 1.0 if lm.score is None else lm.score))
+        data = np.zeros((n * NUM_JOINTS, 3), dtype=np.float64)
+        mask = np.zeros((n * NUM_JOINTS,), dtype=bool)
+        values = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        data[slots] = values
+        mask[slots] = True
+        t_ms = np.fromiter((int(f.t_ms) for f in source), dtype=np.int64, count=n)
+        return cls(t_ms, data.reshape(n, NUM_JOINTS, 3), mask.reshape(n, NUM_JOINTS), index)
+
+    def __len__(self) -> int:
+        return len(self.t_ms)
+
+    def frame(self, i: int) -> ref.Frame:
+        """Reference Frame for row i (for the single-frame release checks), built once."""
+        if i not in self._frames:
+            rows = self.data[i].tolist()
+            kp = {JOINTS[j]: ref.Landmark(x=rows[j][0], y=rows[j][1], score=rows[j][2]) for j in np.flatnonzero(self.mask[i])}
+            self._frames[i] = ref.Frame(t_ms=int(self.t_ms[i]), kp=kp)
+        return self._frames[i]
+
+    # ----------------------------- Series ------------------------------
+
+    def speed(self, key: str) -> Optional[np.ndarray]:
+        """_speed_series as an array; None where the reference returns [] (joint never seen)."""
+        if key not in self._speed:
+            j = JOINT_INDEX[key]
+            present = self.mask[:, j]
+            if not present.any():
+                self._speed[key] = None
+            else:
+                both = present[1:] & present[:-1]
+                dx = np.diff(self.data[:, j, 0])
+                dy = np.diff(self.data[:, j, 1])
+                step = _libm(math.hypot, dx, dy) * 1000.0 / np.maximum(1, np.diff(self.t_ms))
+                # Frames missing either endpoint repeat the previous speed; frame 0 is 0.0
+                self._speed[key] = np.concatenate(([0.0], _ffill(step, both, 0.0)))
+        return self._speed[key]
+
+    def angular_velocity(self, axis: str) -> np.ndarray:
+        """_derivative(_axis_angle_series(...)) as an array."""
+        if axis not in self._omega:
+            lj, rj = JOINT_INDEX[f"left_{axis}"], JOINT_INDEX[f"right_{axis}"]
+            valid = self.mask[:, lj] & self.mask[:, rj]
+            dx = self.data[:, rj, 0] - self.data[:, lj, 0]
+            dy = self.data[:, rj, 1] - self.data[:, lj, 1]
+            ang = np.degrees(_libm(math.atan2, dy, dx))
+            ang[(dx == 0) & (dy == 0)] = 0.0
+            vals = _ffill(ang, valid, 0.0)
+            der = np.zeros_like(vals)
+            der[1:] = np.diff(vals) / (np.maximum(1, np.diff(self.t_ms)) / 1000.0)
+            self._omega[axis] = der
+        return self._omega[axis]
+
+    def avg_conf(self, rel_idx: Optional[int], window_ms: int) -> float:
+        if rel_idx is None or len(self) == 0:
+            return 1.0
+        rel_t = int(self.t_ms[rel_idx])
+        mean = self.index.conf_mean(rel_t - window_ms, rel_t + window_ms)
+        return 1.0 if mean is None else mean
+
+    # ----------------------------- Detection ---------------------------
+
+    def handedness(self) -> str:
+        right_v = self.speed("right_wrist")
+        left_v = self.speed("left_wrist")
+        if right_v is None and left_v is None:
+            return "right"
+        right_peak = float(right_v.max()) if right_v is not None else 0.0
+        left_peak = float(left_v.max()) if left_v is not None else 0.0
+        if left_peak > right_peak * 1.15:
+            return "left"
+        return "right"
+
+    def release_idx(self, handedness: str) -> Optional[int]:
+        joints = [JOINT_INDEX[f"{handedness}_{name}"] for name in ("wrist", "shoulder", "elbow")]
+        v = self.speed(f"{handedness}_wrist")
+        if v is None:
+            return None
+        peak_idx = int(np.argmax(v))
+        best_idx = None
+        best_score = -1.0
+        for i in ref._indices_window(peak_idx, len(self), radius=2):
+            if not self.mask[i, joints].all():
+                continue
+            wrist, shoulder, elbow = (ref.Landmark(x=x, y=y) for x, y, _ in self.data[i, joints].tolist())
+            score = float(v[i])
+            if wrist.y <= shoulder.y:
+                score *= 1.1
+            if ref._joint_angle_deg(shoulder, elbow, wrist) >= 150.0:
+                score *= 1.1
+            if score > best_score:
+                best_score = score
+                best_idx = i
+        return best_idx if best_idx is not None else peak_idx
+
+    # ----------------------------- Scorers -----------------------------
+
+    def confidence_gate(self, rel_idx: Optional[int], window_ms: int = 200) -> float:
+        min_avg = self.avg_conf(rel_idx, window_ms)
+        if min_avg >= 0.7:
+            return 1.0
+        return max(0.0, min(1.0, min_avg / 0.7))
+
+    def score_shoulder_alignment(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        if rel_idx is None:
+            return 0, ["No release detected for shoulder alignment scoring"]
+        rel_t = int(self.t_ms[rel_idx])
+        sel = self.index.window(rel_t - 600, rel_t)
+        sel = sel[self.mask[sel, _LS] & self.mask[sel, _RS]]
+        if len(sel) == 0:
+            return 0, ["Insufficient shoulder landmarks"]
+        dx = self.data[sel, _RS, 0] - self.data[sel, _LS, 0]
+        dy = self.data[sel, _RS, 1] - self.data[sel, _LS, 1]
+        tilts = np.abs(np.degrees(_libm(math.atan2, dy, dx)))
+        tilts[dx == 0] = 90.0
+        p50 = float(np.sort(tilts)[len(tilts) // 2])
+        score = ref._score_with_plateau(value=p50, ideal=5, ok=10, max_bad=20, max_points=200, lower_is_better=True)
+        notes = ["Great shoulder level through the turn" if p50 <= 8 else "Keep shoulders level—imagine balancing a book"]
+        return int(score), notes
+
+    def score_hip_rotation(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        pelvis_w = self.angular_velocity("hip")
+        p_idx = int(np.argmax(np.abs(pelvis_w)))
+        s_idx = int(np.argmax(np.abs(self.angular_velocity("shoulder"))))
+        lag_ms = int(self.t_ms[s_idx]) - int(self.t_ms[p_idx])
+        lag_score = ref._bell(lag_ms, center=80, width=60, max_points=140)
+        smooth_score = _smoothness_score(pelvis_w, p_idx, max_points=60)
+        total = min(200, int(round(lag_score + smooth_score)))
+        notes = ["Good hip lead" if 40 <= lag_ms <= 120 else "Let hips start before shoulders"]
+        return total, notes
+
+    def score_release_angle(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        if rel_idx is None:
+            return 0, ["No release detected for release-angle scoring"]
+        return ref.score_release_angle([self.frame(rel_idx)], 0, handedness)
+
+    def score_power_transfer(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        p_idx = int(np.argmax(np.abs(self.angular_velocity("hip"))))
+        s_idx = int(np.argmax(np.abs(self.angular_velocity("shoulder"))))
+        wrist_v = self.speed(f"{handedness}_wrist")
+        w_idx = int(np.argmax(wrist_v)) if wrist_v is not None else 0
+        order_bonus = 100 if p_idx < s_idx < w_idx else 40 if p_idx < w_idx else 0
+        t = self.t_ms
+        hip_to_shoulder = int(t[s_idx]) - int(t[p_idx])
+        shoulder_to_wrist = int(t[w_idx]) - int(t[s_idx])
+        timing = ref._bell(hip_to_shoulder, 80, 50, 60) + ref._bell(shoulder_to_wrist, 50, 40, 60)
+        total = min(200, int(round(order_bonus + timing)))
+        notes = ["Nice energy flow: hips→shoulders→hand" if order_bonus >= 100 else "Let hips start, then shoulders, then snap the hand"]
+        return total, notes
+
+    def score_footwork_timing(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str]]:
+        if rel_idx is None:
+            return 0, ["No release detected for footwork scoring"]
+        stance = ref._stance_width_score(self.frame(rel_idx), max_points=80)
+        block_side = "left" if handedness == "right" else "right"
+        speeds = self.speed(f"{block_side}_ankle")
+        rel_t = int(self.t_ms[rel_idx])
+        idxs = self.index.window(rel_t - 400, rel_t)
+        if len(idxs) and speeds is not None:
+            min_i = int(idxs[np.argmin(speeds[idxs])])
+        else:
+            min_i = rel_idx
+        plant_to_rel = rel_t - int(self.t_ms[min_i])
+        timing = ref._bell(plant_to_rel, center=120, width=100, max_points=120)
+        total = int(round(min(200, stance + timing)))
+        notes = ["Strong block and base at release" if 80 <= plant_to_rel <= 160 else "Plant your block foot a beat earlier"]
+        return total, notes
+
+    def score_deductions(self, rel_idx: Optional[int], handedness: str) -> Tuple[int, List[str], List[str]]:
+        ded = 0
+        flags: List[str] = []
+        notes: List[str] = []
+        if rel_idx is not None:
+            f = self.frame(rel_idx)
+            trunk = abs(ref._trunk_lean_deg(f))
+            if trunk > 35:
+                ded += -int(min(80, (trunk - 35) * 2))
+                flags.append("excess_trunk_lean")
+                notes.append("Keep your chest taller at release")
+            valgus = ref._knee_valgus_deg(f, side="left" if handedness == "right" else "right")
+            if valgus > 12:
+                ded += -int(min(60, (valgus - 12) * 3))
+                flags.append("knee_valgus")
+                notes.append("Knee over toes on the block leg")
+        avg_c = self.avg_conf(rel_idx, window_ms=200)
+        if avg_c < 0.6:
+            ded += -int((0.6 - avg_c) * 100)
+            flags.append("low_confidence_window")
+        return ded, flags, notes
+
+
+def _smoothness_score(series: np.ndarray, peak_idx: int, max_points: int) -> float:
+    mags = np.abs(series).tolist()
+    if mags[peak_idx] == 0:
+        return 0.0
+    lo = max(0, peak_idx - 2)
+    hi = min(len(mags) - 1, peak_idx + 2)
+    # builtin sum, like the reference, so the rounding matches on every Python version
+    purity = sum(mags[lo:hi + 1]) / max(1e-6, sum(mags))
+    return max_points * purity
@@ -0,0 +1,229 @@
+"""
+Single-pass session scoring: PQS v1, PQS v2 and coaching from one pose.
+
+score_session() is the one entry point the API, the Pub/Sub worker and the CLI
+go through (via analyze_video):
+- one KinematicsContext: handedness and release index are detected once and
+  shared by v1 and v2
+- the PoseArray is packed once and feeds compute_features (or the feature cache)
+- the envelope for (event, age band, sex, handedness) is loaded once
+- coaching reads the v2 result in memory
+- wall time per stage is attached as timings_ms
+
+score_throws() does the same for every throw window of a multi-throw session
+(biomech/throws.py): v1 per window, concurrent feature cache lookups for all
+windows and one compute_features_batch pass over the ones it missed (their
+write-backs run in the background), one envelope load per side. Windows are
+batched rather than run on a pool: the feature stage dominates and is
+vectorized across windows, while v1, v2 and coaching per window are short
+and GIL-bound.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import time
+
+import numpy as np
+
+from backend.biomech.envelope_store import load_active_envelope
+from backend.biomech.pose import PoseArray
+from backend.pqs_algorithm import Frame, KinematicsContext, PQSBreakdown, calculate_pqs, score_pqs_v2
+
+
+@dataclass
+class SessionScore:
+    pqs: PQSBreakdown
+    pqs_v2: Dict[str, object]
+    coaching: Optional[Dict]
+    handedness: str
+    release_idx: Optional[int]
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    def as_result(self) -> Dict[str, object]:
+        """The scoring part of the .pqs.json schema ('pqs', 'pqs_v2', optional 'coaching', 'timings_ms')."""
+        out: Dict[str, object] = {"pqs": pqs_block(self.pqs), "pqs_v2": self.pqs_v2}
+        if self.coaching is not None:
+            out["coaching"] = self.coaching
+        out["timings_ms"] = self.timings_ms
+        return out
+
+
+def pqs_block(pqs: PQSBreakdown) -> Dict[str, object]:
+    return {
+        "total": pqs.total,
+        "components": {
+            "shoulder_alignment": pqs.shoulder_alignment,
+            "hip_rotation": pqs.hip_rotation,
+            "release_angle": pqs.release_angle,
+            "power_transfer": pqs.power_transfer,
+            "footwork_timing": pqs.footwork_timing,
+        },
+        "deductions": pqs.deductions,
+        "release_t_ms": pqs.release_t_ms,
+        "handedness": pqs.handedness,
+        "flags": pqs.flags,
+        "notes": pqs.notes,
+    }
+
+
+def score_session(pose: Union[List[Frame], PoseArray, KinematicsContext], profile: Optional[Dict] = None, *,
+                  event: Optional[str] = None, with_coaching: bool = False, feature_cache=None) -> SessionScore:
+    """
+    Score one athlete's landmarks.
+
+    profile: athlete profile ('ageBand', 'sex', 'handedness', 'event', 'experience_level');
+    missing keys default to Open / M / detected side / discus. event overrides profile['event'].
+    feature_cache: optional biomech.feature_cache.FeatureCache for the feature stage.
+    """
+    from backend.biomech.features import compute_features
+    profile = profile or {}
+    event = event or profile.get('event') or 'discus'
+    timings: Dict[str, float] = {}
+    start = mark = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        timings[stage] = round((now - mark) * 1000.0, 3)
+        mark = now
+
+    kin = pose if isinstance(pose, KinematicsContext) else KinematicsContext(pose)
+    pqs = calculate_pqs(kin)
+    handedness = kin.handedness
+    rel_idx = kin.release_idx(handedness)
+    lap('v1')
+
+    v2_hand = profile.get('handedness') or handedness
+    features = feature_cache.compute if feature_cache is not None else compute_features
+    series, phases, metrics = features(kin.pose, v2_hand, rel_idx)
+    lap('features')
+    envelope, used_fallback = load_active_envelope(event, profile.get('ageBand') or 'Open', profile.get('sex') or 'M', v2_hand)
+    lap('envelope')
+    pqs_v2 = score_pqs_v2(series, phases, metrics, envelope, used_fallback)
+    lap('v2')
+
+    coaching = None
+    if with_coaching:
+        from backend.coaching.throwpro import generate_throw_feedback
+        coaching = generate_throw_feedback(pqs_v2, event_type=event, athlete_profile=profile)
+        lap('coaching')
+    timings['total'] = round((time.perf_counter() - start) * 1000.0, 3)
+    return SessionScore(pqs=pqs, pqs_v2=pqs_v2, coaching=coaching, handedness=handedness,
+                        release_idx=rel_idx, timings_ms=timings)
+
+
+def score_throws(pose: PoseArray, windows: Sequence[Tuple[int, int]], profile: Optional[Dict] = None, *,
+                 event: Optional[str] = None, with_coaching: bool = False,
+                 feature_cache=None) -> Tuple[List[SessionScore], Dict[str, float]]:
+    """
+    score_session for each [i0, i1) frame window of `pose`, batched.
+
+    Each SessionScore is identical to score_session(pose[i0:i1]); frames outside
+    the windows are never read. feature_cache entries are keyed per window, so
+    re-analysis of a session video computes no features. Returns (scores,
+    session timings_ms, with 'feature_cache_hits'); each score's timings_ms
+    holds its own v1 / v2 / coaching stages.
+    """
+    from backend.biomech.features import compute_features_batch
+    profile = profile or {}
+    event = event or profile.get('event') or 'discus'
+    timings: Dict[str, float] = {}
+    start = mark = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        timings[stage] = round((now - mark) * 1000.0, 3)
+        mark = now
+
+    parts = [pose[i0:i1] for i0, i1 in windows]
+    v1 = []
+    for part in parts:
+        t0 = time.perf_counter()
+        kin = KinematicsContext(part)
+        pqs = calculate_pqs(kin)
+        hand = kin.handedness
+        v1.append((pqs, hand, kin.release_idx(hand), round((time.perf_counter() - t0) * 1000.0, 3)))
+    lap('v1')
+
+    hands = [profile.get('handedness') or hand for _, hand, _, _ in v1]
+    features: List[Optional[Tuple]] = [None] * len(parts)
+    if feature_cache is not None:
+        # All window lookups at once: one round trip of latency rather than one per window
+        features = feature_cache.get_many([(part, hands[b], v1[b][2]) for b, part in enumerate(parts)])
+    hits = sum(f is not None for f in features)
+
+    # One padded (B, T) batch over the windows the cache missed
+    todo = [b for b, f in enumerate(features) if f is None]
+    if todo:
+        B, T = len(todo), max(len(parts[b]) for b in todo)
+        data = np.zeros((B, T) + pose.data.shape[1:], dtype=np.float32)
+        mask = np.zeros((B, T, pose.mask.shape[1]), dtype=bool)
+        t_ms = np.zeros((B, T), dtype=np.int64)
+        for k, b in enumerate(todo):
+            part = parts[b]
+            n = len(part)
+            data[k, :n], mask[k, :n], t_ms[k, :n] = part.data, part.mask, part.t_ms
+            t_ms[k, n:] = part.t_ms[-1] if n else 0
+        batch = compute_features_batch(data, [len(parts[b]) for b in todo], t_ms, [hands[b] for b in todo],
+                                       [v1[b][2] for b in todo], mask)
+        for k, b in enumerate(todo):
+            features[b] = (batch.session(k), batch.phases[k], batch.metrics[k])
+            if feature_cache is not None:
+                # Queued on the artifact upload executor; encoding and writes happen after scoring
+                feature_cache.put(parts[b], hands[b], v1[b][2], *features[b])
+    lap('features')
+    timings['feature_cache_hits'] = hits
+
+    envelopes: Dict[str, Tuple[Dict, bool]] = {}
+    for hand in hands:
+        if hand not in envelopes:
+            envelopes[hand] = load_active_envelope(event, profile.get('ageBand') or 'Open', profile.get('sex') or 'M', hand)
+    lap('envelope')
+
+    scores: List[SessionScore] = []
+    for b, (pqs, hand, rel_idx, v1_ms) in enumerate(v1):
+        t0 = time.perf_counter()
+        envelope, used_fallback = envelopes[hands[b]]
+        series, phases, metrics = features[b]
+        pqs_v2 = score_pqs_v2(series, phases, metrics, envelope, used_fallback)
+        own = {'v1': v1_ms, 'v2': round((time.perf_counter() - t0) * 1000.0, 3)}
+        coaching = None
+        if with_coaching:
+            from backend.coaching.throwpro import generate_throw_feedback
+            t0 = time.perf_counter()
+            coaching = generate_throw_feedback(pqs_v2, event_type=event, athlete_profile=profile)
+            own['coaching'] = round((time.perf_counter() - t0) * 1000.0, 3)
+        scores.append(SessionScore(pqs=pqs, pqs_v2=pqs_v2, coaching=coaching, handedness=hand,
+                                   release_idx=rel_idx, timings_ms=own))
+    lap('v2')
+    timings['total'] = round((time.perf_counter() - start) * 1000.0, 3)
+    return scores, timings
+
+
+def session_summary(pose: PoseArray, windows: Sequence[Tuple[int, int]], scores: Sequence[SessionScore]) -> Dict[str, object]:
+    """The 'session' block for a multi-throw video: per-throw windows and scores plus aggregates."""
+    throws = []
+    for k, ((i0, i1), sc) in enumerate(zip(windows, scores)):
+        entry: Dict[str, object] = {
+            "index": k,
+            "start_ms": int(pose.t_ms[i0]),
+            "end_ms": int(pose.t_ms[i1 - 1]),
+            "pqs": pqs_block(sc.pqs),
+            "pqs_v2": sc.pqs_v2,
+        }
+        if sc.coaching is not None:
+            entry["coaching"] = sc.coaching
+        throws.append(entry)
+    totals = np.array([sc.pqs.total for sc in scores], dtype=float)
+    v2_totals = np.array([float(sc.pqs_v2.get("total") or 0) for sc in scores], dtype=float)
+    best = int(np.argmax(totals)) if len(totals) else None
+    scored_ms = sum(int(pose.t_ms[i1 - 1] - pose.t_ms[i0]) for i0, i1 in windows)
+    return {
+        "throw_count": len(scores),
+        "best_index": best,
+        "pqs_total": {"mean": round(float(totals.mean()), 1), "min": int(totals.min()), "max": int(totals.max())} if len(totals) else None,
+        "pqs_v2_total": {"mean": round(float(v2_totals.mean()), 1), "min": float(v2_totals.min()), "max": float(v2_totals.max())} if len(v2_totals) else None,
+        "scored_ms": scored_ms,
+        "throws": throws,
+    }
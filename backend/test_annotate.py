@@ -0,0 +1,37 @@
+from types import SimpleNamespace as NS
+
+from google.cloud import videointelligence
+
+from backend import discus_analyzer_v2 as analyzer
+from backend.pose_providers import VideoIntelligenceProvider
+
+
+class _FakeVI:
+    requests = []
+
+    def annotate_video(self, request):
+        _FakeVI.requests.append(request)
+        return NS(result=lambda timeout=None: NS(annotation_results=[NS(person_detection_annotations=[])]))
+
+
+def test_gs_uri_is_annotated_in_place(monkeypatch):
+    _FakeVI.requests = []
+    monkeypatch.setattr(videointelligence, "VideoIntelligenceServiceClient", _FakeVI)
+    monkeypatch.setattr(analyzer.storage, "Client", lambda *a, **k: (_ for _ in ()).throw(AssertionError("no GCS download")))
+
+    annotations, ingest = VideoIntelligenceProvider(record_dir="").annotate("gs://bucket/blurred/u1/throw.mp4")
+    assert _FakeVI.requests[0]["input_uri"] == "gs://bucket/blurred/u1/throw.mp4"
+    assert "input_content" not in _FakeVI.requests[0]
+    assert ingest["source"] == "input_uri" and ingest["bytes_sent"] == 0 and ingest["annotate_ms"] >= 0
+
+
+def test_local_file_is_uploaded_inline(monkeypatch, tmp_path):
+    _FakeVI.requests = []
+    monkeypatch.setattr(videointelligence, "VideoIntelligenceServiceClient", _FakeVI)
+    clip = tmp_path / "throw.mp4"
+    clip.write_bytes(b"\x00" * 1234)
+
+    out = analyzer.analyze_video(str(clip), provider=VideoIntelligenceProvider(record_dir=""))
+    assert _FakeVI.requests[0]["input_content"] == b"\x00" * 1234
+    assert out["pqs"]["flags"] == ["no_person_detected"]
+    assert out["ingest"]["source"] == "input_content" and out["ingest"]["bytes_sent"] == 1234
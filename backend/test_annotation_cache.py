@@ -0,0 +1,91 @@
+import base64
+from datetime import timedelta
+
+from google.cloud import videointelligence as vi
+
+from backend import annotation_cache as ac
+from backend.annotation_cache import AnnotationCache, CachedPoseProvider, video_content_key
+from backend.biomech.person_select import candidate_from_track_person
+from backend.cache_tiers import DiskLRU, TieredCache
+from backend.pose_providers import PoseProvider, VideoIntelligenceProvider
+
+
+def _vi_result(n=10):
+    objs = []
+    for i in range(n):
+        lms = [vi.DetectedLandmark(name=f"j{j}", point=vi.NormalizedVertex(x=0.3 + 0.01 * i, y=0.5), confidence=0.9) for j in range(17)]
+        objs.append(vi.TimestampedObject(time_offset=timedelta(milliseconds=33 * i), landmarks=lms))
+    track = vi.Track(timestamped_objects=objs, confidence=0.8)
+    return vi.VideoAnnotationResults(person_detection_annotations=[vi.PersonDetectionAnnotation(tracks=[track])])
+
+
+class _CountingVI(PoseProvider):
+    name = "videointelligence"
+
+    def __init__(self, variant=""):
+        self.calls = 0
+        self.variant = variant
+
+    def cache_variant(self):
+        return self.variant
+
+    def annotate(self, video_uri_or_path):
+        self.calls += 1
+        return _vi_result(), {"source": "input_content", "bytes_sent": 4, "annotate_ms": 1.0}
+
+
+def test_second_analysis_of_same_bytes_hits_cache(tmp_path):
+    clip = tmp_path / "throw.mp4"
+    clip.write_bytes(b"clip")
+    inner = _CountingVI()
+    provider = CachedPoseProvider(inner, AnnotationCache(TieredCache([DiskLRU(str(tmp_path / "cache"), 64 << 20)])))
+
+    cold, ingest = provider.annotate(str(clip))
+    assert ingest["cache"] == "miss" and ingest["cache_bytes_written"] > 0
+    copy = tmp_path / "retry.mp4"
+    copy.write_bytes(b"clip")
+    warm, ingest = provider.annotate(str(copy))
+    assert inner.calls == 1
+    assert ingest["source"] == "cache" and ingest["cache"] == "hit"
+    assert warm == cold
+    a = candidate_from_track_person(1, warm.person_detection_annotations[0])
+    b = candidate_from_track_person(1, cold.person_detection_annotations[0])
+    assert (a.t_ms == b.t_ms).all() and (a.xy == b.xy).all()
+
+    clip.write_bytes(b"edited")
+    provider.annotate(str(clip))
+    assert inner.calls == 2
+
+
+def test_gcs_key_uses_object_md5(monkeypatch):
+    class _Blob:
+        md5_hash = base64.b64encode(bytes.fromhex("00" * 15 + "ff")).decode()
+        generation = 7
+
+    class _Bucket:
+        def get_blob(self, name):
+            return _Blob() if name == "blurred/u1/throw.mp4" else None
+
+    class _Client:
+        def bucket(self, name):
+            return _Bucket()
+
+    monkeypatch.setattr("google.cloud.storage.Client", _Client)
+    assert video_content_key("gs://b/blurred/u1/throw.mp4") == f"{ac.ANNOTATION_CACHE_VERSION}/md5-{'00' * 15}ff"
+    assert video_content_key("gs://b/blurred/u1/missing.mp4") is None
+    assert video_content_key("/nonexistent/clip.mp4") is None
+
+
+def test_provider_settings_are_part_of_the_key(tmp_path):
+    clip = tmp_path / "throw.mp4"
+    clip.write_bytes(b"clip")
+    store = TieredCache([DiskLRU(str(tmp_path / "cache"), 64 << 20)])
+    trimmed, full = _CountingVI("opts-trimmed"), _CountingVI("opts-full")
+    CachedPoseProvider(trimmed, AnnotationCache(store)).annotate(str(clip))
+    _, ingest = CachedPoseProvider(full, AnnotationCache(store)).annotate(str(clip))
+    assert ingest["cache"] == "miss" and full.calls == 1
+
+    on = VideoIntelligenceProvider(record_dir="", prepass=True).cache_variant()
+    assert on == VideoIntelligenceProvider(record_dir="", prepass=True).cache_variant()
+    assert on != VideoIntelligenceProvider(record_dir="", prepass=False).cache_variant()
+    assert on != VideoIntelligenceProvider(record_dir="", prepass=True, segment_s=60.0).cache_variant()
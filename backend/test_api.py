@@ -39,7 +39,7 @@ async def test_analyze_json_body(monkeypatch):
         },
     }
 
-    def fake_analyze(video_uri_or_path: str, with_coaching: bool = False, event_type: str = "discus", athlete_profile: dict | None = None):
+    def fake_analyze(video_uri_or_path: str, with_coaching: bool = False, event_type: str = "discus", athlete_profile: dict | None = None, **kw):
         ret = json.loads(json.dumps(sample))
         if with_coaching:
             ret["coaching"] = {"summary": "ok", "priority_fixes": [], "reinforce_strengths": [], "drill_suggestions": []}
@@ -78,7 +78,7 @@ async def test_analyze_multipart(monkeypatch):
         },
     }
 
-    def fake_analyze(video_uri_or_path: str):
+    def fake_analyze(video_uri_or_path: str, **kw):
         return json.loads(json.dumps(sample))
 
     monkeypatch.setattr("backend.discus_analyzer_v2.analyze_video", fake_analyze)
@@ -0,0 +1,157 @@
+import json
+import threading
+
+import pytest
+
+from backend import artifacts
+from backend import discus_analyzer_v2 as analyzer
+from backend.artifacts import ArtifactUploads
+from backend.bench_features import synthetic_pose
+from backend.biomech.landmark_archive import decode_archive
+from backend.pose_providers import Annotations, PoseProvider, person_from_pose
+
+
+class _Fixed(PoseProvider):
+    name = "fixed"
+
+    def __init__(self, pose):
+        self.pose = pose
+
+    def annotate(self, video_uri_or_path):
+        return Annotations([person_from_pose(self.pose)]), {"source": "fixed", "bytes_sent": 0, "annotate_ms": 0.0}
+
+
+class _Storage:
+    created = 0
+    gate = threading.Event()
+    objects = {}
+
+    def __init__(self, *a, **k):
+        _Storage.created += 1
+
+    def bucket(self, name):
+        storage = self
+
+        class _Bucket:
+            def blob(self, path):
+                class _Blob:
+                    def upload_from_string(self, data, content_type=None):
+                        assert _Storage.gate.wait(5)
+                        if path.startswith("fail/"):
+                            raise RuntimeError("denied")
+                        _Storage.objects[f"gs://{name}/{path}"] = data
+                return _Blob()
+        return _Bucket()
+
+
+@pytest.fixture
+def fake_gcs(monkeypatch):
+    _Storage.created, _Storage.objects = 0, {}
+    _Storage.gate = threading.Event()
+    monkeypatch.setattr(artifacts.storage, "Client", _Storage)
+    monkeypatch.setattr(artifacts, "_client", None)
+    env = ({'version': 1, 'components': {}}, False)
+    monkeypatch.setattr('backend.scoring.load_active_envelope', lambda *a: env)
+    return _Storage
+
+
+def test_result_returns_before_landmark_upload_finishes(fake_gcs):
+    pose = synthetic_pose(3.0, seed=1)
+    uploads = ArtifactUploads()
+    out = analyzer.analyze_video("gs://bucket/blurred/u1/throw.mp4", provider=_Fixed(pose), uploads=uploads)
+    uri = "gs://bucket/landmarks/u1/throw.landmarks.bin"
+    assert out["assets"]["landmarks_uri"] == uri
+    done = uploads.completion()
+    assert not done.done()
+
+    fake_gcs.gate.set()
+    assert done.result(timeout=5) == {uri: None}
+    stored = decode_archive(fake_gcs.objects[uri])
+    assert (stored.t_ms == pose.t_ms).all() and (stored.mask == pose.mask).all()
+
+
+def test_failures_are_reported_and_client_is_shared(fake_gcs):
+    fake_gcs.gate.set()
+    uploads = ArtifactUploads()
+    uploads.put("gs://bucket/results/u1/a.pqs.json", "{}", "application/json")
+    uploads.put("gs://bucket/fail/u1/b.csv", lambda: "t\n0", "text/csv")
+    report = uploads.wait(timeout=5)
+    assert report["gs://bucket/results/u1/a.pqs.json"] is None
+    assert "denied" in report["gs://bucket/fail/u1/b.csv"]
+    assert fake_gcs.created == 1
+    assert ArtifactUploads().wait(timeout=1) == {}
+
+
+class _Doc:
+    def __init__(self, log):
+        self.log = log
+
+    def set(self, data, merge=False):
+        self.log.append(("doc", data))
+
+    def get(self):
+        return self
+
+    def to_dict(self):
+        return {}
+
+
+def _push(monkeypatch, fake_gcs, log):
+    from fastapi.testclient import TestClient
+    from backend.api import worker
+
+    class _FS:
+        def collection(self, name):
+            return self
+
+        def document(self, doc_id):
+            return _Doc(log)
+
+    def fake_analyze(uri, uploads=None, **kw):
+        uploads.put("gs://bucket/landmarks/u1/s.landmarks.bin", b"lm", "application/octet-stream")
+        return {"pqs": {"total": 600}, "assets": {"landmarks_uri": "gs://bucket/landmarks/u1/s.landmarks.bin"}}
+
+    monkeypatch.setattr(worker.firestore, "Client", lambda *a, **k: _FS())
+    monkeypatch.setattr("backend.discus_analyzer_v2.analyze_video", fake_analyze)
+    real = ArtifactUploads.put
+
+    def put(self, gs_uri, data, content_type):
+        fut = real(self, gs_uri, data, content_type)
+        fut.add_done_callback(lambda f: log.append(("upload", gs_uri, f.exception() is None)))
+        return fut
+
+    monkeypatch.setattr(ArtifactUploads, "put", put)
+    fake_gcs.gate.set()
+    msg = {"userId": "u1", "blurred_uri": "gs://bucket/blurred/u1/s.mp4", "filename": "s.mp4", "sessionId": "sess-1"}
+    client = TestClient(worker.app, raise_server_exceptions=False)
+    return client.post("/pubsub", json={"message": {"data": json.dumps(msg)}, "subscription": "s"})
+
+
+def _states(log):
+    return [e[1]["status"]["state"] for e in log if e[0] == "doc" and "status" in e[1]]
+
+
+def test_worker_completes_only_after_result_upload(monkeypatch, fake_gcs):
+    log = []
+    r = _push(monkeypatch, fake_gcs, log)
+    assert r.status_code == 204
+    assert _states(log) == ["ANALYZING", "COMPLETE"]
+    result_uploaded = next(i for i, e in enumerate(log) if e[0] == "upload" and e[1].endswith("/results/u1/s.pqs.json") and e[2])
+    complete = next(i for i, e in enumerate(log) if e[0] == "doc" and e[1].get("status", {}).get("state") == "COMPLETE")
+    assert result_uploaded < complete
+    assert any(e[0] == "upload" and e[1].endswith("s.landmarks.bin") for e in log)
+
+
+def test_worker_fails_when_result_upload_fails(monkeypatch, fake_gcs):
+    real = artifacts.upload
+
+    def upload(gs_uri, data, content_type):
+        if gs_uri.endswith(".pqs.json"):
+            raise RuntimeError("denied")
+        return real(gs_uri, data, content_type)
+
+    monkeypatch.setattr(artifacts, "upload", upload)
+    log = []
+    r = _push(monkeypatch, fake_gcs, log)
+    assert r.status_code == 500
+    assert _states(log) == ["ANALYZING", "ERROR"]
@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace as NS
+
+import pytest
+
+from backend import artifacts, batch_analyze
+from backend.batch_analyze import list_videos, load_manifest, run_batch
+from backend.biomech.landmark_archive import decode_archive
+
+
+def _clips(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\x00")
+    return root
+
+
+def test_batch_writes_results_and_resumes(tmp_path, offline):
+    src = _clips(tmp_path / "clips", ["a.mp4", "u1/b.mp4", "u2/c.mov", "notes.txt"])
+    out, manifest = tmp_path / "out", str(tmp_path / "m.jsonl")
+    counts = run_batch(str(src), str(out), concurrency=2, manifest_path=manifest, executor="thread",
+                       provider="synthetic", limit=2)
+    assert counts == {"listed": 3, "skipped": 0, "done": 2, "failed": 0}
+
+    # Resume: only the remaining video is analyzed
+    counts = run_batch(str(src), str(out), concurrency=2, manifest_path=manifest, executor="thread", provider="synthetic")
+    assert counts == {"listed": 3, "skipped": 2, "done": 1, "failed": 0}
+    records = load_manifest(manifest)
+    assert {r["state"] for r in records.values()} == {"done"} and len(records) == 3
+    result = json.loads((out / "u1" / "b.pqs.json").read_text())
+    assert result["pqs"]["total"] == records[str(src / "u1" / "b.mp4")]["pqs_total"]
+
+    # A changed file is analyzed again; everything else is skipped
+    (src / "a.mp4").write_bytes(b"\x00\x01")
+    assert run_batch(str(src), str(out), manifest_path=manifest, executor="thread", provider="synthetic")["done"] == 1
+
+
+def test_local_backfill_keeps_artifacts_under_out(tmp_path, offline, monkeypatch):
+    monkeypatch.setattr(artifacts, "storage_client", lambda: pytest.fail("local backfill touched GCS"))
+    src = _clips(tmp_path / "clips", ["u1/b.mp4", "u2/b.mp4"])
+    out = tmp_path / "out"
+    counts = run_batch(str(src), str(out), manifest_path="", executor="thread", provider="synthetic")
+    assert counts["done"] == 2 and counts["failed"] == 0
+    for user in ("u1", "u2"):
+        result = json.loads((out / user / "b.pqs.json").read_text())
+        assert result["assets"]["landmarks_uri"] == str(out / user / "b.landmarks.bin")
+        assert decode_archive((out / user / "b.landmarks.bin").read_bytes()).t_ms.size
+
+
+def test_failures_are_recorded_and_retried(tmp_path, offline, monkeypatch):
+    monkeypatch.setattr("backend.pose_providers.POSE_REPLAY_SOURCE", str(tmp_path / "no-replays"))
+    src = _clips(tmp_path / "clips", ["a.mp4"])
+    manifest = str(tmp_path / "m.jsonl")
+    with open(manifest, "w") as f:
+        f.write('{"uri": "torn')  # partial line from an interrupted run
+    counts = run_batch(str(src), str(tmp_path / "out"), manifest_path=manifest, executor="thread", provider="replay")
+    assert counts["failed"] == 1
+    assert "FileNotFoundError" in load_manifest(manifest)[str(src / "a.mp4")]["error"]
+    assert run_batch(str(src), str(tmp_path / "out"), manifest_path=manifest, executor="thread", provider="synthetic")["done"] == 1
+
+
+def test_gcs_listing_uses_field_projection(monkeypatch):
+    calls = []
+
+    class _Client:
+        def list_blobs(self, bucket, prefix=None, fields=None):
+            calls.append((bucket, prefix, fields))
+            return [NS(name="blurred/u1/x.mp4", size=10, generation=7), NS(name="blurred/u1/x.json", size=1, generation=1)]
+
+    monkeypatch.setattr(artifacts, "storage_client", lambda: _Client())
+    items = list_videos("gs://bkt/blurred/")
+    assert [(i.uri, i.rel, i.generation) for i in items] == [("gs://bkt/blurred/u1/x.mp4", "u1/x.mp4", "7")]
+    assert calls == [("bkt", "blurred/", batch_analyze._LIST_FIELDS)]
+
+
+def test_interrupt_records_running_analyses(tmp_path, monkeypatch):
+    src = _clips(tmp_path / "clips", ["a.mp4", "b.mp4", "c.mp4"])
+    manifest = str(tmp_path / "m.jsonl")
+    started = []
+
+    def fake_one(uri, out_uri, with_coaching=False, provider=None):
+        started.append(uri)
+        return {"pqs_total": 1, "throws": 1, "out": out_uri, "ms": 0}
+
+    def interrupted(*a, **k):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch_analyze, "analyze_one", fake_one)
+    monkeypatch.setattr(batch_analyze, "wait", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(str(src), str(tmp_path / "out"), concurrency=1, manifest_path=manifest, executor="thread")
+    records = load_manifest(manifest)
+    assert set(records) == set(started) and records and all(r["state"] == "done" for r in records.values())
+    assert len(records) < 3
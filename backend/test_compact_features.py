@@ -0,0 +1,34 @@
+import numpy as np
+
+from backend.biomech.compact import CompactFeatureSeries
+from backend.biomech.features import compute_features, _segment_phases, _summary_metrics
+from backend.bench_features import synthetic_pose
+
+
+def test_compact_round_trip_and_mmap(tmp_path):
+    pose = synthetic_pose(5)
+    pose.t_ms[:] += 3_600_000  # an hour in: t0 must survive float32 storage
+    series, phases, metrics = compute_features(pose, 'right', len(pose) // 2)
+    compact = series.compact()
+    assert compact.buf.flags['C_CONTIGUOUS'] and compact.buf.dtype == np.float32
+    assert np.shares_memory(compact.separation_deg, compact.buf)
+    np.testing.assert_array_equal(compact.t_ms, series.t_ms)
+    np.testing.assert_allclose(compact.hand_speed_norm, series.hand_speed_norm, rtol=1e-6)
+    assert compact.release_angle_deg == np.float32(series.release_angle_deg)
+
+    path = tmp_path / "features.npy"
+    compact.save(path)
+    loaded = CompactFeatureSeries.load(path)
+    assert isinstance(loaded.buf, np.memmap) and len(loaded) == len(series.t_ms)
+    np.testing.assert_array_equal(loaded.t_ms, series.t_ms)
+    # Downstream code reads a compact series like the full one
+    assert _segment_phases(loaded) == phases
+    np.testing.assert_allclose(_summary_metrics(loaded.to_series(), phases, 'right')['x_factor_peak_deg'],
+                               metrics['x_factor_peak_deg'], rtol=1e-5)
+
+
+def test_compact_is_smaller():
+    series, _, _ = compute_features(synthetic_pose(30), 'right', None)
+    eager = sum(np.asarray(v).nbytes for v in series.as_dict().values() if v is not None)
+    assert series.compact().nbytes < 0.51 * eager
+    assert series.compact().release_height_norm is None
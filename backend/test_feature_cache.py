@@ -0,0 +1,89 @@
+import os
+import time
+
+import numpy as np
+
+from backend.biomech import feature_cache as fc
+from backend.biomech.feature_cache import FeatureCache
+from backend.biomech.features import compute_features
+from backend.bench_features import synthetic_pose
+from backend.cache_tiers import DiskLRU, TieredCache
+
+
+def test_cached_features_are_lossless_and_skip_recompute(tmp_path, monkeypatch):
+    cache = FeatureCache(TieredCache([DiskLRU(str(tmp_path), 64 << 20)]))
+    pose = synthetic_pose(3)
+    cold = cache.compute(pose, 'right', 40)
+    cache.flush(5)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("features recomputed on a cache hit")
+    monkeypatch.setattr(fc, 'compute_features', fail)
+    series, phases, metrics = cache.compute(pose, 'right', 40)
+    ref_series, ref_phases, ref_metrics = compute_features(pose, 'right', 40)
+    np.testing.assert_equal(series.as_dict(), ref_series.as_dict())
+    assert phases == ref_phases == cold[1]
+    np.testing.assert_equal(metrics, ref_metrics)
+
+    # Edited landmarks or different scoring inputs miss
+    edited = synthetic_pose(3)
+    edited.data[10, 3, 0] += 0.01
+    assert fc.feature_key(edited, 'right', 40) != fc.feature_key(pose, 'right', 40)
+    assert fc.feature_key(pose, 'left', 40) != fc.feature_key(pose, 'right', 40)
+
+
+def test_disk_lru_evicts_least_recently_used(tmp_path):
+    lru = DiskLRU(str(tmp_path), max_bytes=250)
+    lru.put('a', b'x' * 100)
+    lru.put('b', b'y' * 100)
+    old = time.time() - 60
+    os.utime(tmp_path / 'a', (old, old))
+    os.utime(tmp_path / 'b', (old - 10, old - 10))
+    assert lru.get('b') == b'y' * 100  # touching b makes a the oldest
+    lru.put('c', b'z' * 100)
+    assert lru.get('a') is None and lru.get('b') is not None and lru.get('c') is not None
+
+
+class _Tier:
+    def __init__(self, fail=False):
+        self.reads, self.data, self.fail = 0, {}, fail
+
+    def get(self, key):
+        self.reads += 1
+        return self.data.get(key)
+
+    def put(self, key, data):
+        if self.fail:
+            raise RuntimeError("denied")
+        self.data[key] = data
+
+
+def test_writes_are_background_and_remote_reads_optional():
+    local, remote = _Tier(), _Tier(fail=True)
+    cache = FeatureCache(TieredCache([local, remote]), read_tiers=1)
+    pose = synthetic_pose(3)
+    cache.compute(pose, 'right', 40)  # a failing tier never fails scoring
+    cache.flush(5)
+    assert remote.reads == 0 and len(local.data) == 1
+    cache.compute(pose, 'right', 40)
+    assert local.reads == 2 and remote.reads == 0
+
+
+def test_evict_tolerates_entries_removed_by_another_process(tmp_path, monkeypatch):
+    lru = DiskLRU(str(tmp_path), max_bytes=150)
+    lru.put('a', b'x' * 100)
+    gone = []
+
+    class _Vanished:
+        name, path = 'a', str(tmp_path / 'a')
+
+        def is_file(self):
+            return True
+
+        def stat(self):
+            gone.append(self.name)
+            raise FileNotFoundError(self.path)
+
+    monkeypatch.setattr(os, 'scandir', lambda root: [_Vanished()])
+    lru.put('b', b'y' * 100)
+    assert gone == ['a']
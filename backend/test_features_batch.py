@@ -0,0 +1,37 @@
+import numpy as np
+
+from backend.biomech.features import compute_features, compute_features_batch
+from backend.bench_features import synthetic_pose
+
+
+def _padded(poses):
+    B, T = len(poses), max(len(p) for p in poses)
+    data = np.zeros((B, T, 17, 3), dtype=np.float32)
+    mask = np.zeros((B, T, 17), dtype=bool)
+    t_ms = np.zeros((B, T), dtype=np.int64)
+    for b, p in enumerate(poses):
+        n = len(p)
+        data[b, :n], mask[b, :n], t_ms[b, :n] = p.data, p.mask, p.t_ms
+    return data, mask, t_ms
+
+
+def test_batch_matches_single_session():
+    # Mixed lengths (including one shorter than the smoothing window) and handedness
+    poses = [synthetic_pose(d, seed=i) for i, d in enumerate([4, 0.2, 9, 0.05])]
+    hands = ['right', 'left', 'left', 'right']
+    rels = [len(p) // 2 for p in poses]
+    data, mask, t_ms = _padded(poses)
+    batch = compute_features_batch(data, [len(p) for p in poses], t_ms, hands, rels, mask=mask)
+    assert batch.series.pelvis_ang_deg.shape == (4, int(batch.lengths.max()))
+    for b, (p, h, r) in enumerate(zip(poses, hands, rels)):
+        series, phases, metrics = compute_features(p, h, r)
+        np.testing.assert_equal(batch.session(b).as_dict(), series.as_dict())
+        assert batch.phases[b] == phases
+        np.testing.assert_equal(batch.metrics[b], metrics)
+
+
+def test_batch_empty_session():
+    data, mask, t_ms = _padded([synthetic_pose(2)])
+    batch = compute_features_batch(np.concatenate([data, data]), [len(t_ms[0]), 0], np.concatenate([t_ms, t_ms]))
+    assert len(batch.session(1).t_ms) == 0 and batch.metrics[1] == {}
+    assert batch.session(1).release_angle_deg is None
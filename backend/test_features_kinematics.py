@@ -0,0 +1,69 @@
+import numpy as np
+
+from backend.pqs_algorithm import make_frame
+from backend.biomech.features import compute_features
+from backend.biomech.pose import PoseArray
+from backend.biomech.resample import resample_pose, savgol_smooth
+
+
+def _wrist_track(n=20, step_ms=40, dx=0.015625):
+    return [make_frame(i * step_ms, {
+        'left_shoulder': (0.375, 0.5), 'right_shoulder': (0.625, 0.5),
+        'right_wrist': (0.25 + dx * i, 0.5),
+    }) for i in range(n)]
+
+
+def test_hand_speed_uses_consecutive_samples():
+    series, _, _ = compute_features(_wrist_track(), 'right', None)
+    assert len(series.t_ms) == 77 and (np.diff(series.t_ms) == 10).all()
+    # Uniform motion interpolated onto the 100 Hz grid: constant speed away from the smoothing edges
+    v = series.hand_speed_proxy[6:-6]
+    np.testing.assert_allclose(v, 0.015625 / 0.04, rtol=1e-4)
+    np.testing.assert_allclose(series.hand_speed_norm[6:-6], v / 0.25, rtol=1e-4)
+
+
+def test_gaps_beyond_max_gap_are_masked():
+    frames = _wrist_track()
+    for f in frames[5:11]:  # 240 ms without a wrist
+        del f.kp['right_wrist']
+    pose = resample_pose(PoseArray.from_frames(frames))
+    wrist = pose.present('right_wrist')
+    assert not wrist[(pose.t_ms > 160) & (pose.t_ms < 440)].any()
+    assert wrist[pose.t_ms <= 160].all() and wrist[pose.t_ms >= 440].all()
+    # A single dropped frame (80 ms) is bridged
+    frames = _wrist_track()
+    del frames[5].kp['right_wrist']
+    assert resample_pose(PoseArray.from_frames(frames)).present('right_wrist').all()
+
+
+def test_savgol_preserves_cubics_and_rejects_noise():
+    t = np.arange(60, dtype=float)
+    cubic = (0.001 * t ** 3 - 0.02 * t ** 2 + t)[:, None, None]
+    valid = np.ones((60, 1), dtype=bool)
+    out = savgol_smooth(cubic, valid)
+    np.testing.assert_allclose(out[5:-5], cubic[5:-5], atol=1e-8)
+    noise = np.random.default_rng(0).normal(0, 1, size=(500, 1, 1))
+    assert savgol_smooth(noise, np.ones((500, 1), dtype=bool)).std() < 0.7 * noise.std()
+
+
+def test_release_metrics_tolerate_missing_joints():
+    frames = _wrist_track()
+    series, _, _ = compute_features(frames, 'right', 5)
+    # No right elbow: release angle is undefined rather than an error
+    assert series.release_angle_deg is None
+    assert series.release_height_norm == 0.0
+
+
+def test_empty_input():
+    series, phases, metrics = compute_features([], 'right', None)
+    assert len(series.t_ms) == 0 and metrics == {}
+
+
+def test_feature_series_is_lazy():
+    frames = _wrist_track()
+    series, _, _ = compute_features(frames, 'right', None)
+    # Scoring touched the sequencing fields only; the rest is computed on demand
+    assert 'separation_vel' in vars(series) and 'knee_valgus_l_deg' not in vars(series)
+    knee = series.knee_valgus_l_deg
+    assert series.knee_valgus_l_deg is knee and len(knee) == len(series.t_ms)
+    assert set(series.as_dict()) >= {'foot_angle_l_deg', 'wrist_ext_deg', 'confidence'}
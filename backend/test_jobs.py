@@ -0,0 +1,99 @@
+import io
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import jobs
+from backend.api.main import app
+
+
+SAMPLE = {
+    "video": {"name": "throw.mp4", "duration_ms": 1000},
+    "pqs": {
+        "total": 600,
+        "components": {"shoulder_alignment": 120, "hip_rotation": 120, "release_angle": 120, "power_transfer": 120, "footwork_timing": 120},
+        "deductions": 0,
+        "release_t_ms": 500,
+        "handedness": "right",
+        "flags": [],
+        "notes": [],
+    },
+}
+
+
+@pytest.fixture
+def pool():
+    p = jobs.AnalysisPool(workers=1, queue_depth=0, executor="thread")
+    prev = jobs.set_pool(p)
+    yield p
+    jobs.set_pool(prev)
+    p.shutdown()
+
+
+def _upload(name="throw.mp4"):
+    return {"video_file": (name, io.BytesIO(b"\x00\x00\x00\x18ftypmp42"), "video/mp4")}
+
+
+def test_analyze_sync_runs_in_pool(monkeypatch, pool):
+    seen = {}
+
+    def fake_analyze(video_uri_or_path, with_coaching=False, **kw):
+        seen["thread"] = threading.current_thread().name
+        seen["path"] = video_uri_or_path
+        assert os.path.exists(video_uri_or_path)
+        return dict(SAMPLE)
+
+    monkeypatch.setattr("backend.discus_analyzer_v2.analyze_video", fake_analyze)
+    r = TestClient(app).post("/analyze", files=_upload())
+    assert r.status_code == 200
+    assert r.json()["pqs"]["total"] == 600
+    assert seen["thread"].startswith("analyze")
+    assert not os.path.exists(seen["path"])
+    assert pool.in_flight == 0
+
+
+def test_analyze_async_job_and_429(monkeypatch, pool):
+    release = threading.Event()
+
+    def fake_analyze(video_uri_or_path, with_coaching=False, **kw):
+        release.wait(5)
+        return dict(SAMPLE)
+
+    monkeypatch.setattr("backend.discus_analyzer_v2.analyze_video", fake_analyze)
+    c = TestClient(app)
+    r = c.post("/analyze?async=true", files=_upload())
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    assert c.get(f"/jobs/{job_id}").json()["state"] in ("QUEUED", "RUNNING")
+
+    busy = c.post("/analyze?async=true", files=_upload("other.mp4"))
+    assert busy.status_code == 429
+    assert busy.headers.get("retry-after")
+
+    release.set()
+    status = c.get(f"/jobs/{job_id}?wait=5").json()
+    assert status["state"] == "DONE"
+    assert status["result"]["pqs"]["total"] == 600
+    assert c.get("/jobs/missing").status_code == 404
+
+
+def test_run_analysis_waits_for_uploads_and_reports_failures(monkeypatch):
+    landed = threading.Event()
+
+    def fake_analyze(video_uri_or_path, with_coaching=False, uploads=None, **kw):
+        def slow():
+            landed.wait(0.2)
+            landed.set()
+            return b"{}"
+        uploads.put("gs://b/results/u/throw.landmarks.json", slow, "application/json")
+        uploads.put("gs://b/results/u/throw.csv", lambda: (_ for _ in ()).throw(RuntimeError("denied")), "text/csv")
+        return dict(SAMPLE)
+
+    monkeypatch.setattr("backend.discus_analyzer_v2.analyze_video", fake_analyze)
+    monkeypatch.setattr("backend.artifacts.upload", lambda uri, payload, ct: uri)
+    result = jobs.run_analysis("gs://b/throw.mp4")
+    assert landed.is_set()
+    assert list(result["upload_errors"]) == ["gs://b/results/u/throw.csv"]
+    assert "denied" in result["upload_errors"]["gs://b/results/u/throw.csv"]
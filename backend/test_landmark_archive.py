@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from backend.bench_features import synthetic_pose
+from backend.biomech import landmark_archive as la
+from backend.biomech.landmark_archive import LandmarkArchive, decode_archive, encode_archive, pose_to_records, records_to_pose
+from backend.biomech.pose import JOINTS
+
+
+def _same(a, b):
+    assert (a.t_ms == b.t_ms).all() and (a.mask == b.mask).all()
+    return np.abs(a.data[a.mask] - b.data[b.mask]).max() if a.mask.any() else 0.0
+
+
+def test_roundtrip_and_range_reads():
+    pose = synthetic_pose(20, seed=3)
+    buf = encode_archive(pose, block_frames=64, meta={"video": "throw.mp4"})
+    arc = LandmarkArchive(buf)
+    assert arc.meta["video"] == "throw.mp4" and arc.meta["joints"][10] == "right_wrist"
+    assert _same(arc.read(), pose) == 0.0
+
+    i0, i1 = arc.span(1000, 2500)
+    part = arc.read(1000, 2500)
+    assert _same(part, pose[i0:i1]) == 0.0
+    assert len(arc.read(10 ** 9, None)) == 0 and len(arc.read(0, -1)) == 0
+    assert len(decode_archive(encode_archive(pose.take(np.arange(0))))) == 0
+
+
+def test_quantized_and_zlib_archives():
+    pose = synthetic_pose(10, seed=4)
+    quant = encode_archive(pose, quantize=True)
+    assert len(quant) < len(encode_archive(pose))
+    assert _same(decode_archive(quant), pose) < 1e-4
+    zl = encode_archive(pose, codec=la.CODEC_ZLIB)
+    assert LandmarkArchive(zl).codec == la.CODEC_ZLIB and _same(decode_archive(zl), pose) == 0.0
+    with pytest.raises(ValueError):
+        LandmarkArchive(b"JSON" + zl[4:])
+
+
+def test_json_export_roundtrip():
+    pose = synthetic_pose(2, seed=5)
+    pose.mask[:] = True
+    back = records_to_pose(pose_to_records(pose))
+    assert _same(back, pose) == 0.0
+
+
+def test_json_export_keeps_joint_slots():
+    pose = synthetic_pose(3, seed=6)
+    pose.mask[:] = True
+    pose.mask[1, [0, 5, 16]] = False
+    recs = pose_to_records(pose)
+    assert all(len(r["landmarks"]) == len(JOINTS) for r in recs)
+    assert recs[1]["landmarks"][5] == {"name": "left_shoulder", "x": None, "y": None, "z": None, "confidence": None}
+    back = records_to_pose(recs)
+    assert np.array_equal(back.mask, pose.mask)
+    assert np.array_equal(back.data[back.mask], pose.data[pose.mask])
+
+
+def test_legacy_records_are_mapped_by_position_only_when_complete():
+    full = [{"x": 0.01 * j, "y": 0.5, "confidence": 0.9} for j in range(len(JOINTS))]
+    frames = [
+        {"timestamp_ms": 0, "landmarks": full},
+        {"timestamp_ms": 33, "landmarks": full[:12]},  # dropped joints: positions are ambiguous
+    ]
+    pose = records_to_pose(frames)
+    assert pose.t_ms.tolist() == [0, 33]
+    assert pose.mask[0].all() and abs(pose.data[0, 16, 0] - 0.16) < 1e-6
+    assert not pose.mask[1].any()
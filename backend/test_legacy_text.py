@@ -0,0 +1,85 @@
+import io
+import re
+
+import numpy as np
+
+from backend.biomech.landmark_archive import LandmarkArchive
+from backend.biomech.legacy_text import convert, iter_people
+from backend.parse_analysis import parse_person_data
+
+
+def _dump(people):
+    # Same layout as ComprehensiveDiscusAnalyzer.analyze_video_with_full_output
+    out = ["PRAXISFORMA COMPREHENSIVE DISCUS ANALYSIS", "=" * 60, "", "SUMMARY:", f"Found {len(people)} person detections", ""]
+    for pid, (conf, frames) in enumerate(people, start=1):
+        out += ["=" * 50, f"PERSON {pid}:", f"Track confidence: {conf}", "=" * 50, "", "TRACK DATA:"]
+        for t, pts in frames:
+            out += ["", f"Time: {t}s - {len(pts)} landmarks"]
+            out += [f"  Landmark {j}: x={x}, y={y}" for j, (x, y) in enumerate(pts)]
+        out += ["", f"Total landmarks for Person {pid}: 0", "-" * 50, ""]
+    return "\n".join(out) + "\n"
+
+
+def _reference(text):
+    # The dict-based parse analyze_biomechanics_from_file used before streaming
+    people, cur, t = {}, None, None
+    for line in text.split("\n"):
+        if line.startswith("PERSON "):
+            cur = int(re.search(r"PERSON (\d+):", line).group(1))
+            people[cur] = {}
+        elif "Time:" in line and "landmarks" in line:
+            t = float(re.search(r"Time: ([\d.]+)s", line).group(1))
+            people[cur][t] = {}
+        elif "Landmark" in line and "x=" in line:
+            m = re.search(r"Landmark (\d+): x=([\d.]+), y=([\d.]+)", line)
+            people[cur][t][int(m.group(1))] = (float(m.group(2)), float(m.group(3)))
+    return people
+
+
+def _frames(n, x0, amp, start=0.0):
+    return [(round(start + i / 30, 2), [(round(x0 + amp * np.sin(i / 3) + 0.01 * j, 3), round(0.2 + 0.03 * j, 3)) for j in range(17)])
+            for i in range(n)]
+
+
+def test_streaming_parse_matches_reference():
+    thrower = _frames(40, 0.4, 0.2)
+    thrower.append((thrower[5][0], [(0.9, 0.9)] * 12))  # repeated timestamp replaces the frame
+    text = _dump([(0.62, thrower), (0.95, _frames(30, 0.7, 0.0))])
+    ref = _reference(text)
+    people = list(iter_people(io.StringIO(text)))
+    assert [p.person_id for p in people] == [1, 2] and people[1].confidence == 0.95
+    for p in people:
+        frames = ref[p.person_id]
+        times = sorted(frames)
+        assert p.pose.t_ms.tolist() == [int(t * 1000) for t in times]
+        for row, t in enumerate(times):
+            assert set(np.flatnonzero(p.pose.mask[row]).tolist()) == set(frames[t])
+            for j, (x, y) in frames[t].items():
+                assert np.float32(x) == p.pose.data[row, j, 0] and np.float32(y) == p.pose.data[row, j, 1]
+        assert (p.pose.data[..., 2][p.pose.mask] == 1.0).all()
+
+
+def test_convert_and_parse_person_data(tmp_path):
+    path = tmp_path / "full_analysis_clip.txt"
+    path.write_text(_dump([(0.95, _frames(30, 0.7, 0.0)), (0.8, _frames(40, 0.4, 0.2))]))
+    written = convert(str(path), str(tmp_path / "out"))
+    assert [w.rsplit("/", 1)[-1] for w in written] == ["full_analysis_clip.landmarks.bin"]
+    arc = LandmarkArchive(open(written[0], "rb").read())
+    assert arc.meta["person_id"] == 2 and len(arc) == 40
+    assert len(convert(str(path), str(tmp_path / "all"), all_people=True)) == 2
+
+    persons = parse_person_data(str(path))
+    assert [p["id"] for p in persons] == [1, 2]
+    assert persons[1]["landmarks"][3] == {"x": float(np.float32(_frames(40, 0.4, 0.2)[-1][1][3][0])), "y": float(np.float32(0.29))}
+
+
+def test_converted_archive_replays(tmp_path):
+    from backend.biomech.vi_decode import decode_person
+    from backend.pose_providers import ReplayPoseProvider
+    path = tmp_path / "clip.txt"
+    path.write_text(_dump([(0.9, _frames(30, 0.4, 0.2))]))
+    convert(str(path), str(tmp_path))
+    ann, ingest = ReplayPoseProvider(source=str(tmp_path)).annotate("gs://bucket/users/u1/clip.mp4")
+    assert ingest["replay_uri"].endswith("clip.landmarks.bin")
+    pose = decode_person(ann.person_detection_annotations[0])
+    assert len(pose) == 30 and pose.mask.all()
@@ -0,0 +1,75 @@
+from types import SimpleNamespace as NS
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.motion_prepass import active_window
+from backend.pose_providers import VideoIntelligenceProvider
+
+
+def _video(path, duration_s=20.0, fps=30, active=(12.0, 15.0)):
+    # Still scene except for a figure sweeping across the frame during `active`
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (320, 240))
+    rng = np.random.default_rng(0)
+    scene = rng.integers(60, 120, size=(240, 320, 3), dtype=np.uint8)
+    for i in range(int(duration_s * fps)):
+        frame = scene.copy()
+        t = i / fps
+        if active[0] <= t < active[1]:
+            x = int(40 + 240 * (t - active[0]) / (active[1] - active[0]))
+            cv2.circle(frame, (x, 120 + int(40 * np.sin(6 * t))), 30, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_window_brackets_motion(tmp_path):
+    w = active_window(str(_video(tmp_path / "session.mp4")), pad_s=1.0)
+    assert w.trimmed and w.duration_s == pytest.approx(20.0, abs=0.1)
+    assert 10.5 <= w.start_s <= 12.0 and 15.0 <= w.end_s <= 16.5
+    assert w.prepass_ms < 0.25 * w.duration_s * 1000.0
+    assert active_window(str(tmp_path / "missing.mp4")) is None
+
+
+def test_still_video_is_not_trimmed(tmp_path):
+    w = active_window(str(_video(tmp_path / "still.mp4", duration_s=5.0, active=(9.0, 9.0))))
+    assert not w.trimmed and (w.start_s, w.end_s) == (0.0, w.duration_s)
+
+
+class _FakeVI:
+    requests = []
+
+    def annotate_video(self, request):
+        _FakeVI.requests.append(request)
+        return NS(result=lambda timeout=None: NS(annotation_results=[NS(person_detection_annotations=[])]))
+
+
+def test_annotation_is_requested_for_the_active_segment_only(monkeypatch, tmp_path):
+    from google.cloud import videointelligence
+    _FakeVI.requests = []
+    monkeypatch.setattr(videointelligence, "VideoIntelligenceServiceClient", _FakeVI)
+    clip = _video(tmp_path / "session.mp4")
+
+    _, ingest = VideoIntelligenceProvider(record_dir="", prepass=True).annotate(str(clip))
+    seg = _FakeVI.requests[0]["video_context"].segments[0]
+    start, end = seg.start_time_offset.total_seconds(), seg.end_time_offset.total_seconds()
+    assert (start, end) == pytest.approx((ingest["trim"]["start_s"], ingest["trim"]["end_s"]), abs=1e-3)
+    assert end - start < 0.5 * ingest["trim"]["duration_s"]
+    assert ingest["prepass_bytes_read"] == clip.stat().st_size and ingest["prepass_ms"] > 0
+
+    VideoIntelligenceProvider(record_dir="", prepass=False).annotate(str(clip))
+    assert not _FakeVI.requests[1]["video_context"].segments
+
+
+def test_large_gcs_objects_skip_the_prepass(monkeypatch):
+    from google.cloud import videointelligence
+    _FakeVI.requests = []
+    monkeypatch.setattr(videointelligence, "VideoIntelligenceServiceClient", _FakeVI)
+    monkeypatch.setattr("backend.motion_prepass.source_size", lambda uri: 300 << 20)
+    monkeypatch.setattr("backend.motion_prepass.motion_series", lambda *a, **k: pytest.fail("object streamed"))
+
+    provider = VideoIntelligenceProvider(record_dir="", prepass=True, segment_s=0, prepass_gcs_max_mb=100)
+    _, ingest = provider.annotate("gs://bucket/blurred/u1/session.mp4")
+    assert ingest["prepass_skipped"] == "object_size" and "trim" not in ingest
+    assert ingest["bytes_sent"] == 0 and not _FakeVI.requests[0]["video_context"].segments
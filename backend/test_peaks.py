@@ -0,0 +1,43 @@
+import numpy as np
+
+from backend.biomech.features import compute_features
+from backend.biomech.peaks import find_peaks, local_maxima, prominences, tallest
+from backend.bench_features import synthetic_pose
+
+
+def _brute_prominence(x, p, lo, hi):
+    i = j = p
+    while i - 1 >= lo and x[i - 1] <= x[p]:
+        i -= 1
+    while j + 1 <= hi and x[j + 1] <= x[p]:
+        j += 1
+    return x[p] - max(x[i:p + 1].min(), x[p:j + 1].min())
+
+
+def test_peaks_match_brute_force():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        n = int(rng.integers(3, 150))
+        x = np.round(rng.normal(size=n), 1)  # rounding creates plateaus and ties
+        lo, hi = int(rng.integers(0, n // 3 + 1)), int(rng.integers(2 * n // 3, n))
+        peaks = local_maxima(x, lo, hi)
+        assert list(peaks) == [i for i in range(lo + 1, hi) if x[i - 1] < x[i] > x[i + 1]]
+        np.testing.assert_allclose(prominences(x, peaks, lo, hi), [_brute_prominence(x, p, lo, hi) for p in peaks])
+
+
+def test_find_peaks_filters():
+    x = np.array([0, 3, 0, 1, 0, 5, 4, 4.5, 0, 2, 0], dtype=float)
+    assert list(find_peaks(x)) == [1, 3, 5, 7, 9]
+    assert list(find_peaks(x, height=2.5)) == [1, 5, 7]
+    assert list(find_peaks(x, prominence=1.5)) == [1, 5, 9]
+    assert list(find_peaks(x, distance=3)) == [1, 5, 9]
+    assert list(find_peaks(x, lo=4, hi=8)) == [5, 7]
+    assert tallest(x) == 5 and tallest(np.arange(5.0)) is None
+
+
+def test_phases_skip_endpoint_artifacts():
+    series, phases, _ = compute_features(synthetic_pose(3, seed=1), 'right', None)
+    peak = phases.drive[1]
+    assert 0 < peak < len(series.t_ms) - 1
+    sep = np.abs(series.separation_vel)
+    assert sep[peak] == sep[local_maxima(sep)].max()
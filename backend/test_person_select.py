@@ -0,0 +1,32 @@
+from datetime import timedelta
+from types import SimpleNamespace as NS
+
+import numpy as np
+
+from backend.biomech.person_select import candidate_from_track_person, rank_scores, select_athlete
+
+
+def _person(conf, n=30, amp=0.0, start_s=0.0):
+    objs = []
+    for i in range(n):
+        phase = np.sin(i / 3.0) * amp
+        lms = [NS(point=NS(x=0.5 + phase, y=0.5 - phase)) for _ in range(17)]
+        objs.append(NS(time_offset=timedelta(seconds=start_s + i / 30.0), landmarks=lms))
+    return NS(tracks=[NS(confidence=conf, timestamped_objects=objs)])
+
+
+def test_moving_thrower_beats_confident_bystander():
+    people = [_person(0.95, amp=0.0), _person(0.6, amp=0.2), _person(0.9, n=5, amp=0.2)]
+    cands = [candidate_from_track_person(i + 1, p) for i, p in enumerate(people)]
+    assert cands[1].xy.shape == (30, 4, 2) and cands[1].present.all()
+    scores = rank_scores(cands)
+    assert scores[0] == 0.0
+    assert select_athlete(cands) == 1
+
+
+def test_select_falls_back_to_confidence():
+    people = [_person(0.5), _person(0.8), _person(0.8)]
+    cands = [candidate_from_track_person(i + 1, p) for i, p in enumerate(people)]
+    assert select_athlete(cands) == 1
+    assert select_athlete([]) is None
+    assert select_athlete([candidate_from_track_person(1, NS(tracks=[]))]) == 0
@@ -0,0 +1,69 @@
+import numpy as np
+
+from backend.pqs_algorithm import make_frame, calculate_pqs, calculate_pqs_v2, detect_handedness, detect_release_idx
+from backend.biomech.features import compute_features
+from backend.biomech.pose import PoseArray, JOINT_INDEX
+
+
+def _frames(n=40):
+    # Coordinates on a 1/256 grid are exact in float32, so both containers see identical inputs
+    frames = []
+    for i in range(n):
+        q = lambda v: round(v * 256) / 256.0
+        frames.append(make_frame(i * 33, {
+            'left_shoulder': (q(0.4), q(0.6)), 'right_shoulder': (q(0.6), q(0.6 - 0.002 * i)),
+            'left_hip': (q(0.45 - 0.002 * i), q(0.8)), 'right_hip': (q(0.55 + 0.002 * i), q(0.8)),
+            'right_elbow': (q(0.6), q(0.65)), 'right_wrist': (q(0.6 + 0.0001 * i * i), q(0.65 - 0.004 * i)),
+            'left_ankle': (q(0.45), q(0.95)), 'right_ankle': (q(0.55), q(0.95)),
+        }))
+    return frames
+
+
+def test_pose_array_round_trip():
+    frames = _frames(10)
+    pose = PoseArray.from_frames(frames)
+    assert pose.data.shape == (10, 17, 3) and pose.data.dtype == np.float32
+    assert pose.mask[:, JOINT_INDEX['right_wrist']].all()
+    assert not pose.mask[:, JOINT_INDEX['nose']].any()
+    back = pose.to_frames()
+    assert [f.t_ms for f in back] == [f.t_ms for f in frames]
+    assert set(back[3].kp) == set(frames[3].kp)
+    assert back[3].kp['right_wrist'].x == frames[3].kp['right_wrist'].x
+    assert 'nose' not in back[3].kp
+
+
+def test_pose_array_views_share_memory():
+    pose = PoseArray.from_frames(_frames(5))
+    assert np.shares_memory(pose.xy('left_hip'), pose.data)
+    assert np.shares_memory(pose.present('left_hip'), pose.mask)
+    assert len(pose[1:3]) == 2
+
+
+def test_scoring_accepts_pose_array():
+    frames = _frames()
+    pose = PoseArray.from_frames(frames)
+    assert calculate_pqs(pose) == calculate_pqs(frames)
+    hand = detect_handedness(frames)
+    rel = detect_release_idx(frames, hand)
+    s1, _, m1 = compute_features(frames, hand, rel)
+    s2, _, m2 = compute_features(pose, hand, rel)
+    np.testing.assert_equal(m1, m2)
+    np.testing.assert_array_equal(s1.separation_deg, s2.separation_deg)
+    assert calculate_pqs_v2(pose, hand, rel)['total'] == calculate_pqs_v2(frames, hand, rel)['total']
+
+
+def test_kinematics_context_shares_series(monkeypatch):
+    import backend.pqs_algorithm as pa
+    frames = _frames()
+    expected = calculate_pqs(frames)
+    calls = []
+    speed, angle = pa._speed_series, pa._axis_angle_series
+    monkeypatch.setattr(pa, '_speed_series', lambda fr, key: calls.append(key) or speed(fr, key))
+    monkeypatch.setattr(pa, '_axis_angle_series', lambda fr, axis: calls.append(axis) or angle(fr, axis))
+    kin = pa.KinematicsContext(frames, backend='python')
+    assert calculate_pqs(kin) == expected
+    assert kin.release_idx() == kin.release_idx(kin.handedness)
+    assert sorted(calls) == sorted(set(calls))  # every series computed once
+    assert kin.handedness == detect_handedness(frames)
+    assert kin.release_idx() == detect_release_idx(frames, kin.handedness)
+    assert calculate_pqs_v2(kin, kin.handedness, kin.release_idx())['total'] == calculate_pqs_v2(frames, kin.handedness, kin.release_idx())['total']
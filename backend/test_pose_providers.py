@@ -0,0 +1,74 @@
+import gzip
+import json
+
+import pytest
+
+from backend import discus_analyzer_v2 as analyzer
+from backend.biomech.person_select import candidate_from_track_person, select_athlete
+from backend.pose_providers import ReplayPoseProvider, SyntheticPoseProvider, get_pose_provider, person_from_frames
+
+
+def _export(n=40):
+    # Same records analyze_video writes to landmarks/{uid}/{base}.landmarks.json
+    frames = []
+    for i in range(n):
+        lms = [{"x": 0.4 + 0.01 * j, "y": 0.3 + 0.02 * j, "z": None, "confidence": 1.0} for j in range(17)]
+        lms[10]["x"] += 0.3 * (i / n) ** 2
+        frames.append({"timestamp_ms": i * 33, "landmarks": lms})
+    return frames
+
+
+def test_replay_reads_landmarks_export(tmp_path, offline):
+    (tmp_path / "throw.landmarks.json").write_bytes(gzip.compress(json.dumps(_export()).encode("utf-8")))
+    annotations, ingest = ReplayPoseProvider(str(tmp_path)).annotate("gs://bucket/blurred/u1/throw.mp4")
+    assert ingest["source"] == "replay" and ingest["replay_uri"].endswith("throw.landmarks.json")
+    person = annotations.person_detection_annotations[0]
+    objs = person.tracks[0].timestamped_objects
+    assert len(objs) == 40 and objs[3].time_offset.total_seconds() == pytest.approx(0.099)
+    assert len(objs[0].landmarks) == 17
+
+    out = analyzer.analyze_video(str(tmp_path / "throw.mp4"), provider=ReplayPoseProvider(str(tmp_path)))
+    assert out["video"]["duration_ms"] == 39 * 33
+    assert out["ingest"]["source"] == "replay"
+    assert "no_person_detected" not in out["pqs"]["flags"]
+
+    with pytest.raises(FileNotFoundError):
+        ReplayPoseProvider(str(tmp_path)).annotate("missing.mp4")
+
+
+def test_synthetic_is_deterministic_and_selects_thrower():
+    provider = SyntheticPoseProvider(latency_ms=0, duration_s=2.0, bystanders=2)
+    annotations, ingest = provider.annotate("clip.mp4")
+    again, _ = provider.annotate("clip.mp4")
+    people = annotations.person_detection_annotations
+    assert len(people) == 3 and ingest["source"] == "synthetic"
+    assert people[0] == again.person_detection_annotations[0]
+    cands = [candidate_from_track_person(i + 1, p) for i, p in enumerate(people)]
+    assert select_athlete(cands) == 0
+    assert isinstance(get_pose_provider("synthetic"), SyntheticPoseProvider)
+    with pytest.raises(ValueError):
+        get_pose_provider("nope")
+
+
+def test_replay_roundtrips_export_with_missing_joints(tmp_path):
+    from backend.bench_features import synthetic_pose
+    from backend.biomech.landmark_archive import pose_to_records
+    from backend.biomech.vi_decode import decode_person
+    pose = synthetic_pose(2.0, seed=3)
+    pose.mask[:] = True
+    pose.mask[5, [0, 9]] = False
+    pose.mask[6, 16] = False
+    (tmp_path / "throw.landmarks.json").write_bytes(gzip.compress(json.dumps(pose_to_records(pose)).encode("utf-8")))
+    annotations, _ = ReplayPoseProvider(str(tmp_path)).annotate("throw.mp4")
+    back = decode_person(annotations.person_detection_annotations[0])
+    assert (back.t_ms == pose.t_ms).all() and (back.mask == pose.mask).all()
+    assert abs(back.data[back.mask] - pose.data[pose.mask]).max() < 1e-6
+
+
+def test_zero_confidence_is_kept():
+    frames = _export(2)
+    frames[0]["landmarks"][4]["confidence"] = 0.0
+    del frames[1]["landmarks"][4]["confidence"]
+    from backend.biomech.vi_decode import decode_person
+    pose = decode_person(person_from_frames(frames))
+    assert pose.data[0, 4, 2] == 0.0 and pose.data[1, 4, 2] == 1.0
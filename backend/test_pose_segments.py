@@ -0,0 +1,96 @@
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace as NS
+
+import numpy as np
+from google.cloud import videointelligence as vi
+
+from backend import pose_segments
+from backend.bench_features import synthetic_pose
+from backend.biomech.vi_decode import decode_person
+from backend.pose_providers import VideoIntelligenceProvider, person_from_xy
+from backend.pose_segments import plan_segments, stitch_segments
+
+
+def _people(duration_s=20.0):
+    thrower = synthetic_pose(duration_s, seed=1)
+    thrower.mask[:] = True
+    still = thrower.take(np.arange(len(thrower)))
+    still.data[:, :, :2] = np.clip(thrower.data[:1, :, :2] + 0.2, 0.0, 1.0)
+    return [(thrower, 0.8), (still, 0.95)]
+
+
+def _proto_person(pose, conf):
+    objs = [vi.TimestampedObject(time_offset=timedelta(milliseconds=int(t)),
+                                 landmarks=[vi.DetectedLandmark(point=vi.NormalizedVertex(x=x, y=y), confidence=c) for x, y, c in row])
+            for t, row in zip(pose.t_ms.tolist(), pose.data.tolist())]
+    return vi.PersonDetectionAnnotation(tracks=[vi.Track(confidence=conf, timestamped_objects=objs)])
+
+
+def _window(pose, segment):
+    keep = (pose.t_ms >= segment[0] * 1000) & (pose.t_ms <= segment[1] * 1000)
+    return pose[np.flatnonzero(keep)[0]:np.flatnonzero(keep)[-1] + 1]
+
+
+def test_plan_segments_covers_video_with_overlap():
+    assert plan_segments(100.0, 120.0, 2.0) == [(0.0, 100.0)]
+    segs = plan_segments(600.0, 120.0, 2.0)
+    assert segs[0][0] == 0.0 and segs[-1][1] == 600.0
+    assert all(b[0] == a[1] - 2.0 for a, b in zip(segs, segs[1:]))
+    assert max(e - s for s, e in segs) <= 122.0
+
+
+def test_stitch_links_people_and_drops_overlap_duplicates():
+    people = _people()
+    segments = plan_segments(20.0, 6.0, 1.0)
+    results = []
+    for k, seg in enumerate(segments):
+        dets = [person_from_xy(_window(p, seg).t_ms, _window(p, seg).data[..., :2], conf) for p, conf in people]
+        results.append(NS(person_detection_annotations=dets[::-1] if k % 2 else dets))
+    stitched = stitch_segments(segments, results)
+    assert len(stitched.person_detection_annotations) == 2
+    for person in stitched.person_detection_annotations:
+        pose = decode_person(person)
+        assert len(set(pose.t_ms.tolist())) == len(pose)
+        ref = people[0][0] if np.ptp(pose.data[:, 10, 0]) > 0 else people[1][0]
+        assert (pose.t_ms == ref.t_ms).all()
+        assert np.allclose(pose.data[..., :2], ref.data[..., :2])
+
+
+class _FakeVI:
+    requests = []
+    active = peak = 0
+    lock = threading.Lock()
+
+    def annotate_video(self, request):
+        _FakeVI.requests.append(request)
+        seg = request["video_context"].segments[0]
+        window = (seg.start_time_offset.total_seconds(), seg.end_time_offset.total_seconds())
+
+        def result(timeout=None):
+            with _FakeVI.lock:
+                _FakeVI.active += 1
+                _FakeVI.peak = max(_FakeVI.peak, _FakeVI.active)
+            time.sleep(0.05)
+            with _FakeVI.lock:
+                _FakeVI.active -= 1
+            dets = [_proto_person(_window(p, window), conf) for p, conf in _people()]
+            return vi.AnnotateVideoResponse(annotation_results=[vi.VideoAnnotationResults(person_detection_annotations=dets)])
+        return NS(result=result)
+
+
+def test_long_gs_video_is_annotated_in_concurrent_segments(monkeypatch):
+    _FakeVI.requests, _FakeVI.peak = [], 0
+    monkeypatch.setattr(vi, "VideoIntelligenceServiceClient", _FakeVI)
+    monkeypatch.setattr(pose_segments, "probe_duration_s", lambda uri: 20.0)
+
+    provider = VideoIntelligenceProvider(record_dir="", segment_s=6.0, overlap_s=1.0, concurrency=4, prepass=False)
+    annotations, ingest = provider.annotate("gs://bucket/blurred/u1/session.mp4")
+    assert ingest["segments"] == len(_FakeVI.requests) == len(plan_segments(20.0, 6.0, 1.0))
+    assert all("input_uri" in r and "input_content" not in r for r in _FakeVI.requests)
+    assert _FakeVI.peak > 1
+    assert vi.VideoAnnotationResults.serialize(annotations)
+
+    poses = [decode_person(p) for p in annotations.person_detection_annotations]
+    assert len(poses) == 2 and all((p.t_ms == _people()[0][0].t_ms).all() for p in poses)
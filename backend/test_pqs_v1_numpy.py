@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.pqs_algorithm import KinematicsContext, Landmark, calculate_pqs, detect_handedness, detect_release_idx, make_frame
+from backend.bench_features import synthetic_pose
+from backend.biomech.pose import PoseArray
+
+
+def _throw(n=45, hand='right', dt=33, seed=0, drop=0.0, conf=1.0):
+    """Rotational throw: hips lead shoulders, wrist whips through release; float64 coordinates."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n):
+        u = i / max(1, n - 1)
+        hip_a = 1.2 * math.sin(math.pi * u) ** 2
+        sh_a = 1.4 * math.sin(math.pi * max(0.0, u - 0.08)) ** 2
+        w = 0.25 * (1 + math.cos(6.0 * u))
+        pts = {
+            'left_hip': (0.5 - 0.06 * math.cos(hip_a), 0.7 + 0.03 * math.sin(hip_a)),
+            'right_hip': (0.5 + 0.06 * math.cos(hip_a), 0.7 - 0.03 * math.sin(hip_a)),
+            'left_shoulder': (0.5 - 0.08 * math.cos(sh_a), 0.45 + 0.02 * math.sin(sh_a)),
+            'right_shoulder': (0.5 + 0.08 * math.cos(sh_a), 0.45 - 0.02 * math.sin(sh_a)),
+            f'{hand}_elbow': (0.6 + 0.1 * u, 0.5 - 0.05 * u),
+            f'{hand}_wrist': (0.6 + w * u * u, 0.55 - 0.3 * u ** 3),
+            'left_knee': (0.45, 0.82), 'right_knee': (0.55 + 0.02 * u, 0.82),
+            'left_ankle': (0.45 - 0.02 * u, 0.95), 'right_ankle': (0.56, 0.95 - 0.01 * u),
+        }
+        pts = {k: (x + rng.normal(0, 0.003), y + rng.normal(0, 0.003)) for k, (x, y) in pts.items() if rng.random() >= drop}
+        f = make_frame(i * dt + int(rng.integers(0, 3)), pts)
+        for lm in f.kp.values():
+            lm.score = conf * rng.uniform(0.5, 1.0) if conf < 1.0 else 1.0
+        frames.append(f)
+    return frames
+
+
+CASES = [
+    _throw(),
+    _throw(hand='left', seed=1),
+    _throw(seed=2, drop=0.15),
+    _throw(seed=3, conf=0.6),
+    _throw(n=3, seed=4),
+    _throw(n=1, seed=5),
+    _throw(seed=6, dt=0),
+]
+
+
+@pytest.mark.parametrize("frames", CASES)
+def test_numpy_v1_matches_reference_on_frames(frames):
+    assert calculate_pqs(frames, backend='numpy') == calculate_pqs(frames, backend='python')
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_numpy_v1_matches_reference_on_pose_arrays(seed):
+    pose = synthetic_pose(4 + seed, seed=seed)
+    assert calculate_pqs(pose, backend='numpy') == calculate_pqs(pose, backend='python')
+
+
+def test_numpy_detection_matches_reference():
+    for frames in CASES[:4]:
+        kin = KinematicsContext(frames, backend='numpy')
+        assert kin.handedness == detect_handedness(frames)
+        assert kin.release_idx() == detect_release_idx(frames, kin.handedness)
+
+
+def test_numpy_v1_edge_inputs():
+    frames = _throw(seed=7)
+    frames[10].kp['right_wrist'].score = None
+    assert calculate_pqs(frames, backend='numpy') == calculate_pqs(frames, backend='python')
+    # Joint names outside the 17-point set only count toward confidence
+    frames[5].kp['discus'] = Landmark(x=0.7, y=0.4, score=0.1)
+    assert calculate_pqs(frames, backend='numpy') == calculate_pqs(frames, backend='python')
+    empty = PoseArray.empty()
+    assert calculate_pqs(empty, backend='numpy') == calculate_pqs([], backend='python')
+
+
+def test_auto_backend_uses_columns_for_pose_arrays_only():
+    frames = _throw(seed=8)
+    assert KinematicsContext(frames, backend='auto').columns is None
+    assert KinematicsContext(PoseArray.from_frames(frames), backend='auto').columns is not None
@@ -0,0 +1,44 @@
+import pytest
+
+from backend.scoring import pqs_block, score_session
+from backend.pqs_algorithm import calculate_pqs, calculate_pqs_v2, detect_handedness, detect_release_idx
+from backend.coaching.throwpro import generate_throw_feedback
+from backend.bench_features import synthetic_pose
+from backend.test_pqs_v1_numpy import _throw
+
+
+@pytest.fixture
+def envelopes(monkeypatch):
+    lookups = []
+
+    def fake_load(event, age_band, sex, handedness):
+        lookups.append((event, age_band, sex, handedness))
+        return {'version': 3, 'components': {'release_quality': {'release_angle_deg': [30.0, 42.0]}}}, False
+
+    monkeypatch.setattr('backend.scoring.load_active_envelope', fake_load)
+    monkeypatch.setattr('backend.pqs_algorithm.load_active_envelope', fake_load)
+    return lookups
+
+
+def test_score_session_matches_separate_calls(envelopes):
+    frames = _throw(seed=2)
+    profile = {'ageBand': 'U18', 'sex': 'F', 'experience_level': 'intermediate'}
+    scored = score_session(frames, profile, event='discus', with_coaching=True)
+    assert envelopes == [('discus', 'U18', 'F', scored.handedness)]
+    hand = detect_handedness(frames)
+    rel = detect_release_idx(frames, hand)
+    v2 = calculate_pqs_v2(frames, hand, rel, event='discus', age_band='U18', sex='F')
+    assert scored.pqs == calculate_pqs(frames)
+    assert (scored.handedness, scored.release_idx) == (hand, rel)
+    assert scored.pqs_v2 == v2 and v2['envelope_version'] == 3
+    assert scored.coaching == generate_throw_feedback(v2, event_type='discus', athlete_profile=profile)
+    assert set(scored.timings_ms) == {'v1', 'features', 'envelope', 'v2', 'coaching', 'total'}
+
+
+def test_score_session_result_block(envelopes):
+    pose = synthetic_pose(3)
+    scored = score_session(pose, {'handedness': 'left'})
+    out = scored.as_result()
+    assert out['pqs'] == pqs_block(scored.pqs)
+    assert 'coaching' not in out and 'coaching' not in scored.timings_ms
+    assert out['pqs_v2'] == calculate_pqs_v2(pose, 'left', scored.release_idx)
@@ -46,7 +46,7 @@ def test_status_flow(monkeypatch):
         def __init__(self, *args, **kwargs): pass
         def bucket(self, name): return _Bucket()
     monkeypatch.setattr('backend.gcp.ingest_blur.main.storage.Client', _Storage)
-    monkeypatch.setattr('backend.api.worker.storage.Client', _Storage)
+    monkeypatch.setattr('google.cloud.storage.Client', _Storage)
 
     # Stub analyzer to be fast and deterministic
     from backend import discus_analyzer_v2 as analyzer
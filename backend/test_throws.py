@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from backend import discus_analyzer_v2 as analyzer
+from backend.bench_features import synthetic_pose
+from backend.cache_tiers import DiskLRU, TieredCache
+from backend.biomech.feature_cache import FeatureCache
+from backend.biomech.pose import JOINT_INDEX
+from backend.biomech.throws import segment_throws
+from backend.pose_providers import Annotations, PoseProvider, person_from_pose
+from backend.scoring import pqs_block, score_session, score_throws
+
+
+THROWS_AT = [6.0, 15.0, 26.0, 33.0, 47.0]
+
+
+def _session(centers=THROWS_AT, duration_s=60.0, fps=30.0):
+    # Mostly still athlete; around each center the hips spin and the throwing wrist sweeps
+    pose = synthetic_pose(duration_s, fps, seed=0)
+    t = pose.t_ms / 1000.0
+    for c in centers:
+        w = np.exp(-((t - c) / 0.6) ** 2)
+        ang = 6.0 * np.cumsum(w) / fps
+        for j, s in ((JOINT_INDEX['left_hip'], -1), (JOINT_INDEX['right_hip'], 1)):
+            pose.data[:, j, 0] += 0.08 * s * (np.cos(ang) - 1) * (w > 0.01)
+            pose.data[:, j, 1] += 0.08 * s * np.sin(ang) * (w > 0.01)
+        wrist = JOINT_INDEX['right_wrist']
+        pose.data[:, wrist, 0] += 0.25 * w * np.sin(8 * (t - c))
+        pose.data[:, wrist, 1] += 0.25 * w * np.cos(8 * (t - c))
+    return pose
+
+
+def test_segments_each_throw_and_skips_dead_time():
+    pose = _session()
+    windows = segment_throws(pose)
+    assert len(windows) == len(THROWS_AT)
+    for (i0, i1), c in zip(windows, THROWS_AT):
+        assert pose.t_ms[i0] < c * 1000 < pose.t_ms[i1 - 1]
+    assert all(a[1] <= b[0] for a, b in zip(windows, windows[1:]))
+    assert sum(i1 - i0 for i0, i1 in windows) < 0.4 * len(pose)
+    assert len(segment_throws(synthetic_pose(4.0, seed=2))) <= 1
+
+
+def test_score_throws_matches_score_session_per_window(offline):
+    pose = _session()
+    windows = segment_throws(pose)
+    scores, timings = score_throws(pose, windows, with_coaching=True)
+    assert set(timings) >= {'v1', 'features', 'envelope', 'v2', 'total'}
+    for (i0, i1), sc in zip(windows, scores):
+        ref = score_session(pose[i0:i1], with_coaching=True)
+        assert pqs_block(sc.pqs) == pqs_block(ref.pqs)
+        assert sc.pqs_v2 == ref.pqs_v2 and sc.coaching == ref.coaching
+
+
+def test_score_throws_reuses_feature_cache_per_window(offline, tmp_path, monkeypatch):
+    pose = _session()
+    windows = segment_throws(pose)
+    cache = FeatureCache(TieredCache([DiskLRU(str(tmp_path), 64 << 20)]))
+    first, timings = score_throws(pose, windows, feature_cache=cache)
+    assert timings['feature_cache_hits'] == 0
+    cache.flush(5)
+
+    monkeypatch.setattr('backend.biomech.features.compute_features_batch',
+                        lambda *a, **k: (_ for _ in ()).throw(AssertionError('recomputed')))
+    again, timings = score_throws(pose, windows, feature_cache=cache)
+    assert timings['feature_cache_hits'] == len(windows)
+    assert [s.pqs_v2 for s in again] == [s.pqs_v2 for s in first]
+
+
+class _Fixed(PoseProvider):
+    name = "fixed"
+
+    def __init__(self, pose):
+        self.pose = pose
+
+    def annotate(self, video_uri_or_path):
+        return Annotations([person_from_pose(self.pose)]), {"source": "fixed", "bytes_sent": 0, "annotate_ms": 0.0}
+
+
+def test_analyze_video_reports_each_throw(offline):
+    out = analyzer.analyze_video("session.mp4", provider=_Fixed(_session()))
+    session = out["session"]
+    assert session["throw_count"] == len(THROWS_AT) == len(session["throws"])
+    best = session["throws"][session["best_index"]]
+    assert out["pqs"] == best["pqs"] and out["pqs_v2"] == best["pqs_v2"]
+    assert session["pqs_total"]["max"] == best["pqs"]["total"]
+    assert "segment" in out["timings_ms"]
+
+    single = analyzer.analyze_video("clip.mp4", provider=_Fixed(synthetic_pose(4.0, seed=2)))
+    assert "session" not in single
+
+
+def test_score_throws_looks_windows_up_concurrently(offline):
+    import threading
+    pose = _session()
+    windows = segment_throws(pose)
+    barrier = threading.Barrier(len(windows), timeout=5)
+
+    class _SlowRemote:
+        def get(self, key):
+            barrier.wait()  # only passes when every window's lookup is in flight at once
+            return None
+
+        def put(self, key, data):
+            pass
+
+    cache = FeatureCache(TieredCache([_SlowRemote()]))
+    _, timings = score_throws(pose, windows, feature_cache=cache)
+    assert timings['feature_cache_hits'] == 0 and not barrier.broken
+    cache.flush(5)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from backend.biomech.time_index import TimeIndex
+from backend.bench_features import synthetic_pose
+from backend.pqs_algorithm import make_frame
+
+
+def test_window_and_nearest_match_linear_scan():
+    rng = np.random.default_rng(0)
+    for ordered in (True, False):
+        t = np.sort(rng.integers(0, 2000, size=80)) if ordered else rng.integers(0, 2000, size=80)
+        index = TimeIndex(t)
+        for _ in range(50):
+            lo, hi = sorted(rng.integers(-100, 2100, size=2))
+            assert sorted(index.window(lo, hi).tolist()) == [i for i in range(len(t)) if lo <= t[i] <= hi]
+            q = int(rng.integers(-100, 2100))
+            best = min(abs(int(v) - q) for v in t)
+            assert abs(int(t[index.nearest(q)]) - q) == best
+    assert TimeIndex([]).nearest(5) == -1
+    assert len(TimeIndex([]).window(0, 10)) == 0
+
+
+def test_nearest_prefers_earlier_sample_on_ties():
+    assert TimeIndex([0, 10, 20]).nearest(15) == 1
+
+
+def test_conf_mean_matches_direct_average():
+    frames = [make_frame(i * 40, {'left_hip': (0.4, 0.8), 'right_hip': (0.6, 0.8)}) for i in range(20)]
+    for i, f in enumerate(frames):
+        f.kp['left_hip'].score = 0.5 + 0.02 * i
+    frames[3].kp['right_hip'].score = None
+    index = TimeIndex.from_frames(frames)
+    scores = [lm.score if lm.score is not None else 1.0 for f in frames if 200 <= f.t_ms <= 400 for lm in f.kp.values()]
+    assert np.isclose(index.conf_mean(200, 400), sum(scores) / len(scores))
+    assert index.conf_mean(5000, 6000) is None
+    pose = synthetic_pose(2)
+    m = (pose.t_ms >= 300) & (pose.t_ms <= 700)
+    assert np.isclose(TimeIndex.from_pose(pose).conf_mean(300, 700), pose.data[m][..., 2][pose.mask[m]].mean())
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import numpy as np
+from google.cloud import videointelligence as vi
+
+from backend.biomech.pose import JOINTS
+from backend.biomech.vi_decode import decode_person
+from backend.pose_providers import PersonDetection, Point, PoseLandmark, TimestampedObject, Track
+
+
+def _track(times_ms, x0, conf=0.7, joints=17):
+    objs = []
+    for i, t in enumerate(times_ms):
+        lms = [vi.DetectedLandmark(point=vi.NormalizedVertex(x=x0 + 0.01 * i, y=0.1 * (j % 10)), confidence=conf) for j in range(joints)]
+        objs.append(vi.TimestampedObject(time_offset=timedelta(milliseconds=t), landmarks=lms))
+    objs.append(vi.TimestampedObject(time_offset=timedelta(milliseconds=5000)))  # box-only object, no landmarks
+    return vi.Track(timestamped_objects=objs, confidence=0.9)
+
+
+def test_decode_single_track_keeps_confidence():
+    person = vi.PersonDetectionAnnotation(tracks=[_track([0, 33, 66, 100], 0.2)])
+    pose = decode_person(person)
+    assert pose.t_ms.tolist() == [0, 33, 66, 100]
+    assert pose.mask.all()
+    np.testing.assert_allclose(pose.data[:, JOINTS.index('left_wrist'), 0], [0.2, 0.21, 0.22, 0.23], rtol=1e-6)
+    np.testing.assert_allclose(pose.data[..., 2], 0.7, rtol=1e-6)
+
+
+def test_decode_merges_tracks_by_time():
+    # Second track overlaps at 66 ms with only 11 joints: it wins for those, the first keeps the rest
+    person = vi.PersonDetectionAnnotation(tracks=[_track([0, 33, 66], 0.2), _track([66, 99, 20], 0.6, conf=0.4, joints=11)])
+    pose = decode_person(person)
+    assert pose.t_ms.tolist() == [0, 20, 33, 66, 99]
+    row = pose.data[3]
+    assert pose.mask[3].all()
+    np.testing.assert_allclose(row[:11, 0], 0.6, rtol=1e-6)
+    np.testing.assert_allclose(row[11:, 0], 0.22, rtol=1e-6)
+    assert pose.mask[1, :11].all() and not pose.mask[1, 11:].any()
+    assert (pose.data[1, 11:] == 0).all()
+
+
+def test_decode_vi_shaped_records():
+    objs = [TimestampedObject(time_offset=timedelta(milliseconds=t), landmarks=[PoseLandmark(point=Point(0.5, 0.5), confidence=0.3)] * 17)
+            for t in (10, 0)]
+    pose = decode_person(PersonDetection(tracks=[Track(confidence=1.0, timestamped_objects=objs)]))
+    assert pose.t_ms.tolist() == [0, 10]
+    np.testing.assert_allclose(pose.data[..., 2], 0.3, rtol=1e-6)
+    assert len(decode_person(PersonDetection(tracks=[]))) == 0
@@ -62,7 +62,7 @@ async def test_pubsub_push(monkeypatch):
             return _FakeBucket()
 
     monkeypatch.setattr("api.worker.firestore.Client", lambda *a, **k: _FakeFS())
-    monkeypatch.setattr("api.worker.storage.Client", lambda *a, **k: _FakeStorage())
+    monkeypatch.setattr("google.cloud.storage.Client", lambda *a, **k: _FakeStorage())
 
     message = {
         "message": {
@@ -1,6 +1,6 @@
 import os
 import tempfile
-from typing import Dict, List
+from typing import Dict
 import cv2
 import numpy as np
 from google.cloud import storage
@@ -12,6 +12,9 @@ from backend.visual.constants import (
     TARGET_WIDTH, TARGET_HEIGHT, SKELETON_EDGES,
 )
 from backend.visual.geom import arc_points
+from backend.biomech.landmark_archive import decode_archive, is_archive, records_to_pose
+from backend.biomech.pose import JOINTS, PoseArray
+from backend.biomech.time_index import TimeIndex
 
 
 def _download(gs_uri: str) -> str:
@@ -54,8 +57,8 @@ def _draw_skeleton(frame: np.ndarray, kps: Dict[str, Dict[str, float]]):
         if pa and pb:
             cv2.line(frame, pa, pb, COLOR_SKELETON, LINE_THICKNESS, cv2.LINE_AA)
 
-def _load_landmarks(gs_uri: str) -> List[Dict]:
-    # Accept compressed JSON uploaded as content_type application/json
+def _load_landmarks(gs_uri: str) -> PoseArray:
+    # Binary landmark archive; older sessions have gzipped (or plain) JSON records
     assert gs_uri.startswith("gs://")
     _, rest = gs_uri.split("gs://", 1)
     bucket_name, blob_name = rest.split("/", 1)
@@ -63,13 +66,14 @@ def _load_landmarks(gs_uri: str) -> List[Dict]:
     bucket = client.bucket(bucket_name)
     blob = bucket.blob(blob_name)
     data = blob.download_as_bytes()
+    if is_archive(data):
+        return decode_archive(data)
+    import gzip, json as _json
     try:
-        import gzip, json as _json
         frames = _json.loads(gzip.decompress(data).decode('utf-8'))
     except Exception:
-        import json as _json
         frames = _json.loads(data.decode('utf-8'))
-    return frames
+    return records_to_pose(frames)
 
 
 def _draw_release_arc(frame: np.ndarray, center: tuple[int,int], angle_deg: float):
@@ -142,13 +146,14 @@ def render_coaching_video(gs_uri: str, analysis: Dict, out_gs_uri: str) -> Dict:
 
     t0 = analysis.get('video', {}).get('duration_ms', 0)
     # Load landmarks if provided in analysis assets
-    landmarks_frames = []
+    landmarks = PoseArray.empty()
     lm_uri = (analysis.get('assets') or {}).get('landmarks_uri')
     if lm_uri:
         try:
-            landmarks_frames = _load_landmarks(lm_uri)
+            landmarks = _load_landmarks(lm_uri)
         except Exception:
-            landmarks_frames = []
+            landmarks = PoseArray.empty()
+    landmarks_index = TimeIndex(landmarks.t_ms)
 
     # Render frames
     idx = 0
@@ -159,48 +164,15 @@ def render_coaching_video(gs_uri: str, analysis: Dict, out_gs_uri: str) -> Dict:
         frame = cv2.resize(frame, (w, h))
 
         # Draw skeleton for this frame if landmarks available
-        if landmarks_frames:
+        if len(landmarks):
             ms_per_frame = int(1000.0 / fps)
             cur_ms = idx * ms_per_frame
-            # find nearest landmarks by timestamp
-            # assume frames are sorted
-            # simple nearest search
-            nearest = None
-            if 0 <= idx < len(landmarks_frames):
-                nearest = landmarks_frames[idx]
-            else:
-                # fallback: find by timestamp
-                best_dt = 10**9
-                for rec in landmarks_frames:
-                    dt = abs(rec.get('timestamp_ms', 0) - cur_ms)
-                    if dt < best_dt:
-                        best_dt = dt
-                        nearest = rec
-            if nearest and isinstance(nearest.get('landmarks'), list):
-                # map into dict with canonical names if counts match; otherwise, draw connecting sequential points
-                # We don't have names here; draw edges only when we have 17 points in order nose..ankles
-                pts = nearest['landmarks']
-                if len(pts) >= 17:
-                    kps = {
-                        'nose': {'x': pts[0]['x'], 'y': pts[0]['y']},
-                        'left_eye': {'x': pts[1]['x'], 'y': pts[1]['y']},
-                        'right_eye': {'x': pts[2]['x'], 'y': pts[2]['y']},
-                        'left_ear': {'x': pts[3]['x'], 'y': pts[3]['y']},
-                        'right_ear': {'x': pts[4]['x'], 'y': pts[4]['y']},
-                        'left_shoulder': {'x': pts[5]['x'], 'y': pts[5]['y']},
-                        'right_shoulder': {'x': pts[6]['x'], 'y': pts[6]['y']},
-                        'left_elbow': {'x': pts[7]['x'], 'y': pts[7]['y']},
-                        'right_elbow': {'x': pts[8]['x'], 'y': pts[8]['y']},
-                        'left_wrist': {'x': pts[9]['x'], 'y': pts[9]['y']},
-                        'right_wrist': {'x': pts[10]['x'], 'y': pts[10]['y']},
-                        'left_hip': {'x': pts[11]['x'], 'y': pts[11]['y']},
-                        'right_hip': {'x': pts[12]['x'], 'y': pts[12]['y']},
-                        'left_knee': {'x': pts[13]['x'], 'y': pts[13]['y']},
-                        'right_knee': {'x': pts[14]['x'], 'y': pts[14]['y']},
-                        'left_ankle': {'x': pts[15]['x'], 'y': pts[15]['y']},
-                        'right_ankle': {'x': pts[16]['x'], 'y': pts[16]['y']},
-                    }
-                    _draw_skeleton(frame, kps)
+            # Landmark row i normally belongs to video frame i; otherwise nearest by timestamp
+            row = idx if idx < len(landmarks) else landmarks_index.nearest(cur_ms)
+            pts = landmarks.data[row]
+            kps = {JOINTS[j]: {'x': float(pts[j, 0]), 'y': float(pts[j, 1])} for j in np.flatnonzero(landmarks.mask[row]).tolist()}
+            if kps:
+                _draw_skeleton(frame, kps)
 
         # Phase banner using timestamp approximation by index
         # If release_t_ms known, estimate ms per frame